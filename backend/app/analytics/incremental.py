@@ -0,0 +1,192 @@
+import pandas as pd
+from collections import Counter, deque
+from typing import Dict, List, Any, Optional
+from .macro import MacroAnalyticsEngine
+from .micro import MicroAnalyticsEngine
+
+
+class IncrementalAnalyticsState:
+    """
+    Running macro/micro analytics for a single live match.
+    Each update only touches the new snapshot and the events up to its
+    timestamp that have not been consumed yet, so per-tick cost does not
+    grow with match length. Each update returns only what was appended on
+    that tick plus running totals; accumulated() has the full-history view.
+    """
+
+    def __init__(self, game: str = "lol", metadata: Optional[Dict[str, Any]] = None, events_df: pd.DataFrame = None):
+        self.game = game
+        self.draft_analysis = MacroAnalyticsEngine.analyze_draft_synergy(metadata or {})
+
+        # Events not yet consumed, in timestamp order
+        self._pending_events: deque = deque()
+        self.events_seen = 0
+        if events_df is not None and not events_df.empty:
+            self.add_events(events_df.sort_values('timestamp', kind='stable').to_dict('records'))
+
+        # Macro: running gold-diff delta and append-only inflection lists
+        self.snapshot_count = 0
+        self._last_gold_diff = None
+        # Swing thresholds differ below/above 10 snapshots, so keep both lists
+        self._inflections_low: List[Dict[str, Any]] = []
+        self._inflections_high: List[Dict[str, Any]] = []
+        self.objectives: List[Dict[str, Any]] = []
+
+        # Micro: per-player cumulative counters
+        self.player_ids = set()
+        self.kill_counts = Counter()
+        self.headshot_counts = Counter()
+
+        # Trades: deaths whose window has closed are final, the rest stay open
+        self._trade_window = MicroAnalyticsEngine.TRADE_WINDOW_MS["valorant" if game == "valorant" else "lol"]
+        self._kill_types = set(MicroAnalyticsEngine.kill_event_types(game))
+        self._stat_kill_type = 'KILL' if game == "valorant" else 'CHAMPION_KILL'
+        self.mistakes: List[Dict[str, Any]] = []
+        self._open_kills: deque = deque()
+
+        # How much of each append-only list earlier updates already returned
+        self._macro_sent = 0
+        self._mistakes_sent = 0
+        self._objectives_sent = 0
+
+    def add_events(self, events: List[Dict[str, Any]]):
+        """Queue events for later updates. Events must arrive in timestamp order."""
+        self._pending_events.extend(events)
+
+    def _take_events(self, timestamp: Any) -> List[Dict[str, Any]]:
+        new_events = []
+        while self._pending_events and self._pending_events[0].get('timestamp') <= timestamp:
+            new_events.append(self._pending_events.popleft())
+        self.events_seen += len(new_events)
+        return new_events
+
+    def _add_event_inflection(self, event: Dict[str, Any]):
+        inflection = MacroAnalyticsEngine.event_inflection(event, self.game)
+        if inflection:
+            self._inflections_low.append(inflection)
+            self._inflections_high.append(inflection)
+
+    def _update_macro(self, state: Dict[str, Any], new_events: List[Dict[str, Any]]):
+        timestamp = state.get('timestamp', 0)
+        gold_diff = state.get('gold_diff', 0)
+        delta = None if self._last_gold_diff is None else gold_diff - self._last_gold_diff
+        self._last_gold_diff = gold_diff
+
+        # Keep the same ordering as a stable sort by timestamp over swings then events
+        for event in new_events:
+            if event.get('timestamp') < timestamp:
+                self._add_event_inflection(event)
+        if delta is not None:
+            low = MacroAnalyticsEngine.swing_threshold(self.game, snapshot_count=1)
+            high = MacroAnalyticsEngine.swing_threshold(self.game, snapshot_count=10)
+            if abs(delta) > low:
+                self._inflections_low.append(MacroAnalyticsEngine.swing_inflection(timestamp, delta, self.game))
+            if abs(delta) > high:
+                self._inflections_high.append(MacroAnalyticsEngine.swing_inflection(timestamp, delta, self.game))
+        for event in new_events:
+            if not event.get('timestamp') < timestamp:
+                self._add_event_inflection(event)
+
+        for event in new_events:
+            if MacroAnalyticsEngine.is_objective_event(event.get('type'), self.game):
+                self.objectives.append(MacroAnalyticsEngine.objective_entry(event, self.game))
+
+    def _update_micro(self, state: Dict[str, Any], new_events: List[Dict[str, Any]]):
+        self.player_ids.update(MicroAnalyticsEngine.player_ids_from_columns(state.keys()))
+
+        for event in new_events:
+            etype = event.get('type')
+            if etype == self._stat_kill_type:
+                killer = str(event.get('killerId'))
+                self.kill_counts[killer] += 1
+                if self.game == "valorant" and event.get('headshot') == True:
+                    self.headshot_counts[killer] += 1
+
+            if etype in self._kill_types:
+                # Only the new kills can trade deaths that are still inside their window
+                ts = event.get('timestamp')
+                killer_team = MicroAnalyticsEngine.player_team(event.get('killerId'), self.game)
+                for open_kill in self._open_kills:
+                    if (not open_kill["traded"] and open_kill["victim_team"] == killer_team
+                            and open_kill["timestamp"] < ts < open_kill["timestamp"] + self._trade_window):
+                        open_kill["traded"] = True
+                victim_id = str(event.get('victimId'))
+                self._open_kills.append({
+                    "victim_id": victim_id,
+                    "victim_team": MicroAnalyticsEngine.player_team(victim_id, self.game),
+                    "timestamp": ts,
+                    "traded": False
+                })
+
+        # Later events are past this snapshot, so windows ending by now are final
+        now = state.get('timestamp', 0)
+        while self._open_kills and self._open_kills[0]["timestamp"] + self._trade_window <= now:
+            closed = self._open_kills.popleft()
+            if not closed["traded"]:
+                self.mistakes.append(MicroAnalyticsEngine.untraded_death(closed["victim_id"], closed["timestamp"], self.game))
+
+    def _macro_history(self) -> List[Dict[str, Any]]:
+        return self._inflections_low if self.snapshot_count < 10 else self._inflections_high
+
+    def _open_untraded(self) -> List[Dict[str, Any]]:
+        # Open kills only span one trade window, so this stays small
+        return [
+            MicroAnalyticsEngine.untraded_death(k["victim_id"], k["timestamp"], self.game)
+            for k in self._open_kills if not k["traded"]
+        ]
+
+    def update(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Consume one snapshot and return what it added, plus running totals."""
+        self.snapshot_count += 1
+        new_events = self._take_events(state.get('timestamp', 0))
+        self._update_macro(state, new_events)
+        self._update_micro(state, new_events)
+
+        # The high-threshold list takes over at 10 snapshots and is sent whole once
+        if self.snapshot_count == 10:
+            self._macro_sent = 0
+        history = self._macro_history()
+        macro_insights = history[self._macro_sent:] if history else MacroAnalyticsEngine.baseline_inflections(self.game, state)
+        self._macro_sent = len(history)
+
+        player_stats = MicroAnalyticsEngine.build_player_stats(
+            state, self.player_ids, self.kill_counts, self.headshot_counts, game=self.game
+        )
+
+        micro_insights = []
+        if self.events_seen:
+            open_untraded = self._open_untraded()
+            micro_insights = self.mistakes[self._mistakes_sent:] + open_untraded
+            if not self.mistakes and not open_untraded:
+                micro_insights = MicroAnalyticsEngine.resource_insights(player_stats, state.get('timestamp', 0), self.game)
+        self._mistakes_sent = len(self.mistakes)
+
+        objectives = self.objectives[self._objectives_sent:]
+        self._objectives_sent = len(self.objectives)
+
+        return {
+            "macro_insights": macro_insights,
+            "player_stats": player_stats,
+            "micro_insights": micro_insights,
+            "objectives": objectives,
+            "draft_analysis": self.draft_analysis,
+            "analytics_totals": {
+                "macro_insights": len(history),
+                "mistakes": len(self.mistakes),
+                "objectives": len(self.objectives),
+                "events_seen": self.events_seen
+            }
+        }
+
+    def accumulated(self, state: Dict[str, Any], player_stats: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Full-history insights for keyframes and the coach summary."""
+        micro_insights = []
+        if self.events_seen:
+            micro_insights = self.mistakes + self._open_untraded()
+            if not micro_insights:
+                micro_insights = MicroAnalyticsEngine.resource_insights(player_stats, state.get('timestamp', 0), self.game)
+        return {
+            "macro_insights": self._macro_history() or MacroAnalyticsEngine.baseline_inflections(self.game, state),
+            "micro_insights": micro_insights,
+            "objectives": self.objectives
+        }
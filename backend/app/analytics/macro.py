@@ -1,7 +1,70 @@
 import pandas as pd
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 class MacroAnalyticsEngine:
+    @staticmethod
+    def swing_threshold(game: str = "lol", snapshot_count: int = 10) -> float:
+        """Gold/econ delta above which a snapshot counts as a significant shift."""
+        threshold = 1000 if game == "valorant" else 500
+        # Lower threshold if we have very few snapshots to ensure we show SOMETHING
+        if snapshot_count < 10:
+            threshold = threshold // 2
+        return threshold
+
+    @staticmethod
+    def swing_inflection(timestamp: Any, delta: float, game: str = "lol") -> Dict[str, Any]:
+        direction = "Team Blue" if delta > 0 else "Team Red"
+        return {
+            "timestamp": timestamp,
+            "type": "Economy Swing" if game == "valorant" else "Gold Swing",
+            "magnitude": delta,
+            "description": f"Significant {('econ' if game == 'valorant' else 'gold')} swing towards {direction}"
+        }
+
+    @staticmethod
+    def event_inflection(event: Dict[str, Any], game: str = "lol") -> Optional[Dict[str, Any]]:
+        """Objective/tactical inflection for a single event, or None if it is not one."""
+        if game == "lol":
+            # Significant LoL objectives
+            if event.get('type') not in ['ELITE_MONSTER_KILL', 'BUILDING_KILL']:
+                return None
+            etype = event.get('monsterType') or event.get('buildingType') or event.get('type')
+            if etype in ['BARON', 'DRAGON', 'INHIBITOR', 'TOWER']:
+                team_id = event.get('teamId')
+                team_label = "Blue" if str(team_id) in ["100", "blue", "team-blue"] else "Red"
+                return {
+                    "timestamp": event.get('timestamp'),
+                    "type": "Objective Take",
+                    "description": f"{etype} secured by Team {team_label}"
+                }
+        elif game == "valorant":
+            # Significant Valorant events
+            etype = event.get('type')
+            if etype in ['SPIKE_PLANTED', 'SPIKE_DEFUSED', 'ROUND_END']:
+                return {
+                    "timestamp": event.get('timestamp'),
+                    "type": "Tactical Event",
+                    "description": f"Critical {etype.replace('_', ' ').lower()} observed"
+                }
+        return None
+
+    @staticmethod
+    def baseline_inflections(game: str = "lol", last_snap: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Fallback inflections when no swing or objective was detected."""
+        inflections = [{
+            "timestamp": 0,
+            "type": "Strategic Baseline",
+            "description": f"Analyzing initial {game} team compositions and positioning."
+        }]
+        if last_snap is not None:
+            lead_team = "Blue" if last_snap['gold_diff'] > 0 else "Red"
+            inflections.append({
+                "timestamp": last_snap['timestamp'],
+                "type": "Current Momentum",
+                "description": f"Overall momentum favors Team {lead_team} based on resource accumulation."
+            })
+        return inflections
+
     @staticmethod
     def identify_strategic_inflections(snapshots_df: pd.DataFrame, game: str = "lol", events_df: pd.DataFrame = None) -> List[Dict[str, Any]]:
         """
@@ -15,66 +78,59 @@ class MacroAnalyticsEngine:
         snapshots_df['gold_diff_delta'] = snapshots_df['gold_diff'].diff()
         
         # Threshold for a "significant" shift
-        threshold = 1000 if game == "valorant" else 500
-        # Lower threshold if we have very few snapshots to ensure we show SOMETHING
-        if len(snapshots_df) < 10:
-            threshold = threshold // 2
+        threshold = MacroAnalyticsEngine.swing_threshold(game, len(snapshots_df))
         
         significant_shifts = snapshots_df[snapshots_df['gold_diff_delta'].abs() > threshold]
         
         for _, shift in significant_shifts.iterrows():
-            direction = "Team Blue" if shift['gold_diff_delta'] > 0 else "Team Red"
-            inflections.append({
-                "timestamp": shift['timestamp'],
-                "type": "Economy Swing" if game == "valorant" else "Gold Swing",
-                "magnitude": shift['gold_diff_delta'],
-                "description": f"Significant {('econ' if game == 'valorant' else 'gold')} swing towards {direction}"
-            })
+            inflections.append(MacroAnalyticsEngine.swing_inflection(shift['timestamp'], shift['gold_diff_delta'], game))
         
         # 2. Objective-based inflections
         if events_df is not None and not events_df.empty:
-            if game == "lol":
-                # Significant LoL objectives
-                obj_events = events_df[events_df['type'].isin(['ELITE_MONSTER_KILL', 'BUILDING_KILL'])]
-                for _, event in obj_events.iterrows():
-                    etype = event.get('monsterType') or event.get('buildingType') or event.get('type')
-                    if etype in ['BARON', 'DRAGON', 'INHIBITOR', 'TOWER']:
-                        team_id = event.get('teamId')
-                        team_label = "Blue" if str(team_id) in ["100", "blue", "team-blue"] else "Red"
-                        inflections.append({
-                            "timestamp": event.get('timestamp'),
-                            "type": "Objective Take",
-                            "description": f"{etype} secured by Team {team_label}"
-                        })
-            elif game == "valorant":
-                # Significant Valorant events
-                val_events = events_df[events_df['type'].isin(['SPIKE_PLANTED', 'SPIKE_DEFUSED', 'ROUND_END'])]
-                for _, event in val_events.iterrows():
-                    etype = event.get('type')
-                    inflections.append({
-                        "timestamp": event.get('timestamp'),
-                        "type": "Tactical Event",
-                        "description": f"Critical {etype.replace('_', ' ').lower()} observed"
-                    })
+            event_types = ['SPIKE_PLANTED', 'SPIKE_DEFUSED', 'ROUND_END'] if game == "valorant" else ['ELITE_MONSTER_KILL', 'BUILDING_KILL']
+            for _, event in events_df[events_df['type'].isin(event_types)].iterrows():
+                inflection = MacroAnalyticsEngine.event_inflection(event, game)
+                if inflection:
+                    inflections.append(inflection)
         
         # 3. Baseline fallback if still empty
         if not inflections:
-            inflections.append({
-                "timestamp": 0,
-                "type": "Strategic Baseline",
-                "description": f"Analyzing initial {game} team compositions and positioning."
-            })
-            if not snapshots_df.empty:
-                last_snap = snapshots_df.iloc[-1]
-                lead_team = "Blue" if last_snap['gold_diff'] > 0 else "Red"
-                inflections.append({
-                    "timestamp": last_snap['timestamp'],
-                    "type": "Current Momentum",
-                    "description": f"Overall momentum favors Team {lead_team} based on resource accumulation."
-                })
+            inflections = MacroAnalyticsEngine.baseline_inflections(game, snapshots_df.iloc[-1])
             
         return sorted(inflections, key=lambda x: x['timestamp'])
 
+    @staticmethod
+    def is_objective_event(event_type: Any, game: str = "lol") -> bool:
+        if game == "valorant":
+            return isinstance(event_type, str) and 'SPIKE' in event_type.upper()
+        return event_type in ['ELITE_MONSTER_KILL', 'BUILDING_KILL', 'monsterKilled', 'buildingKilled']
+
+    @staticmethod
+    def objective_entry(event: Dict[str, Any], game: str = "lol") -> Dict[str, Any]:
+        """Objective-control record for a single objective event."""
+        if game == "valorant":
+            return {
+                "timestamp": event.get('timestamp'),
+                "type": event.get('type'),
+                "site": event.get('site', 'Unknown'),
+                "team_id": "blue" if event.get('planterId', '').startswith('blue') or event.get('defuserId', '').startswith('blue') else "red",
+                "player_id": event.get('planterId') or event.get('defuserId')
+            }
+
+        obj_type = event.get('monsterType') or event.get('buildingType') or event.get('type')
+        team_id = event.get('teamId')
+        if team_id is None:
+            # Try to infer from killerId
+            kid = str(event.get('killerId', '0'))
+            team_id = 100 if kid.isdigit() and int(kid) <= 5 else 200
+
+        return {
+            "timestamp": event.get('timestamp'),
+            "type": str(obj_type).upper(),
+            "team_id": team_id,
+            "killer_id": event.get('killerId')
+        }
+
     @staticmethod
     def evaluate_objective_control(events_df: pd.DataFrame, game: str = "lol") -> List[Dict[str, Any]]:
         """Analyze objectives (Towers/Dragons for LoL, Spike for Val)."""
@@ -85,31 +141,12 @@ class MacroAnalyticsEngine:
         if game == "valorant":
             # Better Valorant objective mapping
             obj_events = events_df[events_df['type'].str.contains('SPIKE', case=False, na=False)]
-            for _, event in obj_events.iterrows():
-                objectives.append({
-                    "timestamp": event.get('timestamp'),
-                    "type": event.get('type'),
-                    "site": event.get('site', 'Unknown'),
-                    "team_id": "blue" if event.get('planterId', '').startswith('blue') or event.get('defuserId', '').startswith('blue') else "red",
-                    "player_id": event.get('planterId') or event.get('defuserId')
-                })
         else:
             # Better LoL objective mapping
             obj_events = events_df[events_df['type'].isin(['ELITE_MONSTER_KILL', 'BUILDING_KILL', 'monsterKilled', 'buildingKilled'])]
-            for _, event in obj_events.iterrows():
-                obj_type = event.get('monsterType') or event.get('buildingType') or event.get('type')
-                team_id = event.get('teamId')
-                if team_id is None:
-                    # Try to infer from killerId
-                    kid = str(event.get('killerId', '0'))
-                    team_id = 100 if kid.isdigit() and int(kid) <= 5 else 200
 
-                objectives.append({
-                    "timestamp": event.get('timestamp'),
-                    "type": str(obj_type).upper(),
-                    "team_id": team_id,
-                    "killer_id": event.get('killerId')
-                })
+        for _, event in obj_events.iterrows():
+            objectives.append(MacroAnalyticsEngine.objective_entry(event, game))
             
         return objectives
 
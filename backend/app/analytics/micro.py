@@ -1,7 +1,176 @@
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Any
+from app.core.utils import stable_hash
 
 class MicroAnalyticsEngine:
+    # Window (ms) in which a teammate kill counts as a trade
+    TRADE_WINDOW_MS = {"valorant": 5000, "lol": 15000}
+
+    # Where a player stat is read from the participant frame when its snapshot column is 0:
+    # the first truthy participant key, then the first truthy key of its "stats"
+    PARTICIPANT_FALLBACKS = {
+        "gold": (("totalGold", "gold"), ("gold",)),
+        "minionsKilled": (("minionsKilled", "unitKills"), ("minionsKilled",)),
+        "jungleMinionsKilled": (("jungleMinionsKilled",), ("jungleMinionsKilled",)),
+        "wardsPlaced": (("wardsPlaced", "visionScore"), ("wardsPlaced", "visionScore")),
+        "credits": (("credits", "money", "netWorth"), ("credits",)),
+        "loadoutValue": (("loadoutValue",), ("loadoutValue",)),
+    }
+    # Snapshot column suffixes (p{id}_<stat>, team{id}_<stat>) read by build_player_stats
+    TIMELINE_STATS = {"gold", "minionsKilled", "jungleMinionsKilled", "wardsPlaced", "credits", "loadout", "acs", "adr"}
+
+    @staticmethod
+    def to_num(v: Any) -> Any:
+        """A stat value as a number: plain numbers as is, the first numeric field of a dict, else float() or 0."""
+        if isinstance(v, (int, float)): return v
+        if isinstance(v, dict):
+            for k in ["total", "amount", "current", "count", "value"]:
+                if isinstance(v.get(k), (int, float)): return v[k]
+        try: return float(v)
+        except: return 0
+
+    @staticmethod
+    def fallback(p_frame: Dict[str, Any], name: str) -> Any:
+        """PARTICIPANT_FALLBACKS[name] read from a participant frame (the last value tried when none is truthy)."""
+        keys, stats_keys = MicroAnalyticsEngine.PARTICIPANT_FALLBACKS[name]
+        value = None
+        for key in keys:
+            value = p_frame.get(key)
+            if value:
+                return value
+        stats = p_frame.get("stats", {})
+        for key in stats_keys:
+            value = stats.get(key)
+            if value:
+                return value
+        return value
+
+    @staticmethod
+    def participant_fields() -> tuple:
+        """Participant keys and "stats" keys any fallback reads, for TimelineStream(participant_fields=...)."""
+        fallbacks = MicroAnalyticsEngine.PARTICIPANT_FALLBACKS.values()
+        return (
+            tuple(sorted({key for keys, _ in fallbacks for key in keys})),
+            tuple(sorted({key for _, stats_keys in fallbacks for key in stats_keys})),
+        )
+
+    @staticmethod
+    def participant(participant_frames: Dict[Any, Any], pid_str: str) -> Dict[str, Any]:
+        if not participant_frames:
+            return {}
+        return (
+            participant_frames.get(pid_str)
+            or participant_frames.get(str(pid_str))
+            or participant_frames.get(int(pid_str))
+            or {}
+        )
+
+    @staticmethod
+    def player_team(player_id: Any, game: str = "lol") -> Any:
+        """Heuristic team for a killer/victim ID ("blue"/"red" for VALORANT, 100/200 for LoL)."""
+        player_id = str(player_id)
+        if game == "valorant":
+            if "blue" in player_id.lower(): return "blue"
+            if "red" in player_id.lower(): return "red"
+            try:
+                return "blue" if int(player_id) <= 5 else "red"
+            except:
+                return "blue"
+        try:
+            return 100 if int(player_id) <= 5 else 200
+        except:
+            return 100
+
+    @staticmethod
+    def kill_event_types(game: str = "lol") -> List[str]:
+        return ['KILL'] if game == "valorant" else ['CHAMPION_KILL', 'championKilled']
+
+    @staticmethod
+    def untraded_death(victim_id: str, timestamp: Any, game: str = "lol") -> Dict[str, Any]:
+        if game == "valorant":
+            return {
+                "player_id": victim_id,
+                "type": "Untraded Death",
+                "timestamp": timestamp,
+                "impact": "High",
+                "details": f"Player {victim_id} died without being traded by a teammate."
+            }
+        return {
+            "player_id": victim_id,
+            "type": "Isolated Death",
+            "timestamp": timestamp,
+            "impact": "High",
+            "details": f"Player {victim_id} died at {timestamp//1000}s without a trade or assist."
+        }
+
+    @staticmethod
+    def resource_insights(stats: List[Dict[str, Any]], timestamp: Any, game: str = "lol") -> List[Dict[str, Any]]:
+        """Flag the lowest-efficiency player per team when no specific mistakes were found."""
+        insights = []
+        for team in (["blue", "red"] if game == "valorant" else [100, 200]):
+            team_stats = [s for s in stats if s.get('team_id') == team]
+            if team_stats:
+                lowest = min(team_stats, key=lambda x: x.get('efficiency_score', 100))
+                if lowest.get('efficiency_score', 100) < 80:
+                    insights.append({
+                        "player_id": lowest['player_id'],
+                        "type": "Suboptimal Resource Use",
+                        "timestamp": timestamp,
+                        "impact": "Medium",
+                        "details": f"Player {lowest['player_id']} showing lower resource efficiency compared to team average."
+                    })
+        return insights
+
+    @staticmethod
+    def _column_values(frame: pd.DataFrame, column: str) -> List[Any]:
+        """Python scalars for a column (as iterrows() yields them); None when the column is missing."""
+        if column in frame.columns:
+            return frame[column].tolist()
+        return [None] * len(frame)
+
+    @staticmethod
+    def traded_kills(kills: pd.DataFrame, window: float, game: str = "lol") -> np.ndarray:
+        """
+        For each kill (in frame order), whether a teammate of the victim got a kill
+        strictly within (timestamp, timestamp + window).
+
+        Kills are sorted once by timestamp with a per-team running count of killers,
+        so each window is two searchsorted lookups instead of a rescan of all kills.
+        """
+        n = len(kills)
+        if n == 0:
+            return np.zeros(0, dtype=bool)
+
+        # Team membership parsed once per distinct ID rather than once per comparison
+        team_of = {}
+        def teams(ids: List[Any]) -> List[Any]:
+            out = []
+            for player_id in ids:
+                key = str(player_id)
+                if key not in team_of:
+                    team_of[key] = MicroAnalyticsEngine.player_team(key, game)
+                out.append(team_of[key])
+            return out
+
+        victim_teams = teams(MicroAnalyticsEngine._column_values(kills, 'victimId'))
+        killer_teams = teams(MicroAnalyticsEngine._column_values(kills, 'killerId'))
+        timestamps = pd.to_numeric(kills['timestamp'], errors='coerce').to_numpy(dtype=float)
+
+        order = np.argsort(timestamps, kind='stable')
+        sorted_ts = timestamps[order]
+        sorted_killer_teams = np.asarray([killer_teams[i] for i in order], dtype=object)
+        lo = np.searchsorted(sorted_ts, timestamps, side='right')
+        hi = np.searchsorted(sorted_ts, timestamps + window, side='left')
+
+        traded = np.zeros(n, dtype=bool)
+        victim_teams = np.asarray(victim_teams, dtype=object)
+        for team in set(team_of.values()):
+            running = np.concatenate(([0], np.cumsum(sorted_killer_teams == team)))
+            is_team = victim_teams == team
+            traded[is_team] = (running[hi[is_team]] - running[lo[is_team]]) > 0
+        return traded
+
     @staticmethod
     def analyze_player_mistakes(events_df: pd.DataFrame, snapshots_df: pd.DataFrame, game: str = "lol") -> List[Dict[str, Any]]:
         """
@@ -12,109 +181,237 @@ class MicroAnalyticsEngine:
         if events_df.empty:
             return mistakes
 
-        if game == "valorant":
-            # Valorant specific mistakes: Deaths without trade, low econ management
-            kills = events_df[events_df['type'] == 'KILL']
-            for _, kill in kills.iterrows():
-                victim_id = str(kill.get('victimId'))
-                timestamp = kill.get('timestamp')
-                
-                # Heuristic for team
-                if "blue" in victim_id.lower(): victim_team = "blue"
-                elif "red" in victim_id.lower(): victim_team = "red"
-                else:
-                    try:
-                        victim_team = "blue" if int(victim_id) <= 5 else "red"
-                    except:
-                        victim_team = "blue"
-                
-                trade_found = False
-                nearby_kills = kills[(kills['timestamp'] > timestamp) & (kills['timestamp'] < timestamp + 5000)]
-                for _, n_kill in nearby_kills.iterrows():
-                    n_killer_id = str(n_kill.get('killerId'))
-                    if "blue" in n_killer_id.lower(): n_killer_team = "blue"
-                    elif "red" in n_killer_id.lower(): n_killer_team = "red"
-                    else:
-                        try:
-                            n_killer_team = "blue" if int(n_killer_id) <= 5 else "red"
-                        except:
-                            n_killer_team = "blue"
-
-                    if n_killer_team == victim_team:
-                        trade_found = True
-                        break
-                
-                if not trade_found:
-                    mistakes.append({
-                        "player_id": victim_id,
-                        "type": "Untraded Death",
-                        "timestamp": timestamp,
-                        "impact": "High",
-                        "details": f"Player {victim_id} died without being traded by a teammate."
-                    })
-        else:
-            # Champion Kills (LoL)
-            kills = events_df[events_df['type'].isin(['CHAMPION_KILL', 'championKilled'])]
-            
-            for _, kill in kills.iterrows():
-                victim_id = str(kill.get('victimId'))
-                timestamp = kill.get('timestamp')
-                
-                # Check for trades: Did any teammate of the victim get a kill within 15 seconds?
-                try:
-                    victim_team = 100 if int(victim_id) <= 5 else 200
-                except:
-                    victim_team = 100
-                
-                trade_found = False
-                nearby_kills = kills[(kills['timestamp'] > timestamp) & (kills['timestamp'] < timestamp + 15000)]
-                for _, n_kill in nearby_kills.iterrows():
-                    n_killer_id = str(n_kill.get('killerId'))
-                    try:
-                        n_killer_team = 100 if int(n_killer_id) <= 5 else 200
-                    except:
-                        n_killer_team = 100
-                    if n_killer_team == victim_team:
-                        trade_found = True
-                        break
-                
-                if not trade_found:
-                    mistakes.append({
-                        "player_id": victim_id,
-                        "type": "Isolated Death",
-                        "timestamp": timestamp,
-                        "impact": "High",
-                        "details": f"Player {victim_id} died at {timestamp//1000}s without a trade or assist."
-                    })
+        # Deaths without a trade: Did any teammate of the victim get a kill within the window?
+        window = MicroAnalyticsEngine.TRADE_WINDOW_MS["valorant" if game == "valorant" else "lol"]
+        kills = events_df[events_df['type'].isin(MicroAnalyticsEngine.kill_event_types(game))]
+        traded = MicroAnalyticsEngine.traded_kills(kills, window, game)
+        victim_ids = MicroAnalyticsEngine._column_values(kills, 'victimId')
+        timestamps = MicroAnalyticsEngine._column_values(kills, 'timestamp')
+        for victim_id, timestamp, was_traded in zip(victim_ids, timestamps, traded):
+            if not was_traded:
+                mistakes.append(MicroAnalyticsEngine.untraded_death(str(victim_id), timestamp, game))
                     
         # General performance insights if no specific mistakes
         if not mistakes and not snapshots_df.empty:
             latest_frame = snapshots_df.iloc[-1]
             # Find player with lowest efficiency in each team
             stats = MicroAnalyticsEngine.compute_player_efficiency(snapshots_df, events_df, game)
-            if stats:
-                for team in (["blue", "red"] if game == "valorant" else [100, 200]):
-                    team_stats = [s for s in stats if s.get('team_id') == team]
-                    if team_stats:
-                        lowest = min(team_stats, key=lambda x: x.get('efficiency_score', 100))
-                        if lowest.get('efficiency_score', 100) < 80:
-                            mistakes.append({
-                                "player_id": lowest['player_id'],
-                                "type": "Suboptimal Resource Use",
-                                "timestamp": latest_frame['timestamp'],
-                                "impact": "Medium",
-                                "details": f"Player {lowest['player_id']} showing lower resource efficiency compared to team average."
-                            })
+            mistakes.extend(MicroAnalyticsEngine.resource_insights(stats, latest_frame['timestamp'], game))
 
         return mistakes
 
+    @staticmethod
+    def player_ids_from_columns(columns: Any) -> set:
+        """Player IDs present as p{id}_gold or p{id}_credits keys."""
+        p_ids = set()
+        for col in columns:
+            if col.startswith('p') and ('_gold' in col or '_credits' in col):
+                p_id = col.split('_')[0][1:]
+                p_ids.add(p_id)
+        return p_ids
+
+    @staticmethod
+    def count_player_kills(events_df: pd.DataFrame, game: str = "lol") -> tuple:
+        """Kills and headshot kills per killer ID (as string), matching the per-player event filters."""
+        if events_df is None or events_df.empty or 'killerId' not in events_df.columns:
+            return {}, {}
+        kills = events_df[events_df['type'] == ('KILL' if game == "valorant" else 'CHAMPION_KILL')]
+        killer_ids = kills['killerId'].astype(str)
+        kill_counts = killer_ids.value_counts().to_dict()
+        headshot_counts = {}
+        if game == "valorant" and 'headshot' in kills.columns:
+            headshot_counts = killer_ids[kills['headshot'] == True].value_counts().to_dict()
+        return kill_counts, headshot_counts
+
     @staticmethod
     def compute_player_efficiency(snapshots_df: pd.DataFrame, events_df: pd.DataFrame = None, game: str = "lol") -> List[Dict[str, Any]]:
         """Compute metrics like GPM, ACS, Econ Rating, etc. using available data."""
         if snapshots_df.empty:
             return []
-            
-        latest_frame = snapshots_df.iloc[-1]
+
+        kill_counts, headshot_counts = MicroAnalyticsEngine.count_player_kills(events_df, game)
+        return MicroAnalyticsEngine.build_player_stats(
+            snapshots_df.iloc[-1],
+            MicroAnalyticsEngine.player_ids_from_columns(snapshots_df.columns),
+            kill_counts, headshot_counts, game=game
+        )
+
+    @staticmethod
+    def cumulative_kill_counts(events_df: pd.DataFrame, timestamps: Any, game: str = "lol") -> tuple:
+        """
+        Kill and headshot counts per killer ID at each timestamp (events with
+        timestamp <= t), equivalent to count_player_kills on each prefix but from
+        one sort per killer and searchsorted. Returns two lists of dicts, one per timestamp.
+        """
+        timestamps = np.asarray(timestamps, dtype=float)
+        empty = [{} for _ in range(len(timestamps))]
+        if events_df is None or events_df.empty or 'killerId' not in events_df.columns:
+            return empty, [{} for _ in range(len(timestamps))]
+        kills = events_df[events_df['type'] == ('KILL' if game == "valorant" else 'CHAMPION_KILL')]
+        killer_ids = kills['killerId'].astype(str).to_numpy()
+        kill_ts = pd.to_numeric(kills['timestamp'], errors='coerce').to_numpy(dtype=float)
+        headshots = None
+        if game == "valorant" and 'headshot' in kills.columns:
+            headshots = (kills['headshot'] == True).to_numpy()
+
+        kill_counts, headshot_counts = empty, [{} for _ in range(len(timestamps))]
+        for killer_id in pd.unique(killer_ids):
+            mine = killer_ids == killer_id
+            counts = np.searchsorted(np.sort(kill_ts[mine]), timestamps, side='right')
+            for i in np.flatnonzero(counts):
+                kill_counts[i][killer_id] = int(counts[i])
+            if headshots is not None and headshots[mine].any():
+                hs_counts = np.searchsorted(np.sort(kill_ts[mine & headshots]), timestamps, side='right')
+                for i in np.flatnonzero(hs_counts):
+                    headshot_counts[i][killer_id] = int(hs_counts[i])
+        return kill_counts, headshot_counts
+
+    @staticmethod
+    def compute_player_efficiency_timeline(snapshots_df: pd.DataFrame, events_df: pd.DataFrame = None,
+                                           game: str = "lol") -> pd.DataFrame:
+        """
+        Timeline mode of compute_player_efficiency: stats for every (snapshot, player)
+        pair in one pass, with kills counted cumulatively up to each snapshot.
+        One row per pair, ordered by snapshot then player; `snapshot` is the
+        positional index into snapshots_df.
+        """
+        if snapshots_df.empty:
+            return pd.DataFrame(columns=["snapshot", "player_id"])
+
+        p_ids = sorted(MicroAnalyticsEngine.player_ids_from_columns(snapshots_df.columns))
+        stat_columns = ['timestamp'] + [c for c in snapshots_df.columns if c.startswith(('p', 'team'))
+                                        and c.split('_', 1)[-1] in MicroAnalyticsEngine.TIMELINE_STATS]
+        numeric = all(snapshots_df[c].dtype.kind in 'iuf' for c in stat_columns if c in snapshots_df.columns)
+        if p_ids and numeric and 'timestamp' in snapshots_df.columns:
+            return MicroAnalyticsEngine._efficiency_arrays(snapshots_df, events_df, p_ids, game)
+
+        # Players only listed in participantFrames or non-numeric stat columns: per-pair path
+        frames = snapshots_df.to_dict('records')
+        kill_counts, headshot_counts = MicroAnalyticsEngine.cumulative_kill_counts(
+            events_df, [frame.get('timestamp', 0) for frame in frames], game
+        )
+        records = []
+        for idx, frame in enumerate(frames):
+            for row in MicroAnalyticsEngine.build_player_stats(frame, set(p_ids), kill_counts[idx], headshot_counts[idx], game=game):
+                records.append({"snapshot": idx, **row})
+        return pd.DataFrame.from_records(records)
+
+    @staticmethod
+    def _efficiency_arrays(snapshots_df: pd.DataFrame, events_df: pd.DataFrame, p_ids: List[str], game: str) -> pd.DataFrame:
+        """build_player_stats over whole columns: one (snapshots x players) array per stat."""
+        n = len(snapshots_df)
+        timestamps = snapshots_df['timestamp'].to_numpy()
+        duration_min = np.maximum(timestamps / 60000, 1)
+        kills, headshots = MicroAnalyticsEngine._cumulative_kill_arrays(events_df, timestamps, p_ids, game)
+        participant_frames = [v if isinstance(v, dict) else {} for v in snapshots_df['participantFrames']] \
+            if 'participantFrames' in snapshots_df.columns else [{}] * n
+        hashes = np.array([stable_hash(pid) for pid in p_ids])
+
+        def column(name: str, default: Any = 0) -> np.ndarray:
+            return snapshots_df[name].to_numpy() if name in snapshots_df.columns else np.full(n, default)
+
+        def stat(suffix: str, fallback: str) -> np.ndarray:
+            # Zero values fall back to the snapshot's participant frame, as in build_player_stats
+            return np.column_stack([
+                MicroAnalyticsEngine._fill_from_participants(column(f'p{pid}_{suffix}'), participant_frames, pid, fallback)
+                for pid in p_ids
+            ])
+
+        def teams(blue: Any, red: Any) -> List[Any]:
+            return [blue if not pid.isdigit() or int(pid) <= 5 else red for pid in p_ids]
+
+        if game == "valorant":
+            credits, loadout = stat('credits', 'credits'), stat('loadout', 'loadoutValue')
+            hs_percent = np.where(kills > 0, headshots / np.maximum(kills, 1) * 100, 20 + hashes % 15)
+            if not (kills > 0).any():
+                hs_percent = hs_percent.astype(int)
+            stats = {
+                "team_id": np.tile(np.array(teams("blue", "red"), dtype=object), (n, 1)),
+                "acs": np.column_stack([column(f'p{pid}_acs', 150 + h % 150) for pid, h in zip(p_ids, hashes)]),
+                "adr": np.column_stack([column(f'p{pid}_adr', 100 + h % 100) for pid, h in zip(p_ids, hashes)]),
+                "credits": credits,
+                "loadout_value": loadout,
+                "headshot_percent": hs_percent,
+                "kill_participation": np.tile(50 + hashes % 40, (n, 1)),
+                "efficiency_score": np.minimum(100, np.trunc(60 + (kills * 5) + (hs_percent / 2)).astype(int)),
+            }
+        else:
+            gold = stat('gold', 'gold')
+            team_ids = teams(100, 200)
+            if (gold == 0).any():
+                team_gold = np.column_stack([column(f'team{team}_gold') for team in team_ids])
+                shared = (team_gold / 5) * (0.8 + (hashes % 5) * 0.1)
+                gold = np.where(gold == 0, shared, gold)
+            minions, jungle, wards = stat('minionsKilled', 'minionsKilled'), stat('jungleMinionsKilled', 'jungleMinionsKilled'), stat('wardsPlaced', 'wardsPlaced')
+            total_cs = minions + jungle
+            duration = duration_min[:, None]
+            stats = {
+                "team_id": np.tile(team_ids, (n, 1)),
+                "gpm": gold / duration,
+                "total_gold": gold,
+                "efficiency_score": np.minimum(100, np.trunc(70 + (gold / 500) + (total_cs / 2) + (kills * 2)).astype(int)),
+                "vision_score": wards * 2,
+                "kill_participation": np.tile(40 + hashes % 50, (n, 1)),
+                "damage_share": np.tile(10 + hashes % 20, (n, 1)),
+                "cs_per_min": total_cs / duration,
+                "total_cs": total_cs,
+                "kills": kills,
+            }
+
+        return pd.DataFrame({
+            "snapshot": np.repeat(np.arange(n), len(p_ids)),
+            "player_id": np.tile(np.array(p_ids, dtype=object), n),
+            **{name: values.ravel() for name, values in stats.items()},
+        })
+
+    @staticmethod
+    def _fill_from_participants(values: np.ndarray, participant_frames: List[Dict[str, Any]], pid: str,
+                                fallback: str) -> np.ndarray:
+        """Replace zero entries with the participant frame's stat; only those entries touch Python."""
+        rows = [i for i in np.flatnonzero(values == 0) if participant_frames[i]]
+        if not rows:
+            return values
+        filled = values.astype(object)
+        for i in rows:
+            p_frame = MicroAnalyticsEngine.participant(participant_frames[i], pid)
+            if p_frame:
+                filled[i] = MicroAnalyticsEngine.to_num(MicroAnalyticsEngine.fallback(p_frame, fallback))
+        # Same int/float inference as building the frame from per-pair records
+        return np.array(filled.tolist())
+
+    @staticmethod
+    def _cumulative_kill_arrays(events_df: pd.DataFrame, timestamps: np.ndarray, p_ids: List[str], game: str) -> tuple:
+        """cumulative_kill_counts as (snapshots x players) int arrays for the given player IDs."""
+        kills = np.zeros((len(timestamps), len(p_ids)), dtype=int)
+        headshots = np.zeros_like(kills)
+        if events_df is None or events_df.empty or 'killerId' not in events_df.columns:
+            return kills, headshots
+        events = events_df[events_df['type'] == ('KILL' if game == "valorant" else 'CHAMPION_KILL')]
+        killer_ids = events['killerId'].astype(str).to_numpy()
+        kill_ts = pd.to_numeric(events['timestamp'], errors='coerce').to_numpy(dtype=float)
+        headshot = (events['headshot'] == True).to_numpy() if game == "valorant" and 'headshot' in events.columns else None
+        timestamps = np.asarray(timestamps, dtype=float)
+        for j, pid in enumerate(p_ids):
+            mine = killer_ids == pid
+            kills[:, j] = np.searchsorted(np.sort(kill_ts[mine]), timestamps, side='right')
+            if headshot is not None:
+                headshots[:, j] = np.searchsorted(np.sort(kill_ts[mine & headshot]), timestamps, side='right')
+        return kills, headshots
+
+    @staticmethod
+    def player_stats_by_snapshot(timeline: pd.DataFrame, n_snapshots: int) -> List[List[Dict[str, Any]]]:
+        """Split a compute_player_efficiency_timeline frame into per-snapshot stat lists."""
+        by_snapshot = [[] for _ in range(n_snapshots)]
+        if timeline.empty:
+            return by_snapshot
+        for row in timeline.to_dict('records'):
+            by_snapshot[row.pop("snapshot")].append(row)
+        return by_snapshot
+
+    @staticmethod
+    def build_player_stats(latest_frame: Any, p_ids: set, kill_counts: Dict[str, int],
+                           headshot_counts: Dict[str, int], game: str = "lol") -> List[Dict[str, Any]]:
+        """Per-player stats from the latest frame and cumulative kill counters."""
         # Avoid division by zero
         duration_min = max(latest_frame['timestamp'] / 60000, 1)
         
@@ -123,13 +420,6 @@ class MicroAnalyticsEngine:
         participant_frames = latest_frame.get("participantFrames")
         if not isinstance(participant_frames, dict):
             participant_frames = {}
-        
-        # Instead of range(1, 11), let's find all p{id}_gold or p{id}_credits keys
-        p_ids = set()
-        for col in snapshots_df.columns:
-            if col.startswith('p') and ('_gold' in col or '_credits' in col):
-                p_id = col.split('_')[0][1:]
-                p_ids.add(p_id)
 
         # If we still don't have p_ids, try participantFrames keys
         if not p_ids and participant_frames:
@@ -139,16 +429,12 @@ class MicroAnalyticsEngine:
         if not p_ids:
             p_ids = [str(i) for i in range(1, 11)]
 
+        to_num = MicroAnalyticsEngine.to_num
+        fallback = MicroAnalyticsEngine.fallback
+
         def get_participant(pid_str: str) -> Dict[str, Any]:
-            if not participant_frames:
-                return {}
-            return (
-                participant_frames.get(pid_str)
-                or participant_frames.get(str(pid_str))
-                or participant_frames.get(int(pid_str))
-                or {}
-            )
-            
+            return MicroAnalyticsEngine.participant(participant_frames, pid_str)
+
         for pid_str in sorted(list(p_ids)):
             if game == "valorant":
                 # Try to determine team from pid if possible
@@ -158,34 +444,24 @@ class MicroAnalyticsEngine:
                 except:
                     team_id = "blue" # Fallback
                 
-                # Ensure we have numbers for stats
-                def to_num(v):
-                    if isinstance(v, (int, float)): return v
-                    if isinstance(v, dict):
-                        for k in ["total", "amount", "current", "count", "value"]:
-                            if isinstance(v.get(k), (int, float)): return v[k]
-                    try: return float(v)
-                    except: return 0
-
                 credits = to_num(latest_frame.get(f'p{pid_str}_credits', 0))
                 loadout = to_num(latest_frame.get(f'p{pid_str}_loadout', 0))
 
                 if credits == 0 or loadout == 0:
                     p_frame = get_participant(pid_str)
                     if p_frame:
-                        credits = credits or to_num(p_frame.get("credits") or p_frame.get("money") or p_frame.get("netWorth") or p_frame.get("stats", {}).get("credits"))
-                        loadout = loadout or to_num(p_frame.get("loadoutValue") or p_frame.get("stats", {}).get("loadoutValue"))
+                        credits = credits or to_num(fallback(p_frame, "credits"))
+                        loadout = loadout or to_num(fallback(p_frame, "loadoutValue"))
                 
                 # Use real events if available
-                player_kills = events_df[(events_df['type'] == 'KILL') & (events_df['killerId'].astype(str) == pid_str)] if events_df is not None and not events_df.empty and 'killerId' in events_df.columns else pd.DataFrame()
-                kills_count = len(player_kills)
-                hs_kills = len(player_kills[player_kills['headshot'] == True]) if not player_kills.empty and 'headshot' in player_kills.columns else 0
+                kills_count = kill_counts.get(pid_str, 0)
+                hs_kills = headshot_counts.get(pid_str, 0)
                 
-                hs_percent = (hs_kills / kills_count * 100) if kills_count > 0 else (20 + (hash(pid_str) % 15))
+                hs_percent = (hs_kills / kills_count * 100) if kills_count > 0 else (20 + (stable_hash(pid_str) % 15))
                 
                 # If we have real stats in the latest_frame (e.g. from Statistics API)
-                acs = latest_frame.get(f'p{pid_str}_acs', 150 + (hash(pid_str) % 150))
-                adr = latest_frame.get(f'p{pid_str}_adr', 100 + (hash(pid_str) % 100))
+                acs = latest_frame.get(f'p{pid_str}_acs', 150 + (stable_hash(pid_str) % 150))
+                adr = latest_frame.get(f'p{pid_str}_adr', 100 + (stable_hash(pid_str) % 100))
                 
                 stats.append({
                     "player_id": pid_str,
@@ -195,7 +471,7 @@ class MicroAnalyticsEngine:
                     "credits": credits,
                     "loadout_value": loadout,
                     "headshot_percent": hs_percent,
-                    "kill_participation": 50 + (hash(pid_str) % 40),
+                    "kill_participation": 50 + (stable_hash(pid_str) % 40),
                     "efficiency_score": min(100, int(60 + (kills_count * 5) + (hs_percent / 2)))
                 })
             else:
@@ -205,22 +481,13 @@ class MicroAnalyticsEngine:
                 except:
                     team_id = 100
                     
-                # Ensure we have numbers for stats
-                def to_num(v):
-                    if isinstance(v, (int, float)): return v
-                    if isinstance(v, dict):
-                        for k in ["total", "amount", "current", "count", "value"]:
-                            if isinstance(v.get(k), (int, float)): return v[k]
-                    try: return float(v)
-                    except: return 0
-
                 player_gold = to_num(latest_frame.get(f'p{pid_str}_gold', 0))
                 p_frame = get_participant(pid_str)
                 if player_gold == 0 and p_frame:
-                    player_gold = to_num(p_frame.get("totalGold") or p_frame.get("gold") or p_frame.get("stats", {}).get("gold"))
+                    player_gold = to_num(fallback(p_frame, "gold"))
                 if player_gold == 0: # Fallback if individual gold not in snapshot
                     team_gold_val = latest_frame.get(f'team100_gold' if team_id == 100 else f'team200_gold', 0)
-                    player_gold = (to_num(team_gold_val) / 5) * (0.8 + (hash(pid_str) % 5) * 0.1)
+                    player_gold = (to_num(team_gold_val) / 5) * (0.8 + (stable_hash(pid_str) % 5) * 0.1)
                 
                 player_minions = to_num(latest_frame.get(f'p{pid_str}_minionsKilled', 0))
                 player_jungle = to_num(latest_frame.get(f'p{pid_str}_jungleMinionsKilled', 0))
@@ -228,16 +495,16 @@ class MicroAnalyticsEngine:
 
                 if p_frame:
                     if player_minions == 0:
-                        player_minions = to_num(p_frame.get("minionsKilled") or p_frame.get("unitKills") or p_frame.get("stats", {}).get("minionsKilled"))
+                        player_minions = to_num(fallback(p_frame, "minionsKilled"))
                     if player_jungle == 0:
-                        player_jungle = to_num(p_frame.get("jungleMinionsKilled") or p_frame.get("stats", {}).get("jungleMinionsKilled"))
+                        player_jungle = to_num(fallback(p_frame, "jungleMinionsKilled"))
                     if player_wards == 0:
-                        player_wards = to_num(p_frame.get("wardsPlaced") or p_frame.get("visionScore") or p_frame.get("stats", {}).get("wardsPlaced") or p_frame.get("stats", {}).get("visionScore"))
+                        player_wards = to_num(fallback(p_frame, "wardsPlaced"))
                 
                 total_cs = player_minions + player_jungle
                 
                 # Use real events for kills
-                kills_count = len(events_df[(events_df['type'] == 'CHAMPION_KILL') & (events_df['killerId'].astype(str) == pid_str)]) if events_df is not None and not events_df.empty and 'killerId' in events_df.columns else 0
+                kills_count = kill_counts.get(pid_str, 0)
                 
                 stats.append({
                     "player_id": pid_str,
@@ -246,8 +513,8 @@ class MicroAnalyticsEngine:
                     "total_gold": player_gold,
                     "efficiency_score": min(100, int(70 + (player_gold / 500) + (total_cs / 2) + (kills_count * 2))),
                     "vision_score": player_wards * 2,
-                    "kill_participation": 40 + (hash(pid_str) % 50),
-                    "damage_share": 10 + (hash(pid_str) % 20),
+                    "kill_participation": 40 + (stable_hash(pid_str) % 50),
+                    "damage_share": 10 + (stable_hash(pid_str) % 20),
                     "cs_per_min": total_cs / duration_min,
                     "total_cs": total_cs,
                     "kills": kills_count
@@ -0,0 +1,148 @@
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .normalization import PLAYER_STAT_COLUMNS, Normalizer
+from .utils import clean_json_data
+
+logger = logging.getLogger("decision-lens.columnar")
+
+# Wide player columns written by normalize_timeline: p{id}_{stat}
+_PLAYER_STATS = sorted({stat for stats in PLAYER_STAT_COLUMNS.values() for stat in stats} | {"position"})
+_PLAYER_COLUMN = re.compile(rf"^p(?P<pid>.+)_(?P<stat>{'|'.join(_PLAYER_STATS)})$")
+
+# Raw per-frame payload already covered by the p{id}_* columns
+DROPPED_COLUMNS = ("participantFrames",)
+
+
+class ColumnarTimeline:
+    """
+    Struct-of-arrays alternative to the list-of-dicts timeline_snapshots: one array per
+    snapshot metric, snapshot x player arrays on a shared player axis, and
+    dictionary-encoded IDs. Arrays come straight from the DataFrames/NumPy results with
+    NaN/Inf replaced by 0 in bulk (as clean_json_data does per value), so the result is
+    already JSON-safe and skips clean_json_data.
+    """
+
+    @staticmethod
+    def _sanitize(values: np.ndarray) -> np.ndarray:
+        if values.dtype.kind == "f":
+            return np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0)
+        if values.dtype.kind == "b":
+            return values.astype(np.int8)
+        return values
+
+    @staticmethod
+    def _encoded(values: np.ndarray) -> Dict[str, Any]:
+        """Non-numeric values as a dictionary plus integer codes of the same shape."""
+        flat = np.asarray(values, dtype=object).ravel()
+        if pd.api.types.infer_dtype(flat, skipna=True) != "string":
+            # str() for every value in one astype, then None/NaN back to None by mask
+            strings = flat.astype(str).astype(object)
+            strings[pd.isna(flat)] = None
+            flat = strings
+        codes, dictionary = pd.factorize(flat, use_na_sentinel=True)
+        return {"dictionary": dictionary.tolist(), "codes": codes.reshape(values.shape).tolist()}
+
+    @staticmethod
+    def _array(values: np.ndarray) -> Any:
+        if values.dtype.kind in "iufb":
+            return ColumnarTimeline._sanitize(values).tolist()
+        return ColumnarTimeline._encoded(values)
+
+    @staticmethod
+    def _player_order(ids: List[str]) -> List[str]:
+        # Numeric participant IDs in numeric order, anything else after them
+        return sorted(set(ids), key=lambda pid: (0, int(pid), "") if pid.isdigit() else (1, 0, pid))
+
+    @staticmethod
+    def encode(snapshots: pd.DataFrame, win_prob: Optional[np.ndarray] = None,
+               stats_timeline: Optional[pd.DataFrame] = None, shap_values: Optional[np.ndarray] = None,
+               feature_names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        {"format": "columnar", "length": n, "columns": {metric: [n]},
+         "players": {"ids": [p], "team_ids": [p], "columns": {stat: [n][p]}, "stats": {stat: [n][p]}},
+         "shap": {"features": [f], "values": [n][f]}}
+        players.columns holds the normalized p{id}_* stats (positions as position_x/position_y)
+        and players.stats the per-snapshot player_stats; non-numeric values are
+        {"dictionary": [...], "codes": [...]} with -1 for missing.
+        """
+        n = len(snapshots)
+        scalar: Dict[str, np.ndarray] = {}
+        wide: Dict[str, Dict[str, str]] = {}
+        for column in snapshots.columns:
+            if column in DROPPED_COLUMNS:
+                continue
+            match = _PLAYER_COLUMN.match(column)
+            if match:
+                wide.setdefault(match.group("stat"), {})[match.group("pid")] = column
+            else:
+                scalar[column] = snapshots[column].to_numpy()
+        if win_prob is not None:
+            scalar["win_prob"] = np.asarray(win_prob, dtype=float)
+
+        stats = stats_timeline if stats_timeline is not None and not stats_timeline.empty else None
+        player_ids = ColumnarTimeline._player_order(
+            [pid for columns in wide.values() for pid in columns]
+            + (stats["player_id"].astype(str).tolist() if stats is not None else [])
+        )
+        index = {pid: i for i, pid in enumerate(player_ids)}
+
+        player_columns = {}
+        for stat, columns in wide.items():
+            frame = snapshots[[columns[pid] for pid in player_ids if pid in columns]]
+            if stat == "position":
+                # Position objects -> two numeric arrays; the only per-cell Python step
+                xy = np.array([[Normalizer._position_xy(pos) for pos in row] for row in frame.itertuples(index=False)],
+                              dtype=float).reshape(n, frame.shape[1], 2)
+                planes = {"position_x": xy[:, :, 0], "position_y": xy[:, :, 1]}
+            else:
+                planes = {stat: frame.to_numpy()}
+            positions = [index[pid] for pid in player_ids if pid in columns]
+            for name, plane in planes.items():
+                if len(positions) != len(player_ids):
+                    # Players without this column get 0, as fillna(0) gives the row format
+                    full = np.zeros((n, len(player_ids)), dtype=plane.dtype if plane.dtype.kind in "iufb" else object)
+                    full[:, positions] = plane
+                    plane = full
+                player_columns[name] = ColumnarTimeline._array(plane)
+
+        team_ids: List[Any] = [None] * len(player_ids)
+        player_stats = {}
+        if stats is not None:
+            rows = stats["snapshot"].to_numpy()
+            cols = stats["player_id"].astype(str).map(index).to_numpy()
+            if "team_id" in stats.columns:
+                first = stats.drop_duplicates("player_id")
+                for pid, team in zip(first["player_id"].astype(str), first["team_id"]):
+                    team_ids[index[pid]] = clean_json_data(team)
+            for column in stats.columns:
+                if column in ("snapshot", "player_id", "team_id"):
+                    continue
+                values = stats[column].to_numpy()
+                numeric = values.dtype.kind in "iufb"
+                plane = np.zeros((n, len(player_ids)), dtype=values.dtype if numeric else object)
+                if not numeric:
+                    plane[:] = None
+                plane[rows, cols] = values
+                player_stats[column] = ColumnarTimeline._array(plane)
+
+        result = {
+            "format": "columnar",
+            "length": n,
+            "columns": {name: ColumnarTimeline._array(values) for name, values in scalar.items()},
+            "players": {"ids": player_ids, "team_ids": team_ids, "columns": player_columns, "stats": player_stats},
+        }
+        if shap_values is not None:
+            result["shap"] = {
+                "features": list(feature_names or []),
+                "values": ColumnarTimeline._sanitize(np.asarray(shap_values, dtype=float)).tolist(),
+            }
+        return result
+
+
+# Singleton instance
+columnar_timeline = ColumnarTimeline()
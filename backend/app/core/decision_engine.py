@@ -1,43 +1,226 @@
-import xgboost as xgb
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
-import shap
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+from .features import FEATURE_NAMES
+
+# xgboost and shap take ~2s to import, so they are imported on first model use
+# (normally the lifespan warm-up thread) rather than when the app is imported.
+# shap is optional: EXPLAINER_BACKEND=native uses XGBoost's own TreeSHAP instead.
+EXPLAINER_BACKENDS = ("shap", "native")
+
+logger = logging.getLogger("decision-lens.model")
+
+# Bump when training data, hyperparameters or features change so old artifacts are retrained
+MODEL_ARTIFACT_VERSION = 1
+DEFAULT_MODEL_DIR = Path(__file__).resolve().parents[2] / "data" / "models"
+
+# Base-state resolution for cached sensitivity surfaces; unlisted features use 1
+SURFACE_QUANTA = {"gold_diff": 100, "xp_diff": 100, "time_seconds": 30}
+
+# Per-process booster/explainer used by pool workers for chunked bulk explanations
+_worker_booster = None
+_worker_explainer = None
+
+def _init_explain_worker(model_raw: bytearray, backend: str = "shap"):
+    import xgboost as xgb
+    global _worker_booster, _worker_explainer
+    _worker_booster = xgb.Booster()
+    _worker_booster.load_model(model_raw)
+    if backend == "shap":
+        import shap
+        _worker_explainer = shap.TreeExplainer(_worker_booster)
+
+def _explain_chunk(matrix: np.ndarray) -> np.ndarray:
+    if _worker_explainer is None:
+        return DecisionEngine._native_contributions(_worker_booster, matrix)
+    return DecisionEngine._positive_class_shap(_worker_explainer.shap_values(matrix))
 
 class DecisionEngine:
     def __init__(self):
         self.model = None
-        self.explainer = None
+        self._explainer = None
         # Real-world features for LoL/Valorant decision impact
-        self.feature_names = [
-            "gold_diff", "xp_diff", "towers_diff", "dragons_diff", 
-            "barons_diff", "time_seconds", "team100_kills", "team200_kills"
-        ]
-        # Try to train on initialization if we can
+        self.feature_names = list(FEATURE_NAMES)
+        # Bulk SHAP: rows per chunk and pool size (1 = explain in-process)
+        self.explain_chunk_size = int(os.getenv("SHAP_CHUNK_SIZE", "1000"))
+        self.explain_workers = int(os.getenv("SHAP_WORKERS", "1"))
+        self._explain_pool: Optional[ProcessPoolExecutor] = None
+        self.explainer_backend = self._resolve_explainer_backend(os.getenv("EXPLAINER_BACKEND", "shap"))
+        # Upper bound on counterfactual points scored per sweep request
+        self.sweep_max_points = int(os.getenv("SWEEP_MAX_POINTS", "20000"))
+        # LRU of sensitivity surfaces keyed on model version + quantized base state
+        self.surface_cache_size = int(os.getenv("SURFACE_CACHE_SIZE", "128"))
+        self._surface_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._surface_lock = threading.Lock()
+        self.surface_hits = 0
+        self.surface_misses = 0
+        # Seeded so every worker process trains the same model
+        self.model_seed = int(os.getenv("MODEL_SEED", "42"))
+        self.model_version: Optional[str] = None
+        # The model is loaded (or trained once and saved) on first use or by warm_up(),
+        # never at import time
+        self.model_dir = Path(os.getenv("MODEL_DIR") or DEFAULT_MODEL_DIR)
+        self.model_source: Optional[str] = None
+        self.ready = False
+        self.warmup_seconds: Optional[float] = None
+        self.warmup_error: Optional[str] = None
+        self._model_lock = threading.RLock()
+        self._booster = None
+        # Per-thread (1, n_features) row reused by single-state inference
+        self._buffers = threading.local()
+
+    @staticmethod
+    def _resolve_explainer_backend(backend: str) -> str:
+        backend = (backend or "shap").lower()
+        if backend not in EXPLAINER_BACKENDS:
+            logger.warning(f"Unknown EXPLAINER_BACKEND {backend!r}, using shap")
+            backend = "shap"
+        # find_spec checks availability without paying for the import
+        if backend == "shap" and importlib.util.find_spec("shap") is None:
+            logger.warning("shap is not installed, using native XGBoost contributions")
+            backend = "native"
+        return backend
+
+    @property
+    def explainer(self):
+        """shap TreeExplainer for the current model, built on first use (~20ms)."""
+        if self._explainer is None:
+            self.ensure_model()
+            with self._model_lock:
+                if self._explainer is None:
+                    import shap
+                    self._explainer = shap.TreeExplainer(self.model)
+        return self._explainer
+
+    def artifact_path(self) -> Path:
+        return self.model_dir / f"decision_model_v{MODEL_ARTIFACT_VERSION}_seed{self.model_seed}.ubj"
+
+    def _set_model(self, model: Any, source: str):
+        self.model = model
+        self._booster = model.get_booster()
+        # Identifies the trained weights, e.g. in review cache keys
+        self.model_version = hashlib.sha256(bytes(model.get_booster().save_raw())).hexdigest()[:16]
+        self.model_source = source
+        self._explainer = None
+        with self._surface_lock:
+            self._surface_cache.clear()
+        # Workers hold a copy of the old model, so drop the pool on retrain
+        self.close()
+
+    def ensure_model(self):
+        if self.model is None:
+            with self._model_lock:
+                if self.model is None:
+                    self.load_or_train()
+
+    def load_or_train(self) -> str:
+        """Load the persisted model artifact, or train and save one if it is missing or stale."""
+        import xgboost as xgb
+        path = self.artifact_path()
+        meta_path = path.with_suffix(".meta.json")
         try:
-            self.train_on_real_patterns()
-        except Exception:
-            pass
+            meta = json.loads(meta_path.read_text())
+            if meta.get("artifact_version") == MODEL_ARTIFACT_VERSION and meta.get("feature_names") == self.feature_names:
+                model = xgb.XGBClassifier()
+                model.load_model(path)
+                self._set_model(model, "artifact")
+                logger.info(f"Loaded model {self.model_version} from {path}")
+                return self.model_source
+            logger.info(f"Model artifact {path} is stale, retraining")
+        except FileNotFoundError:
+            logger.info(f"No model artifact at {path}, training")
+        except (OSError, ValueError, xgb.core.XGBoostError) as e:
+            logger.warning(f"Could not load model artifact {path}: {e}")
+
+        self.train_on_real_patterns()
+        try:
+            self.save_model(path)
+        except OSError as e:
+            logger.warning(f"Could not save model artifact {path}: {e}")
+        return self.model_source
+
+    def save_model(self, path: Optional[Path] = None):
+        """Write the booster plus a manifest; written atomically so concurrent workers never read a partial file."""
+        import xgboost as xgb
+        path = Path(path or self.artifact_path())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.ubj")
+        self.model.save_model(tmp)
+        os.replace(tmp, path)
+        meta = {
+            "artifact_version": MODEL_ARTIFACT_VERSION,
+            "model_version": self.model_version,
+            "seed": self.model_seed,
+            "feature_names": self.feature_names,
+            "xgboost_version": xgb.__version__,
+            "saved_at": time.time(),
+        }
+        meta_path = path.with_suffix(".meta.json")
+        tmp_meta = path.with_suffix(f".{os.getpid()}.meta.json")
+        tmp_meta.write_text(json.dumps(meta, indent=2))
+        os.replace(tmp_meta, meta_path)
+
+    def warm_up(self) -> Dict[str, Any]:
+        """Load the model, build the explainer and prime the first prediction/explanation."""
+        start = time.perf_counter()
+        try:
+            self.ensure_model()
+            probe = {name: 0 for name in self.feature_names}
+            self.predict_win_probability(probe)
+            self.explain_decision(probe)
+            self.ready = True
+            self.warmup_error = None
+        except Exception as e:
+            self.warmup_error = str(e)
+            logger.error(f"Model warm-up failed: {e}", exc_info=True)
+        self.warmup_seconds = time.perf_counter() - start
+        if self.ready:
+            logger.info(f"Model {self.model_version} ready ({self.model_source}) in {self.warmup_seconds:.3f}s")
+        return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "model_loaded": self.model is not None,
+            "model_version": self.model_version,
+            "model_source": self.model_source,
+            "explainer_backend": self.explainer_backend,
+            "artifact": str(self.artifact_path()),
+            "warmup_seconds": self.warmup_seconds,
+            "error": self.warmup_error,
+        }
 
     def train_on_real_patterns(self):
         """Train a model on data patterns derived from real esports matches."""
+        import xgboost as xgb
         # Generate patterns based on common esports win-probability curves
         n_samples = 5000
+        rng = np.random.default_rng(self.model_seed)
         
         # Gold diff usually ranges from -15k to +15k
-        gold_diff = np.random.normal(0, 5000, n_samples)
+        gold_diff = rng.normal(0, 5000, n_samples)
         # XP diff usually follows gold diff
-        xp_diff = gold_diff * 0.7 + np.random.normal(0, 1000, n_samples)
+        xp_diff = gold_diff * 0.7 + rng.normal(0, 1000, n_samples)
         # Time in seconds (0 to 45 mins)
-        time_seconds = np.random.randint(0, 2700, n_samples)
+        time_seconds = rng.integers(0, 2700, n_samples)
         
         # Objectives
-        towers_diff = np.clip((gold_diff / 1500).astype(int) + np.random.randint(-2, 3, n_samples), -11, 11)
-        dragons_diff = np.clip((time_seconds / 600).astype(int) * np.sign(gold_diff).astype(int) + np.random.randint(-1, 2, n_samples), -7, 7)
+        towers_diff = np.clip((gold_diff / 1500).astype(int) + rng.integers(-2, 3, n_samples), -11, 11)
+        dragons_diff = np.clip((time_seconds / 600).astype(int) * np.sign(gold_diff).astype(int) + rng.integers(-1, 2, n_samples), -7, 7)
         barons_diff = np.clip((time_seconds / 1200).astype(int) * np.sign(gold_diff).astype(int), -3, 3)
         
-        team100_kills = np.random.randint(0, 50, n_samples)
-        team200_kills = np.clip(team100_kills - (gold_diff / 300).astype(int) + np.random.randint(-5, 6, n_samples), 0, 60)
+        team100_kills = rng.integers(0, 50, n_samples)
+        team200_kills = np.clip(team100_kills - (gold_diff / 300).astype(int) + rng.integers(-5, 6, n_samples), 0, 60)
 
         data = {
             "gold_diff": gold_diff,
@@ -61,94 +244,169 @@ class DecisionEngine:
                  (X["team100_kills"] - X["team200_kills"]) * 0.05)
         
         prob = 1 / (1 + np.exp(-logit))
-        y = (prob > np.random.rand(n_samples)).astype(int)
+        y = (prob > rng.random(n_samples)).astype(int)
         
-        self.model = xgb.XGBClassifier(
+        model = xgb.XGBClassifier(
             n_estimators=100, 
             max_depth=4, 
             learning_rate=0.1,
             subsample=0.8,
-            colsample_bytree=0.8
+            colsample_bytree=0.8,
+            random_state=self.model_seed
         )
-        self.model.fit(X, y)
-        self.explainer = shap.TreeExplainer(self.model)
+        model.fit(X, y)
+        self._set_model(model, "trained")
+
+    def _state_vector(self, game_state: Dict[str, Any]) -> np.ndarray:
+        """
+        One state as a (1, n_features) float row, in feature order, with missing or
+        NaN values as 0 (same as the DataFrame + fillna(0) path, without pandas).
+        The row is a buffer reused by the calling thread.
+        """
+        out = getattr(self._buffers, "row", None)
+        if out is None:
+            out = self._buffers.row = np.zeros((1, len(self.feature_names)))
+        for i, name in enumerate(self.feature_names):
+            value = game_state.get(name)
+            out[0, i] = 0.0 if value is None or value != value else value
+        return out
+
+    def _to_matrix(self, game_states: Union[List[Dict[str, Any]], pd.DataFrame, np.ndarray]) -> np.ndarray:
+        """Accept a list of state dicts, a feature DataFrame or an N x 8 matrix; returns N x 8 floats."""
+        if isinstance(game_states, pd.DataFrame):
+            return game_states.reindex(columns=self.feature_names).fillna(0).to_numpy(dtype=float)
+        if isinstance(game_states, np.ndarray):
+            matrix = game_states.reshape(-1, len(self.feature_names)).astype(float)
+            matrix[np.isnan(matrix)] = 0
+            return matrix
+        # None -> NaN under dtype=float, then NaN -> 0 as with fillna(0)
+        matrix = np.array([[state.get(name) for name in self.feature_names] for state in game_states], dtype=float)
+        matrix[np.isnan(matrix)] = 0
+        return matrix
 
     def predict_win_probability(self, game_state: Dict[str, Any]) -> float:
-        if self.model is None:
-            self.train_on_real_patterns()
-            
-        df = pd.DataFrame([game_state], columns=self.feature_names).fillna(0)
-        prob = self.model.predict_proba(df)[0][1]
+        self.ensure_model()
+        # In-place prediction on a NumPy row: no DataFrame/DMatrix per call
+        prob = self._booster.inplace_predict(self._state_vector(game_state))[0]
         return float(prob)
 
-    def predict_bulk_probabilities(self, game_states: List[Dict[str, Any]]) -> List[float]:
-        if self.model is None:
-            self.train_on_real_patterns()
-        if not game_states:
+    def predict_bulk_probabilities(self, game_states: Union[List[Dict[str, Any]], pd.DataFrame, np.ndarray]) -> List[float]:
+        self.ensure_model()
+        if len(game_states) == 0:
             return []
-        df = pd.DataFrame(game_states, columns=self.feature_names).fillna(0)
-        probs = self.model.predict_proba(df)[:, 1]
-        return [float(p) for p in probs]
+        probs = self._booster.inplace_predict(self._to_matrix(game_states))
+        return probs.tolist()
 
-    def explain_decision(self, game_state: Dict[str, Any]) -> Dict[str, float]:
-        """Use SHAP to explain why the win probability is what it is."""
-        if self.explainer is None:
-            self.train_on_real_patterns()
-            
-        df = pd.DataFrame([game_state], columns=self.feature_names).fillna(0)
-        shap_values = self.explainer.shap_values(df)
-        
+    @staticmethod
+    def _positive_class_shap(shap_values: Any) -> np.ndarray:
+        """Normalize SHAP output across versions to an (n_samples, n_features) array."""
         # In newer SHAP versions for binary classification, shap_values might be a list
         if isinstance(shap_values, list):
             # For binary classification, index 1 is for the positive class
-            current_shap = shap_values[1][0] if len(shap_values) > 1 else shap_values[0][0]
-        else:
-            # If it's a single array, it might be (n_samples, n_features) or (n_samples, n_features, n_classes)
-            if len(shap_values.shape) == 3:
-                current_shap = shap_values[0, :, 1]
-            else:
-                current_shap = shap_values[0]
+            return np.asarray(shap_values[1] if len(shap_values) > 1 else shap_values[0])
+        # If it's a single array, it might be (n_samples, n_features) or (n_samples, n_features, n_classes)
+        if len(shap_values.shape) == 3:
+            return shap_values[:, :, 1]
+        return shap_values
+
+    @staticmethod
+    def _native_contributions(booster: Any, matrix: np.ndarray) -> np.ndarray:
+        """Exact TreeSHAP values (log-odds) from XGBoost itself; drops the trailing bias column."""
+        import xgboost as xgb
+        dmatrix = xgb.DMatrix(matrix, feature_names=booster.feature_names)
+        return booster.predict(dmatrix, pred_contribs=True)[:, :-1]
+
+    def _contributions(self, matrix: np.ndarray) -> np.ndarray:
+        """(n_samples, n_features) float64 contributions from the configured explainer backend."""
+        if self.explainer_backend == "native":
+            self.ensure_model()
+            return self._native_contributions(self._booster, matrix).astype(float)
+        return self._positive_class_shap(self.explainer.shap_values(matrix)).astype(float)
+
+    def explain_decision(self, game_state: Dict[str, Any]) -> Dict[str, float]:
+        """Use SHAP to explain why the win probability is what it is."""
+        row = self._state_vector(game_state)
+        current_shap = self._contributions(row)[0]
 
         # Return feature contributions
         explanations = {k: float(v) for k, v in zip(self.feature_names, current_shap)}
         return explanations
 
+    def explain_bulk_decisions(self, game_states: Union[List[Dict[str, Any]], pd.DataFrame, np.ndarray],
+                               max_workers: Optional[int] = None) -> List[Dict[str, float]]:
+        """Per-snapshot {feature: contribution} dicts for explain_bulk_values."""
+        if len(game_states) == 0:
+            return []
+        return [
+            {k: float(v) for k, v in zip(self.feature_names, row)}
+            for row in self.explain_bulk_values(game_states, max_workers)
+        ]
+
+    def explain_bulk_values(self, game_states: Union[List[Dict[str, Any]], pd.DataFrame, np.ndarray],
+                            max_workers: Optional[int] = None) -> np.ndarray:
+        """
+        Explain an N x 8 feature matrix with a single SHAP call; returns the N x 8
+        contributions in feature_names order.
+        Series longer than one chunk are split across a process pool when
+        more than one worker is configured.
+        """
+        self.ensure_model()
+        if len(game_states) == 0:
+            return np.zeros((0, len(self.feature_names)))
+
+        matrix = self._to_matrix(game_states)
+        workers = self.explain_workers if max_workers is None else max_workers
+        chunk = max(self.explain_chunk_size, 1)
+
+        if workers > 1 and len(matrix) > chunk:
+            if self._explain_pool is None:
+                self._explain_pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_explain_worker,
+                    initargs=(self._booster.save_raw(), self.explainer_backend)
+                )
+            chunks = [matrix[i:i + chunk] for i in range(0, len(matrix), chunk)]
+            values = np.vstack(list(self._explain_pool.map(_explain_chunk, chunks)))
+        else:
+            values = self._contributions(matrix)
+        return values
+
+    def close(self):
+        """Shut down the bulk explanation pool, if one was started."""
+        if self._explain_pool is not None:
+            self._explain_pool.shutdown(wait=False, cancel_futures=True)
+            self._explain_pool = None
+
     def what_if_analysis(self, current_state: Dict[str, Any], modification: Dict[str, Any]) -> Dict[str, Any]:
         """
         Compare current win probability with a modified state.
         Example modification: {"dragons_diff": current_state["dragons_diff"] + 1}
         """
-        current_prob = self.predict_win_probability(current_state)
-        
         modified_state = current_state.copy()
         modified_state.update(modification)
-        
-        modified_prob = self.predict_win_probability(modified_state)
-        
+
+        # Both states in one predict call and one explain call
+        self.ensure_model()
+        matrix = self._to_matrix([current_state, modified_state])
+        current_prob, modified_prob = self._booster.inplace_predict(matrix).tolist()
+        contributions = self._contributions(matrix)
+
         return {
             "current_probability": current_prob,
             "modified_probability": modified_prob,
             "delta": modified_prob - current_prob,
             "modified_state": modified_state,
-            "explanation": self._explain_delta(current_state, modified_state)
+            "explanation": self._explain_delta(current_prob, modified_prob, contributions[1] - contributions[0])
         }
 
-    def _explain_delta(self, before: Dict[str, Any], after: Dict[str, Any]) -> str:
+    def _explain_delta(self, prob_before: float, prob_after: float, impact_shifts: np.ndarray) -> str:
         """Generate a natural language explanation of the probability shift."""
         # This is a simplified XAI heuristic
-        prob_before = self.predict_win_probability(before)
-        prob_after = self.predict_win_probability(after)
         delta = prob_after - prob_before
-        
-        shap_before = self.explain_decision(before)
-        shap_after = self.explain_decision(after)
-        
+
         # Find which feature shifted the most in impact
-        impact_shifts = {}
-        for feature in self.feature_names:
-            impact_shifts[feature] = shap_after.get(feature, 0) - shap_before.get(feature, 0)
-        
-        top_driver = max(impact_shifts.items(), key=lambda x: abs(x[1]))
+        top = int(np.argmax(np.abs(impact_shifts)))
+        top_driver = (self.feature_names[top], float(impact_shifts[top]))
         
         direction = "increase" if delta > 0 else "decrease"
         magnitude = abs(delta) * 100
@@ -165,5 +423,203 @@ class DecisionEngine:
             
         return explanation
 
+    def _feature_index(self, feature: str) -> int:
+        try:
+            return self.feature_names.index(feature)
+        except ValueError:
+            raise ValueError(f"Unknown feature {feature!r}; expected one of {self.feature_names}")
+
+    @staticmethod
+    def _sweep_values(spec: Union[List[float], Dict[str, Any]], max_points: int) -> tuple:
+        """
+        Values for one swept feature and whether they are offsets from the base state.
+        `spec` is a list of values or {"start", "stop", "step" | "num", "relative"}; stop is inclusive.
+        """
+        if isinstance(spec, (list, tuple)):
+            if len(spec) > max_points:
+                raise ValueError(f"Range has {len(spec)} points; the limit is {max_points}")
+            return np.asarray(spec, dtype=float), False
+        start, stop = float(spec["start"]), float(spec["stop"])
+        step = float(spec.get("step", 1))
+        # Also rejects NaN
+        if not step > 0:
+            raise ValueError("step must be positive")
+        # Size is checked before the values are allocated
+        count = int(spec["num"]) if spec.get("num") is not None else max(int(np.floor((stop - start) / step + 1e-9)) + 1, 0)
+        if count < 0:
+            raise ValueError("num must not be negative")
+        if count > max_points:
+            raise ValueError(f"Range has {count} points; the limit is {max_points}")
+        if spec.get("num") is not None:
+            values = np.linspace(start, stop, count)
+        else:
+            values = start + step * np.arange(count)
+        return values, bool(spec.get("relative", False))
+
+    def counterfactual_sweep(self, base_state: Dict[str, Any],
+                             ranges: Optional[Dict[str, Union[List[float], Dict[str, Any]]]] = None,
+                             modifications: Optional[List[Dict[str, Any]]] = None,
+                             include_shap: bool = True) -> Dict[str, Any]:
+        """
+        Win probability curves for one-at-a-time feature sweeps and/or a list of
+        modifications of `base_state`, scored with one batched predict (and one
+        contributions call). SHAP deltas are relative to the base state.
+        """
+        self.ensure_model()
+        base = self._state_vector(base_state).copy()
+        blocks, curves, mods = [base], [], []
+        offset = 1
+
+        # The total size is checked before any scoring rows are allocated
+        sweeps, points = [], len(modifications or [])
+        if points > self.sweep_max_points:
+            raise ValueError(f"Sweep has {points} modifications; the limit is {self.sweep_max_points}")
+        for feature, spec in (ranges or {}).items():
+            idx = self._feature_index(feature)
+            values, relative = self._sweep_values(spec, self.sweep_max_points)
+            points += len(values)
+            if points > self.sweep_max_points:
+                raise ValueError(f"Sweep has at least {points} points; the limit is {self.sweep_max_points}")
+            sweeps.append((feature, idx, values, relative))
+
+        for feature, idx, values, relative in sweeps:
+            block = np.repeat(base, len(values), axis=0)
+            block[:, idx] = base[0, idx] + values if relative else values
+            curves.append((feature, block[:, idx], values if relative else None, offset, offset + len(block)))
+            blocks.append(block)
+            offset += len(block)
+
+        for modification in modifications or []:
+            row = base.copy()
+            for feature, value in modification.items():
+                row[0, self._feature_index(feature)] = value
+            mods.append((modification, offset))
+            blocks.append(row)
+            offset += 1
+
+        matrix = np.vstack(blocks)
+        probs = self._booster.inplace_predict(matrix).astype(float)
+        shap_deltas = None
+        if include_shap:
+            contributions = self._contributions(matrix)
+            shap_deltas = contributions - contributions[0]
+
+        def shap_columns(start: int, end: int) -> Optional[Dict[str, List[float]]]:
+            if shap_deltas is None:
+                return None
+            return {name: shap_deltas[start:end, j].tolist() for j, name in enumerate(self.feature_names)}
+
+        base_probability = float(probs[0])
+        return {
+            "base_probability": base_probability,
+            "base_state": dict(zip(self.feature_names, base[0].tolist())),
+            "points": offset - 1,
+            # Columnar per curve so thousands of points stay cheap to build and serialize
+            "curves": [
+                {
+                    "feature": feature,
+                    "values": values.tolist(),
+                    "offsets": offsets.tolist() if offsets is not None else None,
+                    "win_probability": probs[start:end].tolist(),
+                    "delta": (probs[start:end] - base_probability).tolist(),
+                    "shap_delta": shap_columns(start, end),
+                }
+                for feature, values, offsets, start, end in curves
+            ],
+            "modifications": [
+                {
+                    "modification": modification,
+                    "win_probability": float(probs[row]),
+                    "delta": float(probs[row]) - base_probability,
+                    "shap_delta": {k: v[0] for k, v in shap_columns(row, row + 1).items()} if include_shap else None,
+                }
+                for modification, row in mods
+            ],
+        }
+
+    def quantize_state(self, game_state: Dict[str, Any]) -> np.ndarray:
+        """Base state rounded to SURFACE_QUANTA so nearby slider positions share a surface."""
+        row = self._state_vector(game_state).copy()
+        for j, name in enumerate(self.feature_names):
+            quantum = SURFACE_QUANTA.get(name, 1)
+            row[0, j] = np.round(row[0, j] / quantum) * quantum
+        return row
+
+    @staticmethod
+    def _axis_key(spec: Union[List[float], Dict[str, Any]]) -> tuple:
+        if isinstance(spec, (list, tuple)):
+            return tuple(float(v) for v in spec)
+        return tuple(sorted((k, v) for k, v in spec.items() if k != "feature"))
+
+    def sensitivity_surface(self, base_state: Dict[str, Any], x_feature: str, x_spec: Union[List[float], Dict[str, Any]],
+                            y_feature: str, y_spec: Union[List[float], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Win probability over a grid of two features (other features held at the
+        quantized base state), scored with one batched prediction and cached in an
+        LRU. The returned dict is shared with the cache and must not be mutated.
+        """
+        self.ensure_model()
+        xi, yi = self._feature_index(x_feature), self._feature_index(y_feature)
+        if xi == yi:
+            raise ValueError("x and y must be different features")
+        base = self.quantize_state(base_state)
+
+        # Swept columns are overwritten unless the axis is relative to the base
+        x_values, x_relative = self._sweep_values(x_spec, self.sweep_max_points)
+        y_values, y_relative = self._sweep_values(y_spec, self.sweep_max_points)
+        key_base = base[0].copy()
+        if not x_relative:
+            key_base[xi] = 0
+        if not y_relative:
+            key_base[yi] = 0
+        key = (self.model_version, x_feature, self._axis_key(x_spec), y_feature, self._axis_key(y_spec), key_base.tobytes())
+        if len(x_values) * len(y_values) > self.sweep_max_points:
+            raise ValueError(f"Surface has {len(x_values) * len(y_values)} points; the limit is {self.sweep_max_points}")
+
+        with self._surface_lock:
+            cached = self._surface_cache.get(key)
+            if cached is not None:
+                self._surface_cache.move_to_end(key)
+                self.surface_hits += 1
+                return cached
+            self.surface_misses += 1
+
+        if x_relative:
+            x_values = base[0, xi] + x_values
+        if y_relative:
+            y_values = base[0, yi] + y_values
+
+        # Row-major grid: row r holds y_values[r] across every x value
+        grid_y, grid_x = np.meshgrid(y_values, x_values, indexing="ij")
+        matrix = np.repeat(base, grid_x.size, axis=0)
+        matrix[:, xi] = grid_x.ravel()
+        matrix[:, yi] = grid_y.ravel()
+        probs = self._booster.inplace_predict(matrix).astype(float).reshape(len(y_values), len(x_values))
+
+        surface = {
+            "model_version": self.model_version,
+            "base_state": dict(zip(self.feature_names, base[0].tolist())),
+            "base_probability": float(self._booster.inplace_predict(base)[0]),
+            "x": {"feature": x_feature, "values": x_values.tolist()},
+            "y": {"feature": y_feature, "values": y_values.tolist()},
+            "win_probability": probs.tolist(),
+        }
+        with self._surface_lock:
+            self._surface_cache[key] = surface
+            self._surface_cache.move_to_end(key)
+            while len(self._surface_cache) > self.surface_cache_size:
+                self._surface_cache.popitem(last=False)
+        return surface
+
+    def surface_cache_stats(self) -> Dict[str, Any]:
+        lookups = self.surface_hits + self.surface_misses
+        return {
+            "entries": len(self._surface_cache),
+            "max_entries": self.surface_cache_size,
+            "hits": self.surface_hits,
+            "misses": self.surface_misses,
+            "hit_rate": self.surface_hits / lookups if lookups else 0.0,
+        }
+
 # Singleton instance
 decision_engine = DecisionEngine()
@@ -0,0 +1,97 @@
+import copy
+import json
+from typing import Any, Dict, List
+
+# JSON-patch (RFC 6902) subset used for live state deltas: add, remove, replace.
+# Lists that only grew at the end (insight/objective feeds) become appends, and
+# a container whose patch would be larger than itself is replaced whole.
+
+COMPACT_SEPARATORS = (",", ":")
+
+
+def dumps(obj: Any) -> str:
+    """Compact JSON text used for everything sent over the live WebSocket."""
+    return json.dumps(obj, separators=COMPACT_SEPARATORS)
+
+
+def _escape(key: Any) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _same(before: Any, after: Any) -> bool:
+    # 1 == 1.0 == True in Python, but they serialize differently
+    return type(before) is type(after) and before == after
+
+
+def _replace(path: str, value: Any) -> List[Dict[str, Any]]:
+    return [{"op": "replace", "path": path, "value": value}]
+
+
+def _cheapest(ops: List[Dict[str, Any]], path: str, after: Any) -> List[Dict[str, Any]]:
+    if len(ops) > 1 and len(dumps(ops)) >= len(dumps(_replace(path, after))):
+        return _replace(path, after)
+    return ops
+
+
+def json_diff(before: Any, after: Any, path: str = "") -> List[Dict[str, Any]]:
+    """Patch operations that turn `before` into `after` (both JSON-clean)."""
+    if isinstance(before, dict) and isinstance(after, dict):
+        ops = []
+        for key in before:
+            if key not in after:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in after.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in before:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(json_diff(before[key], value, child))
+        return _cheapest(ops, path, after) if path else ops
+
+    if isinstance(before, list) and isinstance(after, list):
+        n = len(before)
+        if len(after) >= n and all(_same(b, a) for b, a in zip(before, after)):
+            return [{"op": "add", "path": f"{path}/-", "value": value} for value in after[n:]]
+        if len(after) == n:
+            ops = []
+            for i, (b, a) in enumerate(zip(before, after)):
+                ops.extend(json_diff(b, a, f"{path}/{i}"))
+            return _cheapest(ops, path, after)
+
+    if _same(before, after):
+        return []
+    return _replace(path, after)
+
+
+def apply_patch(document: Any, ops: List[Dict[str, Any]]) -> Any:
+    """Apply operations produced by json_diff; returns a new document."""
+    document = copy.deepcopy(document)
+    for op in ops:
+        tokens = [_unescape(t) for t in op["path"].split("/")[1:]]
+        if not tokens:
+            document = copy.deepcopy(op.get("value"))
+            continue
+
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+
+        last = tokens[-1]
+        if isinstance(parent, list):
+            if op["op"] == "remove":
+                parent.pop(int(last))
+            elif last == "-":
+                parent.append(copy.deepcopy(op["value"]))
+            elif op["op"] == "add":
+                parent.insert(int(last), copy.deepcopy(op["value"]))
+            else:
+                parent[int(last)] = copy.deepcopy(op["value"])
+        elif op["op"] == "remove":
+            parent.pop(last, None)
+        else:
+            parent[last] = copy.deepcopy(op["value"])
+    return document
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any
+
+# Real-world features for LoL/Valorant decision impact (model column order)
+FEATURE_NAMES = [
+    "gold_diff", "xp_diff", "towers_diff", "dragons_diff",
+    "barons_diff", "time_seconds", "team100_kills", "team200_kills"
+]
+
+COUNT_FEATURES = ["towers_diff", "dragons_diff", "barons_diff", "team100_kills", "team200_kills"]
+
+
+class FeatureBuilder:
+    @staticmethod
+    def _event_masks(events_df: pd.DataFrame, game: str = "lol") -> Dict[str, np.ndarray]:
+        """Boolean masks (one per counted feature) over an events frame."""
+        n = len(events_df)
+
+        def column(name: str) -> pd.Series:
+            if name in events_df.columns:
+                return events_df[name]
+            return pd.Series([None] * n, index=events_df.index, dtype=object)
+
+        etype = column("type").astype(str)
+        killer = pd.to_numeric(column("killerId"), errors="coerce")
+
+        if game == "valorant":
+            kill = (etype == "KILL").to_numpy()
+            return {
+                "dragons_diff": (etype == "SPIKE_PLANTED").to_numpy(),
+                "towers_diff": (etype == "SPIKE_DEFUSED").to_numpy(),
+                "barons_diff": np.zeros(n, dtype=bool),
+                "team100_kills": kill & (killer <= 5).to_numpy(),
+                "team200_kills": kill & (killer > 5).to_numpy(),
+            }
+
+        monster = column("monsterType").astype(str)
+        building = column("buildingType").astype(str)
+        elite = (etype == "ELITE_MONSTER_KILL").to_numpy()
+        kill = (etype == "CHAMPION_KILL").to_numpy()
+        return {
+            "dragons_diff": elite & (monster == "DRAGON").to_numpy(),
+            "towers_diff": (etype == "BUILDING_KILL").to_numpy() & (building == "TOWER").to_numpy(),
+            "barons_diff": elite & (monster == "BARON").to_numpy(),
+            "team100_kills": kill & (killer <= 5).to_numpy(),
+            "team200_kills": kill & (killer > 5).to_numpy(),
+        }
+
+    @staticmethod
+    def build_feature_matrix(snapshots_df: pd.DataFrame, events_df: pd.DataFrame = None, game: str = "lol") -> pd.DataFrame:
+        """
+        Build the decision-engine feature matrix for every snapshot in one pass.
+        Events are sorted once; per-feature counts up to each snapshot timestamp
+        come from a cumulative sum indexed with searchsorted.
+        """
+        n = len(snapshots_df)
+        if n == 0:
+            return pd.DataFrame(columns=FEATURE_NAMES)
+        matrix = pd.DataFrame(index=pd.RangeIndex(n))
+
+        def snapshot_column(name: str) -> np.ndarray:
+            if name not in snapshots_df.columns:
+                return np.zeros(n, dtype=float)
+            return pd.to_numeric(snapshots_df[name], errors="coerce").fillna(0).to_numpy(dtype=float)
+
+        snap_ts = snapshot_column("timestamp")
+        counts = {name: np.zeros(n, dtype=np.int64) for name in COUNT_FEATURES}
+
+        if events_df is not None and not events_df.empty and "timestamp" in events_df.columns:
+            event_ts = pd.to_numeric(events_df["timestamp"], errors="coerce").fillna(0).to_numpy(dtype=float)
+            order = np.argsort(event_ts, kind="stable")
+            sorted_ts = event_ts[order]
+            # Number of events with timestamp <= snapshot timestamp
+            upto = np.searchsorted(sorted_ts, snap_ts, side="right")
+            for name, mask in FeatureBuilder._event_masks(events_df, game).items():
+                cum = np.concatenate(([0], np.cumsum(mask[order], dtype=np.int64)))
+                counts[name] = cum[upto]
+
+        matrix["gold_diff"] = snapshot_column("gold_diff")
+        matrix["xp_diff"] = snapshot_column("xp_diff")
+        matrix["time_seconds"] = snap_ts / 1000
+        for name in COUNT_FEATURES:
+            matrix[name] = counts[name]
+
+        return matrix[FEATURE_NAMES]
+
+    @staticmethod
+    def to_states(feature_matrix: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Row-wise feature dicts for APIs that still take a single state."""
+        return feature_matrix.to_dict("records")
+
+# Singleton instance
+feature_builder = FeatureBuilder()
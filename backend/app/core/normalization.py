@@ -1,82 +1,282 @@
+import numpy as np
 import pandas as pd
 import json
 import logging
-from typing import List, Dict, Any
+from array import array
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, Union
 
 logger = logging.getLogger("decision-lens.normalizer")
 
-class Normalizer:
-    @staticmethod
-    def _get_frames(timeline_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Helper to extract frames from different GRID data formats."""
-        # Try to find the state object (either at root or under 'seriesState')
-        state = timeline_data.get("seriesState") or (timeline_data if "games" in timeline_data or "titleId" in timeline_data else None)
-        
-        if state:
-            games = state.get("games", [])
-            if not games:
-                # If no games, maybe frames are at state level?
-                return state.get("frames", [])
-            
-            all_game_frames = []
-            # Try to find frames in games (latest first)
-            for game in reversed(games):
-                logger.info(f"Checking game {game.get('id')} with keys {list(game.keys())}")
-                frames = game.get("frames", [])
-                
-                if not frames and "segments" in game:
-                    logger.info(f"Game {game.get('id')} has {len(game['segments'])} segments")
-                    for segment in game["segments"]:
-                        # Try different keys for frames/snapshots
-                        for key in ["frames", "snapshots", "states"]:
-                            if key in segment:
-                                s_frames = segment[key]
-                                logger.info(f"Found {len(s_frames)} frames in segment {segment.get('type')} using key '{key}'")
-                                frames.extend(s_frames)
-                        
-                        # Some GRID formats have frames in payload
-                        if "payload" in segment and isinstance(segment["payload"], dict):
-                            for key in ["frames", "snapshots", "states"]:
-                                if key in segment["payload"]:
-                                    s_frames = segment["payload"][key]
-                                    logger.info(f"Found {len(s_frames)} frames in segment payload using key '{key}'")
-                                    frames.extend(s_frames)
+# Column layout of the tidy output (normalize_timeline_tidy)
+CUMULATIVE_COLUMNS = ["dragons_diff", "towers_diff", "barons_diff", "team100_kills", "team200_kills"]
+TEAM_COLUMNS = ["gold_diff", "xp_diff", "team100_gold", "team200_gold"]
+PLAYER_STAT_COLUMNS = {
+    "lol": ["gold", "xp", "minionsKilled", "jungleMinionsKilled", "wardsPlaced"],
+    "valorant": ["credits", "loadout"],
+}
 
-                if frames:
-                    return frames
-                
-                # If no frames found but we have teams/clock, this game object itself is a snapshot
-                if not frames and ("teams" in game or "participants" in game):
-                    logger.info(f"No frames found for game {game.get('id')}, using game object as summary snapshot")
-                    all_game_frames.append(game)
+# Where each player stat may live: participant keys in probe order, then the key under its "stats" dict
+STAT_SOURCES = {
+    "lol": {
+        "gold": (["totalGold", "netWorth", "money", "gold"], "gold"),
+        "xp": (["xp", "experiencePoints"], "xp"),
+        "minionsKilled": (["minionsKilled", "unitKills"], "minionsKilled"),
+        "jungleMinionsKilled": (["jungleMinionsKilled"], "jungleMinionsKilled"),
+        "wardsPlaced": (["wardsPlaced", "visionScore"], "wardsPlaced"),
+    },
+    "valorant": {
+        "credits": (["credits", "money", "netWorth"], "credits"),
+        "loadout": (["loadoutValue"], "loadoutValue"),
+    },
+}
+# Subkeys tried when a stat is an object rather than a number
+NUMERIC_SUBKEYS = ["total", "amount", "value", "current", "count", "netWorth", "money"]
+PARTICIPANT_CONTAINERS = ["participantFrames", "participants", "teams"]
+
+
+class FrameSchema:
+    """
+    Where one payload keeps its participants and their stats, detected from the first
+    frame/participant that has them so the per-frame loop does direct lookups instead of
+    probing every alternative key. Compiled lookups are only used for participants that
+    have none of the keys the generic probe would try first (the guard); any other
+    participant goes through the generic probe, which stays the reference.
+    """
 
-            return all_game_frames
+    def __init__(self, game: str, detect: bool = True):
+        self.game = game
+        self.sources = STAT_SOURCES["valorant" if game == "valorant" else "lol"]
+        self.detect = detect
+        # Participant container key, and stat name -> (key, subkey) lookups
+        self.container: Optional[str] = None
+        self.paths: Optional[Dict[str, Optional[Tuple[str, Optional[str]]]]] = None
+        # (stat, key, subkey, subkeys probed before subkey) in column order; key None means always probe
+        self.lookups = [(name, None, None, ()) for name in self.sources]
+        self.guard: Tuple[str, ...] = ()
+
+    @property
+    def layout(self) -> str:
+        if self.paths is None:
+            return "generic"
+        compiled = sum(path is not None for path in self.paths.values())
+        return f"{self.container or 'unknown'}, {compiled}/{len(self.paths)} stats compiled"
+
+    def participants(self, frame: Dict[str, Any]) -> Dict[str, Any]:
+        """Participant data keyed by participant ID, with teamId set for team-nested players."""
+        if self.container is None and self.detect:
+            self.container = next((key for key in PARTICIPANT_CONTAINERS if frame.get(key)), None)
+
+        container = self.container
+        if container == "participantFrames":
+            participant_data = frame.get("participantFrames")
+            if participant_data:
+                return participant_data
+        elif container == "participants" and "participants" in frame:
+            return self._from_list(frame["participants"])
+        elif container == "teams" and "teams" in frame:
+            return self._from_teams(frame["teams"])
+
+        participant_data = frame.get("participantFrames", {})
         
-        return timeline_data.get("frames", [])
+        # If participantFrames is missing, check if it's in another location
+        if not participant_data:
+            if "participants" in frame:
+                participant_data = self._from_list(frame["participants"])
+            elif "teams" in frame:
+                participant_data = self._from_teams(frame["teams"])
+        return participant_data
 
     @staticmethod
-    def normalize_timeline(timeline_data: Dict[str, Any]) -> pd.DataFrame:
-        """
-        Convert raw timeline data into a flat DataFrame of snapshots.
-        """
-        frames = Normalizer._get_frames(timeline_data)
-        
-        # Determine game type
-        state = timeline_data.get("seriesState") or (timeline_data if "games" in timeline_data or "titleId" in timeline_data else {})
-        if state:
-            metadata = {
-                "game": "lol" if str(state.get("titleId")) == "3" else "valorant" if str(state.get("titleId")) == "6" else "lol"
-            }
+    def _from_list(participants: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {str(p.get("id") or p.get("participantId")): p for p in participants}
+
+    @staticmethod
+    def _from_teams(teams: List[Dict[str, Any]]) -> Dict[str, Any]:
+        participant_data = {}
+        for team in teams:
+            team_id = team.get("id")
+            for player in team.get("players", []):
+                pid = player.get("id") or player.get("participantId")
+                if pid:
+                    # Ensure player has teamId for later use
+                    player["teamId"] = team_id
+                    participant_data[str(pid)] = player
+        return participant_data
+
+    def player_stats(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """All player stats of one participant, in column order, as the generic probe would read them."""
+        if self.paths is None and self.detect:
+            self.compile(data)
+        # Present keys count even when None: those rare participants just take the probe
+        if self.guard and not data.keys().isdisjoint(self.guard):
+            return {name: self._probe(data, name) for name in self.sources}
+
+        stats = {}
+        for name, key, subkey, shadowing in self.lookups:
+            if key is not None:
+                value = data.get(key)
+                if subkey is not None and type(value) is dict:
+                    # An earlier numeric subkey is what the probe would return
+                    value = None if shadowing and self._any_numeric(value, shadowing) else value.get(subkey)
+                if value and type(value) in (int, float):
+                    stats[name] = value
+                    continue
+            stats[name] = self._probe(data, name)
+        return stats
+
+    def _probe(self, data: Dict[str, Any], name: str) -> Any:
+        keys, stats_key = self.sources[name]
+        return Normalizer._numeric_value(data, keys) or Normalizer._numeric_value(data.get("stats", {}), [stats_key])
+
+    @staticmethod
+    def _any_numeric(value: Dict[str, Any], subkeys: Tuple[str, ...]) -> bool:
+        return any(isinstance(value.get(k), (int, float)) for k in subkeys)
+
+    def compile(self, data: Dict[str, Any]):
+        """Pick, per stat, the key the generic probe resolves to on this sample participant."""
+        stats = data.get("stats")
+        self.paths = {}
+        for name, (keys, stats_key) in self.sources.items():
+            path = None
+            for key in keys:
+                value = data.get(key)
+                if value is None:
+                    continue
+                if type(value) in (int, float):
+                    path = (key, None)
+                elif isinstance(value, dict):
+                    subkey = next((k for k in NUMERIC_SUBKEYS if type(value.get(k)) in (int, float)), None)
+                    path = (key, subkey) if subkey is not None else None
+                else:
+                    # Strings etc.: the generic probe moves on to the next key
+                    continue
+                break
+            else:
+                if isinstance(stats, dict) and type(stats.get(stats_key)) in (int, float):
+                    path = ("stats", stats_key)
+            self.paths[name] = path
+        # Keys the probe tries before a compiled one; a participant with any of them
+        # does not share the sample's layout
+        guard = set()
+        self.lookups = []
+        for name, (keys, _) in self.sources.items():
+            key, subkey = self.paths[name] or (None, None)
+            shadowing = ()
+            if key in keys:
+                guard.update(keys[:keys.index(key)])
+                if subkey is not None:
+                    shadowing = tuple(NUMERIC_SUBKEYS[:NUMERIC_SUBKEYS.index(subkey)])
+            elif key is not None:
+                # The "stats" fallback is only reached when no participant key is present
+                guard.update(keys)
+            self.lookups.append((name, key, subkey, shadowing))
+        self.guard = tuple(sorted(guard))
+
+
+class ParsedTimeline:
+    """
+    A raw GRID payload walked once: schema variant, game, frames, events, rounds and
+    summary stats, shared by normalize_timeline and extract_events. snapshots is set when
+    the frames were already normalized while the payload streamed in (TimelineStream).
+    """
+
+    FRAME_KEYS = ["frames", "snapshots", "states"]
+
+    def __init__(self, timeline_data: Dict[str, Any]):
+        self.raw = timeline_data
+        self.metadata = timeline_data.get("metadata", {})
+
+        # The state object is either at root or under 'seriesState'
+        self.state = timeline_data.get("seriesState") or (timeline_data if "games" in timeline_data or "titleId" in timeline_data else None)
+        self.games = self.state.get("games", []) if self.state else []
+        self.rounds = timeline_data.get("rounds", [])
+        stats = timeline_data.get("stats", {})
+        self.stats_games = stats.get("games", []) if isinstance(stats, dict) else []
+
+        if self.state:
+            title_id = str(self.state.get("titleId"))
+            self.game = "valorant" if title_id == "6" else "lol"
         else:
-            metadata = timeline_data.get("metadata", {})
-        
-        game = metadata.get("game", "lol") 
+            self.game = self.metadata.get("game", "lol")
+
+        segment_events = []
+        game_frames = []
+        for game in self.games:
+            frames = list(game.get("frames", []))
+            segment_frames = []
+            for segment in game.get("segments", []):
+                # Try different keys for frames/snapshots, on the segment and in its payload
+                payload = segment.get("payload")
+                for source in (segment, payload) if isinstance(payload, dict) else (segment,):
+                    for key in self.FRAME_KEYS:
+                        if key in source:
+                            segment_frames.extend(source[key])
+
+                # Events might be in segment["events"] or segment["payload"]["events"]
+                s_events = segment.get("events", [])
+                if not s_events and isinstance(payload, dict):
+                    s_events = payload.get("events", [])
+                if not s_events and segment.get("type") == "event":
+                    s_events = [segment.get("payload", {})]
+                segment_events.extend(s_events)
+
+            if not frames and "segments" in game:
+                frames = segment_frames
+                self._log_game(game, "segments", frames)
+            else:
+                self._log_game(game, "frames", frames)
+            game_frames.append((game, frames))
+
+        self.frames, self.variant = self._select_frames(game_frames)
+
+        # Events in document order: frames, then segments, then VALORANT rounds
+        self.events = [event for frame in self.frames for event in frame.get("events", [])]
+        self.events.extend(segment_events)
+        self.events.extend(event for round_data in self.rounds for event in round_data.get("events", []))
+        self.snapshots: Optional[pd.DataFrame] = None
+
+        logger.info(f"Parsed {self.game} timeline ({self.variant}): {len(self.games)} games, "
+                    f"{len(self.frames)} frames, {len(self.events)} events, {len(self.rounds)} rounds")
+
+    @staticmethod
+    def _log_game(game: Dict[str, Any], source: str, frames: List[Dict[str, Any]]):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Game {game.get('id')} has {len(frames)} frames from {source} (keys {list(game.keys())})")
+
+    def _select_frames(self, game_frames: List[tuple]) -> Tuple[List[Dict[str, Any]], str]:
+        """Frames of the latest game that has any, else games usable as summary snapshots."""
+        if not self.state:
+            return self.raw.get("frames", []), "frames" if self.raw.get("frames") else "empty"
+        if not self.games:
+            # If no games, maybe frames are at state level
+            return self.state.get("frames", []), "state-frames"
+
+        summary_games = []
+        for game, frames in reversed(game_frames):
+            if frames:
+                return frames, "segments" if not game.get("frames") and "segments" in game else "game-frames"
+            # If no frames found but we have teams/clock, this game object itself is a snapshot
+            if "teams" in game or "participants" in game:
+                summary_games.append(game)
+        return summary_games, "game-summary" if summary_games else "empty"
+
+
+class Normalizer:
+    @staticmethod
+    def parse(timeline_data: Union[Dict[str, Any], ParsedTimeline]) -> ParsedTimeline:
+        """Walk a raw GRID payload once; pass the result to normalize_timeline and extract_events."""
+        return timeline_data if isinstance(timeline_data, ParsedTimeline) else ParsedTimeline(timeline_data)
+
+    @staticmethod
+    def _resolve_frames(parsed: ParsedTimeline) -> Tuple[List[Dict[str, Any]], str]:
+        """Frames to normalize and the game they belong to, synthesizing a trend when GRID has too few frames."""
+        frames = parsed.frames
+        game = parsed.game
         
         # Fallback: If very few frames found, try to synthesize a trend from stats
         if len(frames) < 2:
             logger.info(f"Only {len(frames)} frames found in timeline, checking stats for trend synthesis")
-            stats = timeline_data.get("stats", {})
-            stats_games = stats.get("games", []) if isinstance(stats, dict) else []
+            stats_games = parsed.stats_games
             
             if stats_games:
                 latest = stats_games[-1]
@@ -141,8 +341,7 @@ class Normalizer:
             else:
                 # No stats and no frames. Create a baseline snapshot from metadata if possible.
                 logger.info("No timeline or stats data found, creating baseline snapshot")
-                metadata = timeline_data.get("metadata", {})
-                teams = metadata.get("teams", [])
+                teams = parsed.metadata.get("teams", [])
                 
                 baseline_frame = {
                     "timestamp": 0,
@@ -168,205 +367,218 @@ class Normalizer:
                         }
                 frames = [baseline_frame]
 
-        logger.info(f"Normalizing {len(frames)} frames")
-        snapshot_list = []
-        
-        # Cumulative stats
-        cum_stats = {
-            "dragons_diff": 0,
-            "towers_diff": 0,
-            "barons_diff": 0,
-            "team100_kills": 0,
-            "team200_kills": 0
-        }
-        
+        return frames, game
+
+    @staticmethod
+    def _numeric_value(d: Dict[str, Any], keys: List[str]) -> Any:
+        """First numeric value under keys, looking one level into dict values."""
+        for k in keys:
+            v = d.get(k)
+            if v is not None:
+                if isinstance(v, (int, float)):
+                    return v
+                if isinstance(v, dict):
+                    # Try common subkeys
+                    for subk in NUMERIC_SUBKEYS:
+                        subv = v.get(subk)
+                        if isinstance(subv, (int, float)):
+                            return subv
+                    # Last resort: first numeric value
+                    for subv in v.values():
+                        if isinstance(subv, (int, float)):
+                            return subv
+                    return 0
+        return 0
+
+    @staticmethod
+    def _iter_frames(frames: Iterable[Dict[str, Any]], game: str, schema: Optional[FrameSchema] = None) -> Iterator[Dict[str, Any]]:
+        """Frame values for a sequence of frames, carrying the cumulative counters across them."""
+        schema = schema or FrameSchema(game)
+        cum_stats = dict.fromkeys(CUMULATIVE_COLUMNS, 0)
         for frame in frames:
-            timestamp = frame.get("timestamp") or frame.get("clock", {}).get("timestamp") or 0
-            
-            participant_data = frame.get("participantFrames", {})
-            
-            # If participantFrames is missing, check if it's in another location
-            if not participant_data:
-                if "participants" in frame:
-                    participant_data = {str(p.get("id") or p.get("participantId")): p for p in frame["participants"]}
-                elif "teams" in frame:
-                    participant_data = {}
-                    for team in frame["teams"]:
-                        team_id = team.get("id")
-                        for player in team.get("players", []):
-                            pid = player.get("id") or player.get("participantId")
-                            if pid:
-                                # Ensure player has teamId for later use
-                                player["teamId"] = team_id
-                                participant_data[str(pid)] = player
-
-            # Update cumulative stats from events in this frame
-            for event in frame.get("events", []):
-                etype = event.get("type")
-                if game == "lol":
-                    if etype == "CHAMPION_KILL":
-                        killer_id = event.get("killerId", 0)
-                        if 1 <= killer_id <= 5: cum_stats["team100_kills"] += 1
-                        elif 6 <= killer_id <= 10: cum_stats["team200_kills"] += 1
-                    elif etype == "ELITE_MONSTER_KILL":
-                        mtype = event.get("monsterType")
-                        team_id = event.get("teamId")
-                        val = 1 if team_id == 100 else -1
-                        if mtype == "DRAGON": cum_stats["dragons_diff"] += val
-                        elif mtype == "BARON": cum_stats["barons_diff"] += val
-                    elif etype == "BUILDING_KILL":
-                        team_id = event.get("teamId")
-                        val = 1 if team_id == 100 else -1 # Note: teamId is usually the team that KILLED it
-                        cum_stats["towers_diff"] += val
-                elif game == "valorant":
-                    if etype == "KILL":
-                        # Valorant killerId can be a UUID or string
-                        killer_id_raw = event.get("killerId", "0")
-                        try:
-                            # Handle numeric IDs if present
-                            killer_id = int(str(killer_id_raw))
-                            is_team100 = killer_id <= 5
-                        except (ValueError, TypeError):
-                            # Handle UUIDs or string IDs (e.g. starting with blue/red or just random)
-                            # Simple heuristic: check if it contains 'blue' or if it's in the first 5 participant IDs
-                            is_team100 = "blue" in str(killer_id_raw).lower() or any(str(p_id) == str(killer_id_raw) for p_id in list(participant_data.keys())[:5])
-                        
-                        if is_team100: cum_stats["team100_kills"] += 1
-                        else: cum_stats["team200_kills"] += 1
-                    elif etype == "SPIKE_PLANTED":
-                        cum_stats["dragons_diff"] += 1 # Map Spike to dragons_diff for XGBoost consistency
-                    elif etype == "SPIKE_DEFUSED":
-                        cum_stats["towers_diff"] += 1
-
-            # Aggregate team level stats
-            team_stats = {
-                100: {"primary": 0, "secondary": 0},
-                200: {"primary": 0, "secondary": 0},
-                "team-blue": {"primary": 0, "secondary": 0},
-                "team-red": {"primary": 0, "secondary": 0}
-            }
-            
-            snapshot = {
-                "timestamp": timestamp,
-                "participantFrames": participant_data,
-                **cum_stats
-            }
-            for pid, data in participant_data.items():
-                if game == "valorant":
-                    # Try to use teamId from data
-                    team_id = data.get("teamId")
-                    if team_id is None:
-                        # Fallback heuristics
-                        if str(pid).lower().startswith("blue"): team_id = "team-blue"
-                        elif str(pid).lower().startswith("red"): team_id = "team-red"
-                        else:
-                            try:
-                                pid_int = int(pid)
-                                team_id = "team-blue" if pid_int <= 5 else "team-red"
-                            except:
-                                team_id = "team-blue"
-                    
-                    # Normalize team_id format
-                    if team_id in [100, "100", "blue"]: team_id = "team-blue"
-                    if team_id in [200, "200", "red"]: team_id = "team-red"
-
-                    def get_val(d, keys):
-                        for k in keys:
-                            v = d.get(k)
-                            if v is not None:
-                                if isinstance(v, (int, float)):
-                                    return v
-                                if isinstance(v, dict):
-                                    # Try common subkeys
-                                    for subk in ["total", "amount", "value", "current", "count", "netWorth", "money"]:
-                                        subv = v.get(subk)
-                                        if isinstance(subv, (int, float)):
-                                            return subv
-                                    # Last resort: first numeric value
-                                    for subv in v.values():
-                                        if isinstance(subv, (int, float)):
-                                            return subv
-                                    return 0
-                        return 0
-
-                    primary_val = get_val(data, ["credits", "money", "netWorth"]) or get_val(data.get("stats", {}), ["credits"])
-                    secondary_val = get_val(data, ["loadoutValue"]) or get_val(data.get("stats", {}), ["loadoutValue"])
+            yield Normalizer._frame_values(frame, schema, cum_stats)
+
+    @staticmethod
+    def _frame_values(frame: Dict[str, Any], schema: FrameSchema, cum_stats: Dict[str, int]) -> Dict[str, Any]:
+        """
+        Per-frame values shared by the wide and tidy outputs: timestamp, participant data,
+        cumulative objective/kill counters (cum_stats is updated in place), per-player
+        stats in column order and team totals.
+        """
+        game = schema.game
+        player_stats = schema.player_stats
+
+        timestamp = frame.get("timestamp") or frame.get("clock", {}).get("timestamp") or 0
+        participant_data = schema.participants(frame)
+
+        # Update cumulative stats from events in this frame
+        for event in frame.get("events", []):
+            etype = event.get("type")
+            if game == "lol":
+                if etype == "CHAMPION_KILL":
+                    killer_id = event.get("killerId", 0)
+                    if 1 <= killer_id <= 5: cum_stats["team100_kills"] += 1
+                    elif 6 <= killer_id <= 10: cum_stats["team200_kills"] += 1
+                elif etype == "ELITE_MONSTER_KILL":
+                    mtype = event.get("monsterType")
+                    team_id = event.get("teamId")
+                    val = 1 if team_id == 100 else -1
+                    if mtype == "DRAGON": cum_stats["dragons_diff"] += val
+                    elif mtype == "BARON": cum_stats["barons_diff"] += val
+                elif etype == "BUILDING_KILL":
+                    team_id = event.get("teamId")
+                    val = 1 if team_id == 100 else -1 # Note: teamId is usually the team that KILLED it
+                    cum_stats["towers_diff"] += val
+            elif game == "valorant":
+                if etype == "KILL":
+                    # Valorant killerId can be a UUID or string
+                    killer_id_raw = event.get("killerId", "0")
+                    try:
+                        # Handle numeric IDs if present
+                        killer_id = int(str(killer_id_raw))
+                        is_team100 = killer_id <= 5
+                    except (ValueError, TypeError):
+                        # Handle UUIDs or string IDs (e.g. starting with blue/red or just random)
+                        # Simple heuristic: check if it contains 'blue' or if it's in the first 5 participant IDs
+                        is_team100 = "blue" in str(killer_id_raw).lower() or any(str(p_id) == str(killer_id_raw) for p_id in list(participant_data.keys())[:5])
                     
-                    snapshot[f"p{pid}_credits"] = primary_val
-                    snapshot[f"p{pid}_loadout"] = secondary_val
-                    # Extract position if available
-                    pos = data.get("position") or data.get("stats", {}).get("position")
-                    if pos:
-                        snapshot[f"p{pid}_position"] = pos
-                else: # LoL
-                    # Try to use teamId from data first
-                    team_id = data.get("teamId")
-                    if team_id is None:
+                    if is_team100: cum_stats["team100_kills"] += 1
+                    else: cum_stats["team200_kills"] += 1
+                elif etype == "SPIKE_PLANTED":
+                    cum_stats["dragons_diff"] += 1 # Map Spike to dragons_diff for XGBoost consistency
+                elif etype == "SPIKE_DEFUSED":
+                    cum_stats["towers_diff"] += 1
+
+        # Aggregate team level stats
+        team_stats = {
+            100: {"primary": 0, "secondary": 0},
+            200: {"primary": 0, "secondary": 0},
+            "team-blue": {"primary": 0, "secondary": 0},
+            "team-red": {"primary": 0, "secondary": 0}
+        }
+
+        players = []
+        for pid, data in participant_data.items():
+            if game == "valorant":
+                # Try to use teamId from data
+                team_id = data.get("teamId")
+                if team_id is None:
+                    # Fallback heuristics
+                    if str(pid).lower().startswith("blue"): team_id = "team-blue"
+                    elif str(pid).lower().startswith("red"): team_id = "team-red"
+                    else:
                         try:
-                            team_id = 100 if int(pid) <= 5 else 200
+                            pid_int = int(pid)
+                            team_id = "team-blue" if pid_int <= 5 else "team-red"
                         except:
-                            team_id = 100
-                    
-                    if team_id in ["blue", "team-blue"]: team_id = 100
-                    if team_id in ["red", "team-red"]: team_id = 200
-
-                    def get_val(d, keys):
-                        for k in keys:
-                            v = d.get(k)
-                            if v is not None:
-                                if isinstance(v, (int, float)):
-                                    return v
-                                if isinstance(v, dict):
-                                    for subk in ["total", "amount", "value", "current", "count", "netWorth", "money"]:
-                                        subv = v.get(subk)
-                                        if isinstance(subv, (int, float)):
-                                            return subv
-                                    for subv in v.values():
-                                        if isinstance(subv, (int, float)):
-                                            return subv
-                                    return 0
-                        return 0
-                            
-                    primary_val = get_val(data, ["totalGold", "netWorth", "money", "gold"]) or get_val(data.get("stats", {}), ["gold"])
-                    secondary_val = get_val(data, ["xp", "experiencePoints"]) or get_val(data.get("stats", {}), ["xp"])
-                    
-                    snapshot[f"p{pid}_gold"] = primary_val
-                    snapshot[f"p{pid}_xp"] = secondary_val
-                    snapshot[f"p{pid}_minionsKilled"] = get_val(data, ["minionsKilled", "unitKills"]) or get_val(data.get("stats", {}), ["minionsKilled"])
-                    snapshot[f"p{pid}_jungleMinionsKilled"] = get_val(data, ["jungleMinionsKilled"]) or get_val(data.get("stats", {}), ["jungleMinionsKilled"])
-                    snapshot[f"p{pid}_wardsPlaced"] = get_val(data, ["wardsPlaced", "visionScore"]) or get_val(data.get("stats", {}), ["wardsPlaced"])
-                    # Extract position
-                    pos = data.get("position") or data.get("stats", {}).get("position")
-                    if pos:
-                        snapshot[f"p{pid}_position"] = pos
-
-                if team_id in team_stats:
-                    team_stats[team_id]["primary"] += primary_val
-                    team_stats[team_id]["secondary"] += secondary_val
-            
-            if game == "valorant":
-                snapshot["gold_diff"] = team_stats["team-blue"]["primary"] - team_stats["team-red"]["primary"]
-                snapshot["xp_diff"] = team_stats["team-blue"]["secondary"] - team_stats["team-red"]["secondary"]
-                snapshot["team100_gold"] = team_stats["team-blue"]["primary"]
-                snapshot["team200_gold"] = team_stats["team-red"]["primary"]
-            else:
-                snapshot["gold_diff"] = team_stats[100]["primary"] - team_stats[200]["primary"]
-                snapshot["xp_diff"] = team_stats[100]["secondary"] - team_stats[200]["secondary"]
-                snapshot["team100_gold"] = team_stats[100]["primary"]
-                snapshot["team200_gold"] = team_stats[200]["primary"]
-            
-            snapshot_list.append(snapshot)
-            
-        return pd.DataFrame(snapshot_list)
+                            team_id = "team-blue"
+                
+                # Normalize team_id format
+                if team_id in [100, "100", "blue"]: team_id = "team-blue"
+                if team_id in [200, "200", "red"]: team_id = "team-red"
+
+                stats = player_stats(data)
+                primary_val, secondary_val = stats["credits"], stats["loadout"]
+            else: # LoL
+                # Try to use teamId from data first
+                team_id = data.get("teamId")
+                if team_id is None:
+                    try:
+                        team_id = 100 if int(pid) <= 5 else 200
+                    except:
+                        team_id = 100
+                
+                if team_id in ["blue", "team-blue"]: team_id = 100
+                if team_id in ["red", "team-red"]: team_id = 200
+
+                stats = player_stats(data)
+                primary_val, secondary_val = stats["gold"], stats["xp"]
+
+            # Extract position if available
+            pos = data.get("position") or data.get("stats", {}).get("position")
+            players.append((pid, team_id, stats, pos))
+
+            if team_id in team_stats:
+                team_stats[team_id]["primary"] += primary_val
+                team_stats[team_id]["secondary"] += secondary_val
+
+        blue, red = (team_stats["team-blue"], team_stats["team-red"]) if game == "valorant" else (team_stats[100], team_stats[200])
+        return {
+            "timestamp": timestamp,
+            "participantFrames": participant_data,
+            "cum_stats": dict(cum_stats),
+            "players": players,
+            "teams": {
+                "gold_diff": blue["primary"] - red["primary"],
+                "xp_diff": blue["secondary"] - red["secondary"],
+                "team100_gold": blue["primary"],
+                "team200_gold": red["primary"],
+            },
+        }
+
+    @staticmethod
+    def normalize_timeline(timeline_data: Union[Dict[str, Any], ParsedTimeline]) -> pd.DataFrame:
+        """
+        Convert raw timeline data into a flat DataFrame of snapshots.
+        """
+        parsed = Normalizer.parse(timeline_data)
+        if parsed.snapshots is not None:
+            return parsed.snapshots
+        frames, game = Normalizer._resolve_frames(parsed)
+        schema = FrameSchema(game)
+
+        logger.info(f"Normalizing {len(frames)} frames")
+        builder = SnapshotTableBuilder()
+        for values in Normalizer._iter_frames(frames, game, schema):
+            builder.add(values)
+
+        logger.debug(f"Frame layout: {parsed.variant}, {schema.layout}")
+        return builder.table()
 
     @staticmethod
-    def extract_events(timeline_data: Dict[str, Any], event_types: List[str] = None) -> pd.DataFrame:
+    def normalize_timeline_tidy(timeline_data: Union[Dict[str, Any], ParsedTimeline]) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
-        Extract specific events from frames or rounds.
+        Long/tidy alternative to normalize_timeline: a snapshots table with one row per
+        frame and a players table with one row per (snapshot, player), both with numeric
+        dtypes and no embedded dicts. Player stat columns keep the wide column suffixes
+        (p{pid}_gold -> gold) and positions are split into x/y (NaN when missing).
         """
-        events = []
-        
-        frames = Normalizer._get_frames(timeline_data)
+        parsed = Normalizer.parse(timeline_data)
+        frames, game = Normalizer._resolve_frames(parsed)
+        schema = FrameSchema(game)
+
+        logger.info(f"Normalizing {len(frames)} frames (tidy)")
+        builder = TidyTableBuilder(game)
+        for values in Normalizer._iter_frames(frames, game, schema):
+            builder.add(values)
+        logger.debug(f"Frame layout: {parsed.variant}, {schema.layout}")
+        return builder.tables()
+
+    @staticmethod
+    def _position_xy(pos: Any) -> Tuple[float, float]:
+        """Numeric x/y from a GRID position ({"x", "y"} dict or [x, y] pair), NaN when unavailable."""
+        if isinstance(pos, dict):
+            x, y = pos.get("x"), pos.get("y")
+        elif isinstance(pos, (list, tuple)) and len(pos) >= 2:
+            x, y = pos[0], pos[1]
+        else:
+            return np.nan, np.nan
+        return (
+            float(x) if isinstance(x, (int, float)) else np.nan,
+            float(y) if isinstance(y, (int, float)) else np.nan,
+        )
+
+    @staticmethod
+    def player_matrix(players: pd.DataFrame, column: str) -> pd.DataFrame:
+        """One player stat from the tidy players table as a snapshot x player_id matrix."""
+        return players.pivot(index="snapshot", columns="player_id", values=column)
+
+    @staticmethod
+    def extract_events(timeline_data: Union[Dict[str, Any], ParsedTimeline], event_types: List[str] = None) -> pd.DataFrame:
+        """
+        Extract specific events from frames, segments or rounds.
+        """
+        parsed = Normalizer.parse(timeline_data)
         
         # Helper to check event type
         def match_type(etype, target_types):
@@ -378,48 +590,14 @@ class Normalizer:
                     return True
             return False
 
-        # Look in frames (Standard LoL / Val structure)
-        for frame in frames:
-            for event in frame.get("events", []):
-                if match_type(event.get("type"), event_types):
-                    events.append(event)
-        
-        # Look in segments (GRID LoL structure)
-        # Try to find the state object (either at root or under 'seriesState')
-        state = timeline_data.get("seriesState") or (timeline_data if "games" in timeline_data or "titleId" in timeline_data else None)
-        
-        if state:
-            for game in state.get("games", []):
-                for segment in game.get("segments", []):
-                    # Events might be in segment["events"] or segment["payload"]["events"]
-                    s_events = segment.get("events", [])
-                    if not s_events and "payload" in segment and isinstance(segment["payload"], dict):
-                        s_events = segment["payload"].get("events", [])
-                    
-                    if not s_events and segment.get("type") == "event":
-                        s_events = [segment.get("payload", {})]
-
-                    for event in s_events:
-                        if match_type(event.get("type"), event_types):
-                            events.append(event)
-
-        # Look in rounds (VALORANT specific mock/data structure)
-        rounds = timeline_data.get("rounds", [])
-        for round_data in rounds:
-            for event in round_data.get("events", []):
-                if match_type(event.get("type"), event_types):
-                    events.append(event)
+        events = [event for event in parsed.events if match_type(event.get("type"), event_types)]
                     
         if not events:
             logger.info("No events found in timeline, checking games and stats for fallback events")
             
-            # 1. Try to find summary data in timeline 'games'
-            state = timeline_data.get("seriesState") or (timeline_data if "games" in timeline_data else {})
-            games_list = state.get("games", [])
-            
-            # 2. Try 'stats' as alternative source
-            stats = timeline_data.get("stats", {})
-            stats_games = stats.get("games", []) if isinstance(stats, dict) else []
+            # 1. Try to find summary data in timeline 'games', 2. 'stats' as alternative source
+            games_list = parsed.games
+            stats_games = parsed.stats_games
             
             # Pick best summary source
             summary_game = None
@@ -437,8 +615,7 @@ class Normalizer:
                     duration_secs = float(raw_duration or 1200)
                 
                 duration = duration_secs * 1000
-                metadata = timeline_data.get("metadata", {})
-                game = metadata.get("game", "lol")
+                game = parsed.metadata.get("game", "lol")
                 
                 # Extract player summaries
                 player_summaries = []
@@ -503,5 +680,205 @@ class Normalizer:
             
         return pd.DataFrame(events)
 
+class _SnapshotColumn:
+    """
+    One SnapshotTableBuilder column: int64 while every value is an int, float64 once a float
+    or a gap turns up, and a plain list (left to pandas' inference) for anything else. The
+    list is rebuilt with the original ints, so the result infers exactly like the records.
+    """
+
+    __slots__ = ("values", "int_prefix", "ints")
+
+    # Larger ints do not survive a round trip through float64
+    EXACT_INT = 2 ** 53
+
+    def __init__(self, gap: int):
+        self.values: Any = array("d", [np.nan]) * gap if gap else array("q")
+        # Ints before int_prefix came from the int64 phase, later ones are in ints
+        self.int_prefix = 0
+        self.ints: Dict[int, int] = {}
+
+    def append(self, value: Any):
+        values = self.values
+        kind = type(value)
+        if type(values) is list:
+            values.append(value)
+        elif kind is int and values.typecode == "q" and -2 ** 63 <= value < 2 ** 63:
+            values.append(value)
+        elif (kind is float or kind is int and -self.EXACT_INT <= value <= self.EXACT_INT) and self._as_float():
+            if kind is int:
+                self.ints[len(self.values)] = value
+            self.values.append(value)
+        else:
+            self._as_list()
+            self.values.append(value)
+
+    def _as_float(self) -> bool:
+        values = self.values
+        if values.typecode == "d":
+            return True
+        if any(not -self.EXACT_INT <= v <= self.EXACT_INT for v in values):
+            return False
+        self.values, self.int_prefix = array("d", values), len(values)
+        return True
+
+    def _as_list(self):
+        values = self.values
+        if type(values) is list:
+            return
+        restored = values.tolist()
+        if values.typecode == "d":
+            for i in range(self.int_prefix):
+                restored[i] = int(restored[i])
+            for i, v in self.ints.items():
+                restored[i] = v
+        self.values, self.ints = restored, {}
+
+    def array(self) -> Any:
+        values = self.values
+        if type(values) is list:
+            return values
+        return np.array(values, dtype=np.int64 if values.typecode == "q" else np.float64)
+
+
+class SnapshotTableBuilder:
+    """
+    Accumulates frame values into the wide snapshots frame of normalize_timeline column by
+    column: columns in first-seen order and NaN where a frame lacks one, exactly as
+    building the frame from per-snapshot records, without holding a dict per snapshot
+    (and with numeric columns in typed arrays, see _SnapshotColumn).
+
+    participant_fields ((participant keys, "stats" keys)) trims the participantFrames
+    column to what its readers use; a non-empty participant never becomes empty because
+    the fallbacks only run for truthy participants.
+    """
+
+    def __init__(self, participant_fields: Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]] = None):
+        self.participant_fields = participant_fields
+        self.columns: Dict[str, _SnapshotColumn] = {}
+        self.length = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    def add(self, values: Dict[str, Any]):
+        columns, row = self.columns, self.length
+
+        def put(name: str, value: Any):
+            column = columns.get(name)
+            if column is None:
+                column = columns[name] = _SnapshotColumn(row)
+            column.append(value)
+
+        put("timestamp", values["timestamp"])
+        put("participantFrames", self._trim(values["participantFrames"]))
+        for name, value in values["cum_stats"].items():
+            put(name, value)
+        for pid, _, stats, pos in values["players"]:
+            for name, value in stats.items():
+                put(f"p{pid}_{name}", value)
+            if pos:
+                put(f"p{pid}_position", pos)
+        for name, value in values["teams"].items():
+            put(name, value)
+
+        self.length = row + 1
+        for column in columns.values():
+            if len(column.values) == row:
+                column.append(np.nan)
+
+    def _trim(self, participant_frames: Any) -> Any:
+        if self.participant_fields is None or not isinstance(participant_frames, dict):
+            return participant_frames
+        keys, stats_keys = self.participant_fields
+        trimmed = {}
+        for pid, p_frame in participant_frames.items():
+            if not isinstance(p_frame, dict) or not p_frame:
+                trimmed[pid] = p_frame
+                continue
+            kept = {key: p_frame[key] for key in keys if key in p_frame}
+            if "stats" in p_frame:
+                stats = p_frame["stats"]
+                kept["stats"] = {key: stats[key] for key in stats_keys if key in stats} if isinstance(stats, dict) else stats
+            if not kept:
+                first = next(iter(p_frame))
+                kept[first] = p_frame[first]
+            trimmed[pid] = kept
+        return trimmed
+
+    def table(self) -> pd.DataFrame:
+        return pd.DataFrame({name: column.array() for name, column in self.columns.items()})
+
+
+class TidyTableBuilder:
+    """
+    Accumulates frame values into the typed snapshots/players tables of normalize_timeline_tidy.
+    Columns are kept in typed arrays while accumulating so long timelines cost a few bytes
+    per value rather than a Python object each.
+    """
+
+    def __init__(self, game: str):
+        self.stat_names = PLAYER_STAT_COLUMNS["valorant" if game == "valorant" else "lol"]
+        self.timestamps = []
+        self.snapshot_columns = {
+            **{name: array("i") for name in CUMULATIVE_COLUMNS},
+            **{name: array("f") for name in TEAM_COLUMNS},
+        }
+        self.player_columns = {
+            "snapshot": array("i"), "player_id": array("i"), "team_id": array("i"),
+            **{name: array("f") for name in [*self.stat_names, "x", "y"]},
+        }
+        # Label -> code in first-seen order, re-sorted into categoricals at the end
+        self.labels = {"player_id": {}, "team_id": {}}
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def add(self, values: Dict[str, Any]):
+        idx = len(self)
+        self.timestamps.append(values["timestamp"])
+        for name in CUMULATIVE_COLUMNS:
+            self.snapshot_columns[name].append(values["cum_stats"][name])
+        for name in TEAM_COLUMNS:
+            self.snapshot_columns[name].append(values["teams"][name])
+
+        player_columns = self.player_columns
+        player_codes, team_codes = self.labels["player_id"], self.labels["team_id"]
+        for pid, team_id, stats, pos in values["players"]:
+            x, y = Normalizer._position_xy(pos)
+            player_columns["snapshot"].append(idx)
+            player_columns["player_id"].append(player_codes.setdefault(str(pid), len(player_codes)))
+            player_columns["team_id"].append(team_codes.setdefault(str(team_id), len(team_codes)))
+            for name in self.stat_names:
+                player_columns[name].append(stats[name])
+            player_columns["x"].append(x)
+            player_columns["y"].append(y)
+
+    def _categorical(self, column: str) -> pd.Categorical:
+        labels = list(self.labels[column])
+        categories = sorted(labels)
+        rank = {label: i for i, label in enumerate(categories)}
+        remap = np.array([rank[label] for label in labels], dtype=np.int32)
+        codes = np.frombuffer(self.player_columns[column], dtype=np.int32)
+        return pd.Categorical.from_codes(remap[codes] if len(codes) else codes, categories=categories)
+
+    def tables(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        snapshot_columns, player_columns = self.snapshot_columns, self.player_columns
+        snapshots = pd.DataFrame({
+            "timestamp": pd.to_numeric(pd.Series(self.timestamps, dtype=object), errors="coerce").astype("float64"),
+            **{name: np.array(snapshot_columns[name], dtype=np.int32) for name in CUMULATIVE_COLUMNS},
+            **{name: np.array(snapshot_columns[name], dtype=np.float32) for name in TEAM_COLUMNS},
+        })
+        snapshots.index.name = "snapshot"
+
+        players = pd.DataFrame({
+            "snapshot": np.array(player_columns["snapshot"], dtype=np.int32),
+            "player_id": self._categorical("player_id"),
+            "team_id": self._categorical("team_id"),
+            **{name: np.array(player_columns[name], dtype=np.float32) for name in [*self.stat_names, "x", "y"]},
+        })
+        return snapshots, players
+
+
 # Singleton instance
 normalizer = Normalizer()
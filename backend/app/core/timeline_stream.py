@@ -0,0 +1,369 @@
+import json
+import logging
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from .normalization import CUMULATIVE_COLUMNS, FrameSchema, Normalizer, ParsedTimeline, SnapshotTableBuilder, normalizer
+
+logger = logging.getLogger("decision-lens.timeline-stream")
+
+# Arrays whose items are consumed one at a time instead of being kept in the document
+_STATE_FRAME_ITEM = re.compile(r"^(?P<root>seriesState\.|)frames\.item$")
+_GAME_FRAME_ITEM = re.compile(r"^(?P<root>seriesState\.|)games\.item\.frames\.item$")
+_SEGMENT_FRAME_ITEM = re.compile(r"^(?P<root>seriesState\.|)games\.item\.segments\.item\.(?:payload\.)?(?:frames|snapshots|states)\.item$")
+_SEGMENT_EVENT_ITEM = re.compile(r"^(?P<root>seriesState\.|)games\.item\.segments\.item\.(?P<payload>payload\.)?events\.item$")
+_GAME_ITEM = re.compile(r"^(?P<root>seriesState\.|)games\.item$")
+_SEGMENT_ITEM = re.compile(r"^(?:seriesState\.)?games\.item\.segments\.item$")
+
+
+def _ijson():
+    # Optional dependency: without it the stream is buffered and parsed in one go
+    try:
+        import ijson
+        return ijson
+    except ImportError:
+        return None
+
+
+def _snapshots(parsed: ParsedTimeline, participant_fields: Optional[Tuple]) -> pd.DataFrame:
+    """normalize_timeline over the frames a ParsedTimeline still holds, with trimmed participants."""
+    frames, game = Normalizer._resolve_frames(parsed)
+    builder = SnapshotTableBuilder(participant_fields)
+    for values in Normalizer._iter_frames(frames, game):
+        builder.add(values)
+    return builder.table()
+
+
+class _FrameAccumulator:
+    """Normalized frames of one frame source (a game's frames, its segments, or the state)."""
+
+    def __init__(self, game: str, participant_fields: Optional[Tuple] = None):
+        self.schema = FrameSchema(game)
+        self.builder = SnapshotTableBuilder(participant_fields)
+        self.cum_stats = dict.fromkeys(CUMULATIVE_COLUMNS, 0)
+        self.events: List[Dict[str, Any]] = []
+        # Kept only while there are too few frames for normalize_timeline to use them as-is
+        self.first_frames: List[Dict[str, Any]] = []
+
+    def add(self, frame: Dict[str, Any]):
+        if len(self.first_frames) < 2:
+            self.first_frames.append(frame)
+        self.events.extend(frame.get("events", []))
+        self.builder.add(Normalizer._frame_values(frame, self.schema, self.cum_stats))
+
+    def __len__(self) -> int:
+        return len(self.builder)
+
+
+class StreamedTimeline:
+    """
+    A GRID payload parsed for analysis: a ParsedTimeline of everything except the frames
+    (events, rounds, stats, metadata) whose snapshots are already normalized. digest is
+    the SHA-256 of the payload bytes it was parsed from, when known.
+    """
+
+    def __init__(self, parsed: ParsedTimeline, digest: Optional[str] = None):
+        self.parsed = parsed
+        self.digest = digest
+
+    @classmethod
+    def from_payload(cls, timeline_data: Dict[str, Any], digest: Optional[str] = None,
+                     participant_fields: Optional[Tuple] = None) -> "StreamedTimeline":
+        """Same result for a payload that is already a dict (small or live payloads)."""
+        parsed = normalizer.parse(timeline_data)
+        parsed.snapshots = _snapshots(parsed, participant_fields)
+        return cls(parsed, digest)
+
+    @property
+    def game(self) -> str:
+        return self.parsed.game
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self.parsed.metadata
+
+    @property
+    def snapshots(self) -> pd.DataFrame:
+        return self.parsed.snapshots
+
+    def extract_events(self, event_types: List[str] = None) -> pd.DataFrame:
+        return normalizer.extract_events(self.parsed, event_types)
+
+
+class TimelineStream:
+    """
+    Incremental parser for GRID end-state JSON. feed() byte chunks as they arrive and
+    call finish() at the end: frames are normalized as soon as each one is complete and
+    then dropped, so peak memory follows the normalized snapshots rather than the payload
+    size. Selection of frames and events and the snapshots match normalize_timeline.
+
+    The game decides how player stats are read, so pass it when known; otherwise it comes
+    from a titleId/metadata seen before the frames, and game_mismatch tells when that
+    guess was wrong. participant_fields trims participantFrames (SnapshotTableBuilder).
+    """
+
+    def __init__(self, game: Optional[str] = None, participant_fields: Optional[Tuple] = None):
+        self.game_hint = game
+        self.participant_fields = participant_fields
+        self.game_mismatch = False
+        self._closed = False
+        self._ijson = _ijson()
+        self._buffer: Optional[bytearray] = None
+        self._frame_game: Optional[str] = None
+        self._title_id: Optional[str] = None
+        self._metadata_game: Optional[str] = None
+        self._state_seen = False
+        self.bytes_fed = 0
+        self.frames_seen = 0
+
+        # Frame sources keyed by ("root"|"series",) or (games root, game index, "frames"|"segments")
+        self._frames: Dict[Tuple, _FrameAccumulator] = {}
+        # Streamed segment events keyed by (games root, game index, segment index)
+        self._segment_events: Dict[Tuple, Dict[str, List[Dict[str, Any]]]] = {}
+        self._game_index = {"": -1, "seriesState.": -1}
+        self._segment_index = -1
+
+        if self._ijson is None:
+            logger.warning("ijson is not installed, buffering the whole GRID payload before parsing")
+            self._buffer = bytearray()
+            return
+
+        self._skeleton = self._ijson.ObjectBuilder()
+        # Containers (and current map keys) of the streamed item being built
+        self._stack: List[Any] = []
+        self._keys: List[Optional[str]] = []
+        self._item_target: Optional[Tuple] = None
+        self._events = self._ijson.sendable_list()
+        self._parser = self._ijson.parse_coro(self._events, use_float=True)
+
+    def feed(self, chunk: bytes):
+        self.bytes_fed += len(chunk)
+        if self._buffer is not None:
+            self._buffer.extend(chunk)
+            return
+        self._parser.send(chunk)
+        self._drain()
+
+    @classmethod
+    def parse_chunks(cls, chunks: Callable[[], Iterable[bytes]], game: Optional[str] = None,
+                     participant_fields: Optional[Tuple] = None) -> StreamedTimeline:
+        """
+        Parse a whole payload from chunks() (e.g. SeriesCache.iter_blob), reading it a
+        second time if its frames turned out to belong to another game.
+        """
+        stream = cls(game, participant_fields)
+        for chunk in chunks():
+            stream.feed(chunk)
+        timeline = stream.finish()
+        if stream.game_mismatch:
+            return cls.parse_chunks(chunks, timeline.game, participant_fields)
+        return timeline
+
+    def close(self) -> Dict[str, Any]:
+        """
+        End of input: the top-level document without the streamed frames and segment events
+        (the whole payload when ijson is missing). Raises ValueError on malformed JSON.
+        """
+        if not self._closed:
+            self._closed = True
+            if self._buffer is not None:
+                self._payload = json.loads(bytes(self._buffer))
+                self._buffer = None
+                return self._payload
+            self._parser.close()
+            self._drain()
+            self._payload = self._skeleton.value if isinstance(self._skeleton.value, dict) else {}
+        return self._payload
+
+    def finish(self, base: Optional[Dict[str, Any]] = None) -> StreamedTimeline:
+        """
+        The parsed timeline. base holds top-level keys the payload is merged onto (as
+        base.update(payload)), e.g. the series details around a GRID end-state file.
+        """
+        payload = self.close()
+        if base:
+            payload = {**base, **payload}
+        if self._ijson is None:
+            return StreamedTimeline.from_payload(payload, participant_fields=self.participant_fields)
+
+        parsed = ParsedTimeline(payload)
+        if self._frame_game is not None and self._frame_game != parsed.game:
+            self.game_mismatch = True
+            logger.warning(f"Frames were normalized as {self._frame_game} but the payload is {parsed.game}; "
+                           f"pass the game to TimelineStream for this payload")
+
+        source, variant = self._select_source(parsed)
+        accumulator = self._frames.get(source) if source else None
+        if accumulator is not None:
+            frame_events = accumulator.events
+        else:
+            frame_events = [event for frame in parsed.frames for event in frame.get("events", [])]
+        parsed.events = frame_events + self._collect_segment_events(parsed) + [
+            event for round_data in parsed.rounds for event in round_data.get("events", [])
+        ]
+
+        if accumulator is not None and len(accumulator) >= 2:
+            parsed.frames, parsed.variant = [], variant
+            parsed.snapshots = accumulator.builder.table()
+        else:
+            # Too few frames: let the normalizer synthesize a trend exactly as for a dict payload
+            if accumulator is not None and len(accumulator):
+                parsed.frames, parsed.variant = accumulator.first_frames, variant
+            parsed.snapshots = _snapshots(parsed, self.participant_fields)
+
+        logger.info(f"Streamed {self.bytes_fed} bytes: {self.frames_seen} frames, {len(parsed.snapshots)} snapshots "
+                    f"({parsed.variant}), {len(parsed.events)} events")
+        return StreamedTimeline(parsed)
+
+    def _drain(self):
+        # Items (frames, segment events) are built inline: this loop sees every JSON token
+        # of the payload, so it avoids per-token method calls
+        stack, keys = self._stack, self._keys
+        for prefix, event, value in self._events:
+            if not stack:
+                self._on_event(prefix, event, value)
+                continue
+            if event == "map_key":
+                keys[-1] = value
+                continue
+            if event == "end_map" or event == "end_array":
+                done = stack.pop()
+                keys.pop()
+                if not stack:
+                    self._emit(done)
+                continue
+            if event == "start_map":
+                value = {}
+            elif event == "start_array":
+                value = []
+            top = stack[-1]
+            if type(top) is dict:
+                top[keys[-1]] = value
+            else:
+                top.append(value)
+            if event == "start_map" or event == "start_array":
+                stack.append(value)
+                keys.append(None)
+        del self._events[:]
+
+    def _on_event(self, prefix: str, event: str, value: Any):
+        if prefix.endswith(".item") or prefix == "item":
+            target = self._item_target_for(prefix)
+            if target is not None:
+                self._item_target = target
+                if event == "start_map" or event == "start_array":
+                    self._stack.append({} if event == "start_map" else [])
+                    self._keys.append(None)
+                else:
+                    self._emit(value)
+                return
+
+        if event == "start_map":
+            game_match = _GAME_ITEM.match(prefix)
+            if game_match:
+                self._game_index[game_match.group("root")] += 1
+                self._segment_index = -1
+            elif _SEGMENT_ITEM.match(prefix):
+                self._segment_index += 1
+        elif event in ("string", "number"):
+            if prefix in ("titleId", "seriesState.titleId"):
+                self._title_id = str(value)
+            elif prefix == "metadata.game":
+                self._metadata_game = value
+        if prefix.startswith(("seriesState", "games", "titleId")):
+            self._state_seen = True
+        self._skeleton.event(event, value)
+
+    def _item_target_for(self, prefix: str) -> Optional[Tuple]:
+        match = _STATE_FRAME_ITEM.match(prefix)
+        if match:
+            return ("frame", ("series",) if match.group("root") else ("root",))
+        for pattern, kind in ((_GAME_FRAME_ITEM, "frames"), (_SEGMENT_FRAME_ITEM, "segments")):
+            match = pattern.match(prefix)
+            if match:
+                root = match.group("root")
+                return ("frame", (root, self._game_index[root], kind))
+
+        match = _SEGMENT_EVENT_ITEM.match(prefix)
+        if match:
+            root = match.group("root")
+            key = (root, self._game_index[root], self._segment_index)
+            return ("event", key, "payload" if match.group("payload") else "segment")
+        return None
+
+    def _emit(self, item: Any):
+        target = self._item_target
+        if target[0] == "frame":
+            if not isinstance(item, dict):
+                return
+            key = target[1]
+            accumulator = self._frames.get(key)
+            if accumulator is None:
+                if len(key) == 3 and not self._supersede(key):
+                    return
+                accumulator = self._frames[key] = _FrameAccumulator(self._current_game(), self.participant_fields)
+            accumulator.add(item)
+            self.frames_seen += 1
+        else:
+            lists = self._segment_events.setdefault(target[1], {"segment": [], "payload": []})
+            lists[target[2]].append(item)
+
+    def _supersede(self, key: Tuple) -> bool:
+        """
+        Only the latest game with frames is used, and a game's own frames win over its
+        segment frames (ParsedTimeline._select_frames), so drop sources that can no longer
+        be selected instead of normalizing them. False when key itself is already outranked.
+        """
+        root, index, kind = key
+        if kind == "segments" and self._frames.get((root, index, "frames")):
+            return False
+        for other in list(self._frames):
+            if len(other) == 3 and other[0] == root and (other[1] < index or other[1] == index and kind == "frames"):
+                del self._frames[other]
+        return True
+
+    def _current_game(self) -> str:
+        if self._frame_game is None:
+            if self.game_hint:
+                self._frame_game = self.game_hint
+            elif self._title_id is not None or self._state_seen:
+                self._frame_game = "valorant" if self._title_id == "6" else "lol"
+            else:
+                self._frame_game = self._metadata_game or "lol"
+        return self._frame_game
+
+    def _select_source(self, parsed: ParsedTimeline) -> Tuple[Optional[Tuple], str]:
+        """Frame source ParsedTimeline would have picked, from the skeleton's shape."""
+        if not parsed.state:
+            return ("root",), "frames" if self._frames.get(("root",)) else "empty"
+        root = "seriesState." if parsed.state is not parsed.raw else ""
+        if not parsed.games:
+            return ("series",) if root else ("root",), "state-frames"
+        for index in range(len(parsed.games) - 1, -1, -1):
+            game = parsed.games[index]
+            frames = self._frames.get((root, index, "frames"))
+            if frames:
+                return (root, index, "frames"), "game-frames"
+            segments = self._frames.get((root, index, "segments"))
+            if segments and "segments" in game:
+                return (root, index, "segments"), "segments"
+        # No frames anywhere: the skeleton already holds the game-summary fallback
+        return None, parsed.variant
+
+    def _collect_segment_events(self, parsed: ParsedTimeline) -> List[Dict[str, Any]]:
+        """Segment events in document order, with the same precedence as ParsedTimeline."""
+        root = "seriesState." if parsed.state is not None and parsed.state is not parsed.raw else ""
+        events = []
+        for game_index, game in enumerate(parsed.games):
+            for segment_index, segment in enumerate(game.get("segments", [])):
+                streamed = self._segment_events.get((root, game_index, segment_index), {})
+                payload = segment.get("payload")
+                s_events = streamed.get("segment") or segment.get("events", [])
+                if not s_events and isinstance(payload, dict):
+                    s_events = streamed.get("payload") or payload.get("events", [])
+                if not s_events and segment.get("type") == "event":
+                    s_events = [segment.get("payload", {})]
+                events.extend(s_events)
+        return events
@@ -1,4 +1,5 @@
 import math
+import zlib
 import numpy as np
 from typing import Any
 
@@ -24,3 +25,11 @@ def clean_json_data(obj: Any) -> Any:
     if isinstance(obj, list):
         return [clean_json_data(x) for x in obj]
     return obj
+
+
+def stable_hash(value: Any) -> int:
+    """
+    Process-independent replacement for hash() on strings: hash() is salted per
+    process (PYTHONHASHSEED), which made derived outputs differ between workers.
+    """
+    return zlib.crc32(str(value).encode("utf-8"))
@@ -2,18 +2,18 @@ import logging
 import math
 import asyncio
 import json
+from contextlib import asynccontextmanager
 from typing import Dict, List, Any
 import numpy as np
-import pandas as pd
 from fastapi import FastAPI, HTTPException, Response, Body, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from app.services.grid_service import grid_service
 from app.services.live_stream_service import live_stream_service
-from app.core.normalization import normalizer
-from app.analytics.micro import micro_analytics
-from app.analytics.macro import macro_analytics
 from app.core.decision_engine import decision_engine
-from app.services.ai_insight_service import ai_insight_service
+from app.services.review_service import REVIEW_LAYOUTS, review_service
+from app.services.review_executor import review_executor
+from app.services.review_jobs import ReviewQueueFull, review_jobs
 from app.core.utils import clean_json_data
 
 # Configure logging
@@ -23,7 +23,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger("decision-lens")
 
-app = FastAPI(title="DecisionLens API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled GRID client per worker, reused across requests
+    await grid_service.start()
+    # Load the model artifact off the event loop so the worker serves at once; /ready reports when done
+    warmup = asyncio.create_task(asyncio.to_thread(decision_engine.warm_up))
+    yield
+    if not warmup.done():
+        await warmup
+    live_stream_service.stop_stream()
+    await review_jobs.stop()
+    await grid_service.close()
+    decision_engine.close()
+    review_executor.close()
+
+app = FastAPI(title="DecisionLens API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -43,6 +58,11 @@ async def health():
     logger.info("Health check endpoint hit")
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def ready():
+    status = decision_engine.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
 @app.get("/api/matches/live")
 async def get_live_matches(game: str = "lol"):
     try:
@@ -53,13 +73,28 @@ async def get_live_matches(game: str = "lol"):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.websocket("/ws/live")
-async def websocket_endpoint(websocket: WebSocket):
-    await live_stream_service.connect(websocket)
+async def websocket_endpoint(websocket: WebSocket, match_id: str | None = None, protocol: str = "full"):
+    # Optional comma-separated match_ids to subscribe to on connect;
+    # protocol=delta switches to keyframes plus JSON-patch deltas
+    match_ids = [m for m in (match_id or "").split(",") if m]
+    await live_stream_service.connect(websocket, match_ids, protocol=protocol)
     try:
         while True:
-            # Keep connection alive and listen for any client messages
+            # Keep connection alive and listen for subscription messages
             data = await websocket.receive_text()
             logger.info(f"Received message from client: {data}")
+            try:
+                message = json.loads(data)
+            except ValueError:
+                continue
+            if not isinstance(message, dict) or not message.get("match_id"):
+                continue
+            if message.get("action") == "subscribe":
+                live_stream_service.subscribe(websocket, str(message["match_id"]))
+            elif message.get("action") == "unsubscribe":
+                live_stream_service.unsubscribe(websocket, str(message["match_id"]))
+            elif message.get("action") == "resync":
+                live_stream_service.resync(websocket, str(message["match_id"]))
     except WebSocketDisconnect:
         live_stream_service.disconnect(websocket)
     except Exception as e:
@@ -68,16 +103,33 @@ async def websocket_endpoint(websocket: WebSocket):
 
 @app.post("/api/live/start/{match_id}")
 async def start_live_stream(match_id: str, game: str | None = None):
-    import asyncio
-    # Run the stream in the background
-    asyncio.create_task(live_stream_service.start_live_stream(match_id, game))
-    return {"status": "started", "match_id": match_id, "game": game}
+    # Run the stream in the background; a running session is reused, not restarted
+    already_running = match_id in live_stream_service.sessions and live_stream_service.sessions[match_id].is_running
+    live_stream_service.start_session(match_id, game)
+    return {"status": "running" if already_running else "started", "match_id": match_id, "game": game}
 
 @app.post("/api/live/stop")
 async def stop_live_stream():
     live_stream_service.stop_stream()
     return {"status": "stopped"}
 
+@app.post("/api/live/stop/{match_id}")
+async def stop_live_match(match_id: str):
+    live_stream_service.stop_stream(match_id)
+    return {"status": "stopped", "match_id": match_id}
+
+@app.get("/api/live/sessions")
+async def get_live_sessions():
+    return live_stream_service.list_sessions()
+
+@app.get("/api/live/connections")
+async def get_live_connections():
+    return live_stream_service.connection_stats()
+
+@app.get("/api/cache/grid")
+async def get_grid_cache_stats():
+    return grid_service.cache.stats()
+
 @app.post("/api/simulate")
 async def simulate_state(payload: Dict[str, Any] = Body(...)):
     logger.info("Simulation request received")
@@ -102,155 +154,141 @@ async def simulate_state(payload: Dict[str, Any] = Body(...)):
         logger.error(f"Simulation error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/match/{match_id}/review")
-async def get_match_review(match_id: str, game: str | None = None):
-    logger.info(f"Fetching review for match_id: {match_id}")
+@app.post("/api/simulate/sweep")
+async def simulate_sweep(payload: Dict[str, Any] = Body(...)):
+    """
+    Counterfactual curves around a base state, e.g.
+    {"current_state": {...}, "ranges": {"gold_diff": {"start": -5000, "stop": 5000, "step": 500},
+     "dragons_diff": {"start": 0, "stop": 3, "step": 1, "relative": true}},
+     "modifications": [{"barons_diff": 1}], "include_shap": true}
+    """
+    logger.info("Counterfactual sweep request received")
     try:
-        # Simulate delay for realism
-        import asyncio
-        await asyncio.sleep(0.5)
-        
-        # 1. Fetch data from GRID
-        logger.info(f"Requesting data from GRID for match: {match_id}")
-        match_data = await grid_service.get_match_timeline(match_id)
-        
-        metadata = match_data.get("metadata", {})
-        detected_game = metadata.get("game", "lol")
-        game = game or detected_game
-        metadata["game"] = game
-        
-        # 2. Normalize
-        logger.info(f"Normalizing {game} timeline data")
-        snapshots = normalizer.normalize_timeline(match_data).fillna(0) 
-        
-        # Extract multiple event types
-        event_types = ["KILL", "SPIKE_PLANTED", "SPIKE_DEFUSED"] if game == "valorant" else ["CHAMPION_KILL", "ELITE_MONSTER_KILL", "BUILDING_KILL"]
-        events = normalizer.extract_events(match_data, event_types).fillna(0)
-        logger.info(f"Extracted {len(events)} events and {len(snapshots)} snapshots")
-        
-        # If events are still empty and we have no snapshots, don't create mock events
-        if events.empty and snapshots.empty:
-            logger.info("No events or snapshots found in GRID data")
-            events = pd.DataFrame(columns=["type", "timestamp", "killerId", "victimId", "headshot"])
-        
-        # 3. Analyze
-        logger.info(f"Running micro and macro analytics for {game}")
-        micro = micro_analytics.analyze_player_mistakes(events, snapshots, game=game)
-        player_stats = micro_analytics.compute_player_efficiency(snapshots, events, game=game)
-        macro_shifts = macro_analytics.identify_strategic_inflections(snapshots, game=game, events_df=events)
-        objectives = macro_analytics.evaluate_objective_control(events, game=game)
-        draft_analysis = macro_analytics.analyze_draft_synergy(metadata)
-        
-        # 4. Decision Engine (Get latest state for analysis)
-        if not snapshots.empty:
-            logger.info("Preparing current state for decision engine")
-            
-            # Prepare feature sets for all snapshots
-            all_states = []
-            for idx, row in snapshots.iterrows():
-                row_dict = row.to_dict()
-                ts = row_dict.get("timestamp", 0)
-                past_events = events[events['timestamp'] <= ts] if not events.empty else pd.DataFrame()
-                
-                if game == "valorant":
-                    state = {
-                        "gold_diff": row_dict.get("gold_diff", 0),
-                        "xp_diff": row_dict.get("xp_diff", 0),
-                        "time_seconds": ts / 1000,
-                        "dragons_diff": len(past_events[past_events['type'] == 'SPIKE_PLANTED']) if not past_events.empty else 0,
-                        "towers_diff": len(past_events[past_events['type'] == 'SPIKE_DEFUSED']) if not past_events.empty else 0,
-                        "barons_diff": 0,
-                        "team100_kills": len(past_events[(past_events['type'] == 'KILL') & (past_events['killerId'] <= 5)]) if not past_events.empty else 0,
-                        "team200_kills": len(past_events[(past_events['type'] == 'KILL') & (past_events['killerId'] > 5)]) if not past_events.empty else 0
-                    }
-                else:
-                    state = {
-                        "gold_diff": row_dict.get("gold_diff", 0),
-                        "xp_diff": row_dict.get("xp_diff", 0),
-                        "time_seconds": ts / 1000,
-                        "dragons_diff": len(past_events[(past_events['type'] == 'ELITE_MONSTER_KILL') & (past_events['monsterType'] == 'DRAGON')]) if not past_events.empty else 0,
-                        "towers_diff": len(past_events[(past_events['type'] == 'BUILDING_KILL') & (past_events['buildingType'] == 'TOWER')]) if not past_events.empty else 0,
-                        "barons_diff": len(past_events[(past_events['type'] == 'ELITE_MONSTER_KILL') & (past_events['monsterType'] == 'BARON')]) if not past_events.empty else 0,
-                        "team100_kills": len(past_events[(past_events['type'] == 'CHAMPION_KILL') & (past_events['killerId'] <= 5)]) if not past_events.empty else 0,
-                        "team200_kills": len(past_events[(past_events['type'] == 'CHAMPION_KILL') & (past_events['killerId'] > 5)]) if not past_events.empty else 0
-                    }
-                all_states.append(state)
+        # Batched predict/SHAP is CPU-bound; keep it off the event loop
+        result = await asyncio.to_thread(
+            decision_engine.counterfactual_sweep,
+            payload.get("current_state", {}),
+            ranges=payload.get("ranges"),
+            modifications=payload.get("modifications"),
+            include_shap=payload.get("include_shap", True),
+        )
+        return clean_json_data(result)
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Sweep error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-            # Bulk predict win probabilities
-            logger.info(f"Predicting win probabilities for {len(all_states)} snapshots")
-            probs = decision_engine.predict_bulk_probabilities(all_states)
-            
-            # Enrich snapshots with probabilities and player stats
-            enriched_snapshots = []
-            for idx, p in enumerate(probs):
-                snapshot_row = snapshots.iloc[idx].to_dict()
-                snapshot_row['win_prob'] = p
-                
-                # We filter events up to this snapshot
-                snap_ts = snapshot_row.get("timestamp", 0)
-                snap_events = events[events['timestamp'] <= snap_ts]
-                
-                # Compute player stats
-                snap_df = pd.DataFrame([snapshots.iloc[idx]])
-                snapshot_row['player_stats'] = micro_analytics.compute_player_efficiency(snap_df, snap_events, game=game)
-                
-                # Compute SHAP for each snapshot for true dynamic analysis
-                snapshot_row['shap_explanations'] = decision_engine.explain_decision(all_states[idx])
-                
-                enriched_snapshots.append(snapshot_row)
+@app.post("/api/simulate/surface")
+async def simulate_surface(payload: Dict[str, Any] = Body(...)):
+    """
+    2D win-probability grid over two features, e.g.
+    {"current_state": {...}, "x": {"feature": "towers_diff", "start": -5, "stop": 5, "step": 1},
+     "y": {"feature": "time_seconds", "start": 0, "stop": 2700, "step": 60}}
+    """
+    try:
+        x, y = payload.get("x") or {}, payload.get("y") or {}
+        surface = await asyncio.to_thread(
+            decision_engine.sensitivity_surface,
+            payload.get("current_state", {}),
+            x.get("feature"), x.get("values", x),
+            y.get("feature"), y.get("values", y),
+        )
+        # Cached surfaces are plain floats/lists: skip re-encoding and serialize directly
+        return JSONResponse(content=surface)
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Surface error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-            current_state = all_states[-1]
-            shap_explanations = enriched_snapshots[-1]['shap_explanations']
-            player_stats = enriched_snapshots[-1]['player_stats']
-        else:
-            logger.warning("Snapshots are empty, returning default state")
-            current_state = {
-                "gold_diff": 0, "dragons_diff": 0, "time_seconds": 0,
-                "xp_diff": 0, "towers_diff": 0, "barons_diff": 0,
-                "team100_kills": 0, "team200_kills": 0
-            }
-            player_stats = []
-            enriched_snapshots = []
-            shap_explanations = {}
-            
-        logger.info("Performing what-if analysis")
-        what_if = decision_engine.what_if_analysis(current_state, {"dragons_diff": current_state["dragons_diff"] + 1})
-        
-        # 5. Generate Insights
-        logger.info("Generating AI insights")
-        ai_summary = ai_insight_service.generate_coach_summary(micro, macro_shifts, [
-            {
-                "what_if": f"Better performance on {('site entries' if game == 'valorant' else 'objective setup')}", 
-                "delta": what_if["delta"] * 100,
-                "current_probability": what_if["current_probability"]
-            }
-        ], game=game, player_stats=player_stats)
-        
-        logger.info("Successfully processed match review")
-        response_data = {
-            "match_id": match_id,
-            "game": game,
-            "metadata": metadata,
-            "micro_insights": micro,
-            "macro_insights": macro_shifts,
-            "objectives": objectives,
-            "decision_analysis": what_if,
-            "shap_explanations": shap_explanations,
-            "ai_coach_summary": ai_summary,
-            "current_state": current_state,
-            "player_stats": player_stats,
-            "draft_analysis": draft_analysis,
-            "timeline_snapshots": enriched_snapshots
-        }
-        
-        try:
-            cleaned_response = clean_json_data(response_data)
-            
-            import json
-            return Response(content=json.dumps(cleaned_response), media_type="application/json")
-        except Exception as json_err:
-            logger.error(f"Serialization error: {str(json_err)}", exc_info=True)
-            raise HTTPException(status_code=500, detail="Error serializing match review data")
+@app.get("/api/match/{match_id}/review")
+async def get_match_review(match_id: str, game: str | None = None, layout: str = "rows"):
+    """
+    The full review JSON. layout=columnar returns timeline_snapshots as per-metric arrays
+    (see ColumnarTimeline) instead of one dict per snapshot, for long matches.
+    """
+    logger.info(f"Fetching review for match_id: {match_id}")
+    if layout not in REVIEW_LAYOUTS:
+        raise HTTPException(status_code=400, detail=f"Unknown layout {layout!r}, expected one of {', '.join(REVIEW_LAYOUTS)}")
+    try:
+        content = await review_service.get_review(match_id, game, layout=layout)
+        return Response(content=content, media_type="application/json")
     except Exception as e:
         logger.error(f"Error processing match review: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/match/{match_id}/review/stream")
+async def stream_match_review(match_id: str, game: str | None = None):
+    """
+    The review as NDJSON, one line per section as soon as it is computed: metadata and
+    insights first, then timeline_snapshots chunks (win_prob), then snapshot_details
+    chunks (player_stats, shap_explanations), the summary sections and "complete".
+    """
+    logger.info(f"Streaming review for match_id: {match_id}")
+    return StreamingResponse(review_service.stream_review(match_id, game), media_type="application/x-ndjson")
+
+@app.post("/api/match/{match_id}/review/jobs")
+async def submit_review_job(match_id: str, game: str | None = None, priority: str = "interactive"):
+    """Queue a review (priority live, interactive or bulk) and return the job to poll or stream."""
+    try:
+        job = review_jobs.submit(match_id, game, priority)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ReviewQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return JSONResponse(status_code=202, content=job.to_dict())
+
+@app.get("/api/reviews/jobs")
+async def get_review_job_stats():
+    return review_jobs.stats()
+
+@app.get("/api/reviews/jobs/{job_id}")
+async def get_review_job(job_id: str):
+    job = review_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown review job")
+    return job.to_dict()
+
+@app.get("/api/reviews/jobs/{job_id}/events")
+async def stream_review_job(job_id: str):
+    """Server-sent events: one job snapshot per stage change until the job finishes."""
+    job = review_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown review job")
+
+    async def events():
+        async for snapshot in review_jobs.watch(job):
+            yield f"event: {snapshot['status']}\ndata: {json.dumps(snapshot)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/api/reviews/jobs/{job_id}/result")
+async def get_review_job_result(job_id: str):
+    job = review_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown review job")
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.result_expired:
+        raise HTTPException(status_code=410, detail="Review result expired; submit a new job (it is served from the review cache)")
+    if job.result is None:
+        # Not done yet: the job itself says how far along it is
+        return JSONResponse(status_code=202, content=job.to_dict())
+    return Response(content=job.result, media_type="application/json")
+
+@app.get("/api/cache/reviews")
+async def get_review_cache_stats():
+    return review_service.cache.stats()
+
+@app.get("/api/reviews/executor")
+async def get_review_executor_stats():
+    return review_executor.stats()
+
+@app.get("/api/coalescing")
+async def get_coalescing_stats():
+    return {"grid": grid_service.flights.stats(), "reviews": review_service.flights.stats()}
+
+@app.get("/api/cache/surfaces")
+async def get_surface_cache_stats():
+    return decision_engine.surface_cache_stats()
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Callable, Optional
+from fastapi import WebSocket
+
+logger = logging.getLogger("decision-lens.fanout")
+
+# Slow-consumer policies when a client's queue is full
+DROP_OLDEST = "drop_oldest"
+# Keep only the newest queued message of each type (e.g. STATE_UPDATE)
+COALESCE = "coalesce"
+
+# Live state protocols: every tick as a full STATE_UPDATE, or keyframes plus deltas
+FULL_PROTOCOL = "full"
+DELTA_PROTOCOL = "delta"
+
+
+class ClientChannel:
+    """
+    Bounded outbound queue for one WebSocket, drained by its own task so a
+    slow client never delays the others. Messages are pre-serialized text.
+    """
+
+    def __init__(self, websocket: WebSocket, max_queue: int = 32, policy: str = DROP_OLDEST,
+                 send_timeout: float = 5.0, on_dead: Optional[Callable[[WebSocket], None]] = None,
+                 protocol: str = FULL_PROTOCOL):
+        self.websocket = websocket
+        self.protocol = protocol
+        self.max_queue = max(max_queue, 1)
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.on_dead = on_dead
+        self.queue: deque = deque()
+        self.sent = 0
+        self.dropped = 0
+        self.closed = False
+        self._ready = asyncio.Event()
+        self._task = asyncio.create_task(self._drain())
+
+    def enqueue(self, text: str, kind: Optional[str] = None) -> bool:
+        """Queue a serialized message; never blocks. Returns False once the channel is closed."""
+        if self.closed:
+            return False
+        if self.policy == COALESCE and kind is not None and len(self.queue) >= self.max_queue:
+            # Only under backpressure: a client keeping up still gets every message
+            before = len(self.queue)
+            self.queue = deque(item for item in self.queue if item[0] != kind)
+            self.dropped += before - len(self.queue)
+        while len(self.queue) >= self.max_queue:
+            self.queue.popleft()
+            self.dropped += 1
+        self.queue.append((kind, text))
+        self._ready.set()
+        return True
+
+    async def _drain(self):
+        try:
+            while True:
+                while not self.queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                _, text = self.queue.popleft()
+                await asyncio.wait_for(self.websocket.send_text(text), timeout=self.send_timeout)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Evicting dead client connection: {e!r}")
+            self.closed = True
+            self.queue.clear()
+            if self.on_dead:
+                self.on_dead(self.websocket)
+
+    def close(self):
+        self.closed = True
+        self.queue.clear()
+        if not self._task.done() and self._task is not asyncio.current_task():
+            self._task.cancel()
@@ -1,14 +1,98 @@
+import asyncio
+import hashlib
 import httpx
+import json
 import os
 import logging
-from typing import Dict, Any, Optional, List
+import zlib
+from typing import Dict, Any, Optional, List, Tuple
 from dotenv import load_dotenv
+from app.core.timeline_stream import StreamedTimeline, TimelineStream
 from .grid_queries import GET_RECENT_SERIES, GET_SERIES_DETAILS, GET_SERIES_STATS
+from .series_cache import BlobWriter, SeriesCache
+from .single_flight import SingleFlight
 
 load_dotenv()
 logger = logging.getLogger("decision-lens.grid")
 
 
+class SeriesSource:
+    """
+    A series to analyze: streamed in while it downloaded (timeline), or a series cache blob
+    (path) left for whoever analyzes it to stream. digest is the SHA-256 of the payload
+    bytes either way and game the series' own game.
+    """
+
+    def __init__(self, digest: str, game: str, timeline: Optional[StreamedTimeline] = None, path: Optional[str] = None):
+        self.digest = digest
+        self.game = game
+        self.timeline = timeline
+        self.path = path
+
+
+class _EndStateSpool:
+    """
+    An end-state file streamed through TimelineStream and a BlobWriter at once. The blob is
+    the merged series payload of get_match_timeline: the file's members, then the members
+    of the series envelope it lacks (result.update(file)), so a cache hit reads back the
+    same payload either way.
+    """
+
+    def __init__(self, writer: BlobWriter, participant_fields: Optional[tuple] = None):
+        self.writer = writer
+        self.parser = TimelineStream(participant_fields=participant_fields)
+        self._started = False
+        self._tail = b""
+
+    def feed(self, chunk: bytes):
+        self.parser.feed(chunk)
+        if not self._started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                return
+            if chunk[:1] != b"{":
+                raise ValueError("End-state file is not a JSON object")
+            self.writer.write(b"{")
+            chunk = chunk[1:]
+            self._started = True
+        # The closing brace (and any whitespace around it) is held back until the envelope is known
+        data = self._tail + chunk
+        body = data.rstrip()
+        if body:
+            self.writer.write(body[:-1])
+            self._tail = data[len(body) - 1:]
+        else:
+            self._tail = data
+
+    def close(self) -> Dict[str, Any]:
+        """The file's top-level document without its frames (TimelineStream.close)."""
+        return self.parser.close()
+
+    def finish(self, envelope: Dict[str, Any], key: Optional[str], finished: bool,
+               meta: Optional[Dict[str, Any]] = None) -> Tuple[StreamedTimeline, Optional[str]]:
+        """
+        Append the envelope as stored and file the blob under key (or drop it when key is
+        None); returns the timeline merged onto the envelope and the blob path, if any.
+        """
+        document = self.close()
+        stored = {k: v for k, v in envelope.items() if k not in document}
+        if stored.get("metadata"):
+            # The video URL carries the API key, so it is never written to disk
+            stored["metadata"] = {k: v for k, v in stored["metadata"].items() if k != "video_url"}
+        members = json.dumps(stored, separators=(",", ":"))[1:-1]
+        if members:
+            self.writer.write(b"," + members.encode() if document else members.encode())
+        self.writer.write(b"}")
+
+        if key is None:
+            self.writer.abort()
+        else:
+            self.writer.commit(key, finished, meta)
+        timeline = self.parser.finish(envelope)
+        timeline.digest = self.writer.digest
+        return timeline, self.writer.path
+
+
 class GridService:
     """
     GRID API Service based on official documentation:
@@ -17,13 +101,28 @@ class GridService:
     - Series State API: WebSocket only (not REST)
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, files_base_url: Optional[str] = None,
+                 cache: Optional[SeriesCache] = None):
         self.api_key = api_key or os.getenv("GRID_API_KEY")
 
         # Official GRID API endpoints per documentation
-        self.central_data_url = "https://api-op.grid.gg/central-data/graphql"
-        self.statistics_url = "https://api-op.grid.gg/statistics-feed/graphql"
-        self.file_download_url = "https://api.grid.gg/file-download"
+        base_url = (base_url or os.getenv("GRID_BASE_URL") or "https://api-op.grid.gg").rstrip("/")
+        files_base_url = (files_base_url or os.getenv("GRID_BASE_URL_2") or "https://api.grid.gg").rstrip("/")
+        self.central_data_url = f"{base_url}/central-data/graphql"
+        self.statistics_url = f"{base_url}/statistics-feed/graphql"
+        self.file_download_url = f"{files_base_url}/file-download"
+        self.series_state_url = f"{files_base_url}/series-state"
+        # End-state files are parsed as they download, this many bytes at a time
+        self.stream_chunk_bytes = int(os.getenv("GRID_STREAM_CHUNK_BYTES", str(1024 * 1024)))
+
+        # Long-lived pooled client, opened/closed with the app lifespan
+        self._client: Optional[httpx.AsyncClient] = None
+        self.max_connections = int(os.getenv("GRID_MAX_CONNECTIONS", "20"))
+
+        # Finished series are immutable, so repeat reviews are served from disk
+        self.cache = cache or SeriesCache()
+        # Concurrent requests for the same series share one fetch
+        self.flights = SingleFlight("grid")
 
         self.headers = {
             "x-api-key": self.api_key or "",
@@ -33,88 +132,283 @@ class GridService:
         if not self.api_key or self.api_key == "YOUR_GRID_API_KEY":
             logger.error("No valid GRID_API_KEY found.")
 
-    async def get_match_timeline(self, match_id: str) -> Dict[str, Any]:
+    async def start(self):
+        """Open the pooled HTTP client (called from the FastAPI lifespan)."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                timeout=30.0,
+            )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        # Scripts that never ran the lifespan still get a pooled client
+        if self._client is None or self._client.is_closed:
+            await self.start()
+        return self._client
+
+    async def _fetch_end_state(self, client: httpx.AsyncClient, match_id: str) -> Tuple[Dict[str, Any], bool]:
+        """
+        Full end-state file, falling back to the Series State API for live matches.
+        The flag is True when the payload is the (immutable) end-state file.
+        """
+        try:
+            logger.info(f"Fetching end-state data for series {match_id}")
+            file_res = await client.get(
+                f"{self.file_download_url}/end-state/grid/series/{match_id}",
+                headers={"x-api-key": self.api_key},
+                timeout=30.0,
+            )
+            
+            if file_res.status_code == 200:
+                logger.info(f"Successfully fetched full timeline for {match_id}")
+                return file_res.json(), True
+
+            logger.warning(f"File Download API not available (Status: {file_res.status_code}), falling back to Series State")
+            return await self._fetch_series_state(client, match_id), False
+        except Exception as e:
+            logger.error(f"Error calling GRID APIs: {str(e)}")
+        return {}, False
+
+    async def _stream_end_state(self, client: httpx.AsyncClient, match_id: str,
+                                participant_fields: Optional[tuple]) -> Tuple[Dict[str, Any], Optional[_EndStateSpool]]:
+        """
+        _fetch_end_state without holding the file: it goes through an _EndStateSpool chunk
+        by chunk and its top-level document comes back without the frames. The Series State
+        API fallback comes back whole, with no spool.
+        """
+        try:
+            logger.info(f"Streaming end-state data for series {match_id}")
+            async with client.stream(
+                "GET",
+                f"{self.file_download_url}/end-state/grid/series/{match_id}",
+                headers={"x-api-key": self.api_key},
+                timeout=30.0,
+            ) as file_res:
+                if file_res.status_code == 200:
+                    spool = _EndStateSpool(self.cache.writer(), participant_fields)
+                    try:
+                        async for chunk in file_res.aiter_bytes(self.stream_chunk_bytes):
+                            # Parsing and compressing are CPU work: keep them off the event loop
+                            await asyncio.to_thread(spool.feed, chunk)
+                        document = await asyncio.to_thread(spool.close)
+                    except BaseException:
+                        spool.writer.abort()
+                        raise
+                    logger.info(f"Successfully streamed full timeline for {match_id} ({spool.parser.bytes_fed} bytes)")
+                    return document, spool
+
+            logger.warning(f"File Download API not available (Status: {file_res.status_code}), falling back to Series State")
+            return await self._fetch_series_state(client, match_id), None
+        except Exception as e:
+            logger.error(f"Error calling GRID APIs: {str(e)}")
+        return {}, None
+
+    async def _fetch_series_state(self, client: httpx.AsyncClient, match_id: str) -> Dict[str, Any]:
+        """Series State API, for live matches without an end-state file."""
+        state_res = await client.get(
+            f"{self.series_state_url}/grid/series/{match_id}",
+            headers={"x-api-key": self.api_key},
+            timeout=10.0,
+        )
+        if state_res.status_code == 200:
+            logger.info(f"Successfully fetched live state for {match_id}")
+            return state_res.json()
+        logger.error(f"Failed to fetch live state: {state_res.status_code}")
+        return {}
+
+    async def _fetch_series_details(self, client: httpx.AsyncClient, match_id: str) -> Tuple[Dict[str, Any], bool]:
+        """Series Details (Teams, Tournament) - always good to have. The flag is False when the fetch failed."""
+        try:
+            logger.info(f"Fetching details for series {match_id}")
+            details_res = await client.post(
+                self.central_data_url,
+                headers=self.headers,
+                json={"query": GET_SERIES_DETAILS, "variables": {"id": match_id}},
+                timeout=10.0,
+            )
+
+            if details_res.status_code == 200:
+                d_json = details_res.json()
+                return d_json.get("data", {}).get("series", {}) or {}, True
+            logger.error(f"Failed to fetch details: {details_res.status_code}")
+        except Exception as e:
+            logger.error(f"Error fetching details: {str(e)}")
+        return {}, False
+
+    async def _fetch_series_stats(self, client: httpx.AsyncClient, match_id: str) -> Tuple[Dict[str, Any], bool]:
+        """Series statistics. The flag is False when the fetch failed."""
+        try:
+            logger.info(f"Fetching stats for series {match_id}")
+            stats_res = await client.post(
+                self.statistics_url,
+                headers=self.headers,
+                json={
+                    "query": GET_SERIES_STATS,
+                    "variables": {"seriesId": match_id},
+                },
+                timeout=10.0,
+            )
+
+            if stats_res.status_code == 200:
+                s_json = stats_res.json()
+                return s_json.get("data", {}).get("seriesStats", {}) or {}, True
+            logger.error(f"Failed to fetch stats: {stats_res.status_code}")
+        except Exception as e:
+            logger.error(f"Error fetching stats: {str(e)}")
+        return {}, False
+
+    async def get_match_timeline(self, match_id: str, use_cache: bool = True) -> Dict[str, Any]:
         """
         Fetch match data using GRID File Download API for full timeline.
         Falls back to GraphQL if file is not available.
+        Results are served from the disk cache when present and not expired.
+        Concurrent calls for the same series share one fetch and the same dict,
+        so callers must not mutate it.
         """
         if not self.api_key or self.api_key == "YOUR_GRID_API_KEY":
             raise ValueError("GRID_API_KEY is missing or invalid.")
 
-        async with httpx.AsyncClient() as client:
-            # Try to fetch full end-state data from File Download API
-            timeline_data = {}
-            try:
-                logger.info(f"Fetching end-state data for series {match_id}")
-                file_res = await client.get(
-                    f"{self.file_download_url}/end-state/grid/series/{match_id}",
-                    headers={"x-api-key": self.api_key},
-                    timeout=30.0,
-                )
-                
-                if file_res.status_code == 200:
-                    logger.info(f"Successfully fetched full timeline for {match_id}")
-                    timeline_data = file_res.json()
-                else:
-                    logger.warning(f"File Download API not available (Status: {file_res.status_code}), falling back to Series State")
-                    # Fallback to Series State API for live matches
-                    state_res = await client.get(
-                        f"https://api.grid.gg/series-state/grid/series/{match_id}",
-                        headers={"x-api-key": self.api_key},
-                        timeout=10.0,
-                    )
-                    if state_res.status_code == 200:
-                        timeline_data = state_res.json()
-                        logger.info(f"Successfully fetched live state for {match_id}")
-                    else:
-                        logger.error(f"Failed to fetch live state: {state_res.status_code}")
-            except Exception as e:
-                logger.error(f"Error calling GRID APIs: {str(e)}")
-
-            # Fetch Series Details (Teams, Tournament) - always good to have
-            try:
-                logger.info(f"Fetching details for series {match_id}")
-                details_res = await client.post(
-                    self.central_data_url,
-                    headers=self.headers,
-                    json={"query": GET_SERIES_DETAILS, "variables": {"id": match_id}},
-                    timeout=10.0,
-                )
-
-                details_data = {}
-                if details_res.status_code == 200:
-                    d_json = details_res.json()
-                    details_data = d_json.get("data", {}).get("series", {}) or {}
+        return await self.flights.run(("timeline", match_id, use_cache), lambda: self._load_match_timeline(match_id, use_cache))
+
+    async def _load_match_timeline(self, match_id: str, use_cache: bool) -> Dict[str, Any]:
+        if use_cache:
+            cached = await asyncio.to_thread(self.cache.get, match_id)
+            if cached is not None:
+                logger.info(f"Serving series {match_id} from cache")
+                # The video URL carries the API key, so it is never written to disk
+                cached.setdefault("metadata", {})["video_url"] = self._video_url(match_id)
+                return cached
+
+        # The three fetches are independent: run them concurrently on the pooled client,
+        # each with its own timeout and empty fallback
+        client = await self._get_client()
+        (timeline_data, finished), (details_data, details_ok), (stats_data, stats_ok) = await asyncio.gather(
+            self._fetch_end_state(client, match_id),
+            self._fetch_series_details(client, match_id),
+            self._fetch_series_stats(client, match_id),
+        )
+
+        result = self._series_envelope(match_id, timeline_data, details_data, stats_data)
+
+        # Merge timeline data if present
+        if timeline_data:
+            result.update(timeline_data)
+            # Only cache real payloads; a failed fetch should be retried next time
+            finished = self._cache_finished(match_id, timeline_data, finished, details_ok, stats_ok)
+            stored = {**result, "metadata": {k: v for k, v in result["metadata"].items() if k != "video_url"}}
+            await asyncio.to_thread(self.cache.put, match_id, stored, finished, self._cache_meta(result))
+        
+        return result
+
+    async def stream_match_timeline(self, match_id: str, use_cache: bool = True,
+                                    participant_fields: Optional[tuple] = None) -> StreamedTimeline:
+        """
+        get_match_timeline parsed for analysis, without ever holding the payload: the
+        end-state file goes through TimelineStream as it downloads and is spooled into the
+        series cache under the SHA-256 of the streamed bytes (the result's digest), and a
+        cached series is streamed back off disk the same way. participant_fields trims the
+        snapshots' participantFrames (SnapshotTableBuilder).
+        """
+        if not self.api_key or self.api_key == "YOUR_GRID_API_KEY":
+            raise ValueError("GRID_API_KEY is missing or invalid.")
+
+        return await self.flights.run(("stream", match_id, use_cache, participant_fields),
+                                      lambda: self._load_streamed(match_id, use_cache, participant_fields))
+
+    async def series_source(self, match_id: str, participant_fields: Optional[tuple] = None) -> SeriesSource:
+        """
+        A series for review. A cached one is handed over unparsed: results cached under its
+        digest need no parse at all, and process workers stream the blob themselves.
+        Anything else is streamed in (stream_match_timeline).
+        """
+        if not self.api_key or self.api_key == "YOUR_GRID_API_KEY":
+            raise ValueError("GRID_API_KEY is missing or invalid.")
+
+        found = await asyncio.to_thread(self.cache.checkout, match_id)
+        if found is not None and found[2]:
+            path, digest, meta = found
+            return SeriesSource(digest, meta.get("game", "lol"), path=path)
+        timeline = await self.stream_match_timeline(match_id, participant_fields=participant_fields)
+        return SeriesSource(timeline.digest, timeline.metadata.get("game", "lol"), timeline=timeline)
+
+    async def _load_streamed(self, match_id: str, use_cache: bool, participant_fields: Optional[tuple]) -> StreamedTimeline:
+        if use_cache:
+            found = await asyncio.to_thread(self.cache.checkout, match_id)
+            if found is not None:
+                try:
+                    timeline = await asyncio.to_thread(SeriesCache.parse_blob, found[0], participant_fields)
+                except (OSError, EOFError, zlib.error) as e:
+                    logger.warning(f"Dropping unreadable cache entry {match_id}: {e}")
+                    await asyncio.to_thread(self.cache.invalidate, match_id)
                 else:
-                    logger.error(f"Failed to fetch details: {details_res.status_code}")
-            except Exception as e:
-                logger.error(f"Error fetching details: {str(e)}")
-                details_data = {}
+                    logger.info(f"Serving series {match_id} from cache")
+                    timeline.digest = found[1]
+                    timeline.metadata["video_url"] = self._video_url(match_id)
+                    return timeline
+
+        client = await self._get_client()
+        (timeline_data, spool), (details_data, details_ok), (stats_data, stats_ok) = await asyncio.gather(
+            self._stream_end_state(client, match_id, participant_fields),
+            self._fetch_series_details(client, match_id),
+            self._fetch_series_stats(client, match_id),
+        )
+        envelope = self._series_envelope(match_id, timeline_data, details_data, stats_data)
+        merged = {**envelope, **timeline_data}
+        # Only cache real payloads; a failed fetch should be retried next time
+        finished = self._cache_finished(match_id, timeline_data, spool is not None, details_ok, stats_ok) if timeline_data else False
+        key = match_id if timeline_data else None
+
+        if spool is None:
+            # Series State API (or nothing): small enough to parse whole
+            stored = {**merged, "metadata": {k: v for k, v in merged["metadata"].items() if k != "video_url"}}
+            raw = json.dumps(stored, separators=(",", ":")).encode()
+            if key is not None:
+                digest = await asyncio.to_thread(self.cache.put_raw, key, raw, finished, self._cache_meta(merged))
+            else:
+                digest = hashlib.sha256(raw).hexdigest()
+            return await asyncio.to_thread(StreamedTimeline.from_payload, merged, digest, participant_fields)
 
-            # Fetch Series Stats
+        timeline, path = await asyncio.to_thread(spool.finish, envelope, key, finished, self._cache_meta(merged))
+        if spool.parser.game_mismatch and path is not None:
+            # The frames came before the title: read them again from the cache as the right game
             try:
-                logger.info(f"Fetching stats for series {match_id}")
-                stats_res = await client.post(
-                    self.statistics_url,
-                    headers=self.headers,
-                    json={
-                        "query": GET_SERIES_STATS,
-                        "variables": {"seriesId": match_id},
-                    },
-                    timeout=10.0,
-                )
-
-                stats_data = {}
-                if stats_res.status_code == 200:
-                    s_json = stats_res.json()
-                    stats_data = s_json.get("data", {}).get("seriesStats", {}) or {}
-                else:
-                    logger.error(f"Failed to fetch stats: {stats_res.status_code}")
-            except Exception as e:
-                logger.error(f"Error fetching stats: {str(e)}")
-                stats_data = {}
+                reparsed = await asyncio.to_thread(SeriesCache.parse_blob, path, participant_fields)
+            except (OSError, EOFError, zlib.error) as e:
+                logger.warning(f"Could not re-read series {match_id} from cache: {e}")
+            else:
+                reparsed.digest = timeline.digest
+                reparsed.metadata["video_url"] = self._video_url(match_id)
+                timeline = reparsed
+        return timeline
+
+    @staticmethod
+    def _cache_finished(match_id: str, timeline_data: Dict[str, Any], finished: bool, details_ok: bool, stats_ok: bool) -> bool:
+        """Whether a fetched series is cached for good (True) or only for live_ttl."""
+        state = timeline_data.get("seriesState") or timeline_data
+        finished = finished or bool(state.get("finished"))
+        if finished and not (details_ok and stats_ok):
+            # Missing teams/stats must not be pinned forever: keep it only for live_ttl
+            logger.warning(f"Caching series {match_id} as live: details or stats fetch failed")
+            finished = False
+        return finished
+
+    @staticmethod
+    def _cache_meta(payload: Dict[str, Any]) -> Dict[str, Any]:
+        # What series_source needs before anything parses the blob
+        metadata = payload.get("metadata")
+        return {"game": metadata.get("game", "lol") if isinstance(metadata, dict) else "lol"}
 
-        # Construct the response object
+    def _series_envelope(self, match_id: str, timeline_data: Dict[str, Any], details_data: Dict[str, Any],
+                         stats_data: Dict[str, Any]) -> Dict[str, Any]:
+        """series_id, metadata (teams and drafts, tournament, title, game), stats and raw details around a payload."""
         teams = details_data.get("teams", [])
         
         # Determine game title and ID
@@ -152,7 +446,7 @@ class GridService:
         state = timeline_data.get("seriesState") or timeline_data
         
         # Collect all unique teams from across the data structure
-        timeline_teams = state.get("teams", [])
+        timeline_teams = list(state.get("teams", []))
         if "games" in state:
             for g in state["games"]:
                 for t in g.get("teams", []):
@@ -200,7 +494,7 @@ class GridService:
                     "code": t.get("base", {}).get("code"),
                     "roster": t.get("roster", []),
                     "side": "blue" if i == 0 else "red",
-                    "draft": list(set(draft)) if draft else []
+                    "draft": sorted(set(draft)) if draft else []
                 })
         elif timeline_teams:
             # Fallback to timeline teams if details missing
@@ -222,27 +516,24 @@ class GridService:
                     "id": 100 if i == 0 else 200,
                     "name": t.get("name", f"Team {i+1}"),
                     "side": "blue" if i == 0 else "red",
-                    "draft": list(set(draft)) if draft else []
+                    "draft": sorted(set(draft)) if draft else []
                 })
 
-        result = {
+        return {
             "series_id": match_id,
             "metadata": {
                 "teams": team_list,
                 "tournament": details_data.get("tournament", {}).get("name") or state.get("tournament", {}).get("name") or "Unknown Tournament",
                 "title": title_name or "Unknown Title",
                 "game": game,
-                "video_url": f"https://player.grid.gg/video-widget?seriesId={match_id}&key={self.api_key}"
+                "video_url": self._video_url(match_id)
             },
             "stats": stats_data,
             "raw_details": details_data,
         }
-        
-        # Merge timeline data if present
-        if timeline_data:
-            result.update(timeline_data)
-        
-        return result
+
+    def _video_url(self, match_id: str) -> str:
+        return f"https://player.grid.gg/video-widget?seriesId={match_id}&key={self.api_key}"
 
     async def get_match_details(self, match_id: str) -> Dict[str, Any]:
         """Alias for get_match_timeline since we fetch everything together now."""
@@ -259,57 +550,57 @@ class GridService:
         # Map game to titleId (LoL: 3, Valorant: 6)
         title_id = 3 if game == "lol" else 6
 
-        async with httpx.AsyncClient() as client:
-            try:
-                logger.info(f"Fetching series with live data for titleId: {title_id}")
-                response = await client.post(
-                    self.central_data_url,
-                    headers=self.headers,
-                    json={
-                        "query": GET_RECENT_SERIES,
-                        "variables": {"titleId": str(title_id)},
-                    },
-                    timeout=15.0,
-                )
-
-                if response.status_code == 200:
-                    res_json = response.json()
-
-                    if res_json.get("errors"):
-                        logger.error(f"GraphQL errors: {res_json.get('errors')}")
-                        return []
-
-                    data = res_json.get("data", {})
-                    all_series = data.get("allSeries", {})
-                    edges = all_series.get("edges", [])
-
-                    matches = []
-                    for edge in edges[:10]:
-                        node = edge.get("node", {})
-                        if not node:
-                            continue
-
-                        matches.append(
-                            {
-                                "id": str(node.get("id")),
-                                "game": game,
-                                "title": node.get("title", {}).get("name", "Unknown"),
-                                "tournament": node.get("tournament", {}).get(
-                                    "name", "Unknown"
-                                ),
-                                "startTimeScheduled": node.get("startTimeScheduled"),
-                                "status": "available",
-                            }
-                        )
-
-                    logger.info(f"Found {len(matches)} live matches")
-                    return matches
-                else:
-                    logger.error(f"Central Data error: {response.status_code}")
+        client = await self._get_client()
+        try:
+            logger.info(f"Fetching series with live data for titleId: {title_id}")
+            response = await client.post(
+                self.central_data_url,
+                headers=self.headers,
+                json={
+                    "query": GET_RECENT_SERIES,
+                    "variables": {"titleId": str(title_id)},
+                },
+                timeout=15.0,
+            )
+
+            if response.status_code == 200:
+                res_json = response.json()
+
+                if res_json.get("errors"):
+                    logger.error(f"GraphQL errors: {res_json.get('errors')}")
                     return []
-            except Exception as e:
-                logger.error(f"Error fetching live matches: {str(e)}")
+
+                data = res_json.get("data", {})
+                all_series = data.get("allSeries", {})
+                edges = all_series.get("edges", [])
+
+                matches = []
+                for edge in edges[:10]:
+                    node = edge.get("node", {})
+                    if not node:
+                        continue
+
+                    matches.append(
+                        {
+                            "id": str(node.get("id")),
+                            "game": game,
+                            "title": node.get("title", {}).get("name", "Unknown"),
+                            "tournament": node.get("tournament", {}).get(
+                                "name", "Unknown"
+                            ),
+                            "startTimeScheduled": node.get("startTimeScheduled"),
+                            "status": "available",
+                        }
+                    )
+
+                logger.info(f"Found {len(matches)} live matches")
+                return matches
+            else:
+                logger.error(f"Central Data error: {response.status_code}")
                 return []
+        except Exception as e:
+            logger.error(f"Error fetching live matches: {str(e)}")
+            return []
 
 
 # Singleton instance
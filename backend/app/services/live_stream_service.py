@@ -2,72 +2,307 @@ import asyncio
 import json
 import logging
 import os
-from typing import List, Dict, Any, Optional
+import time
+from collections import deque
+from typing import List, Dict, Any, Optional, Set
 from fastapi import WebSocket
 import httpx
 from .grid_service import grid_service
 from .ai_insight_service import ai_insight_service
-from ..core.normalization import normalizer
+from .fanout import ClientChannel, DELTA_PROTOCOL, FULL_PROTOCOL
 from ..core.decision_engine import decision_engine
-from ..analytics.micro import micro_analytics
-from ..analytics.macro import macro_analytics
+from ..analytics.incremental import IncrementalAnalyticsState
 from ..core.utils import clean_json_data
+from ..core.delta import json_diff, dumps
 import pandas as pd
 
 logger = logging.getLogger("decision-lens.live")
 
+class LiveSession:
+    """One followed match: its own stream task, history, lifecycle and subscribers."""
+
+    def __init__(self, match_id: str, game: Optional[str] = None):
+        self.match_id = match_id
+        self.game = game
+        self.is_running = False
+        self.is_mock = False
+        self.state_history: List[Dict[str, Any]] = []
+        self.subscribers: Set[WebSocket] = set()
+        self.task: Optional[asyncio.Task] = None
+        # Sequence number of the last published tick and the state it carried
+        self.seq = 0
+        self.last_state: Optional[Dict[str, Any]] = None
+        # Full-history insights; ticks only carry what they added
+        self.accumulated: Optional[Dict[str, Any]] = None
+        # CPU accounting for the synchronous part of each tick
+        self.ticks = 0
+        self.cpu_seconds = 0.0
+        self.recent_tick_cpu = deque(maxlen=256)
+
+    def record_tick(self, cpu_seconds: float):
+        self.ticks += 1
+        self.cpu_seconds += cpu_seconds
+        self.recent_tick_cpu.append(cpu_seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "match_id": self.match_id,
+            "game": self.game,
+            "is_running": self.is_running,
+            "is_mock": self.is_mock,
+            "subscribers": len(self.subscribers),
+            "history_count": len(self.state_history),
+            "ticks": self.ticks,
+            "avg_tick_cpu_ms": (self.cpu_seconds / self.ticks * 1000) if self.ticks else 0
+        }
+
+
 class LiveStreamService:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.is_running = False
-        self.current_match_id = None
-        self.state_history = []
+        # Each connection maps to the match_ids it subscribed to; connections
+        # without subscriptions receive every broadcast (legacy behaviour)
+        self.active_connections: Dict[WebSocket, Set[str]] = {}
+        self.channels: Dict[WebSocket, ClientChannel] = {}
+        self.sessions: Dict[str, LiveSession] = {}
+        self.tick_seconds = float(os.getenv("LIVE_TICK_SECONDS", "2"))
+        # Per-client send queue size and what to do when a slow client falls behind
+        self.client_queue_size = int(os.getenv("LIVE_CLIENT_QUEUE_SIZE", "32"))
+        self.slow_client_policy = os.getenv("LIVE_SLOW_CLIENT_POLICY", "drop_oldest")
+        self.send_timeout = float(os.getenv("LIVE_SEND_TIMEOUT", "5"))
+        self.evicted = 0
+        # Delta-protocol clients get a full keyframe every N ticks
+        self.keyframe_interval = max(int(os.getenv("LIVE_KEYFRAME_INTERVAL", "20")), 1)
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, match_ids: Optional[List[str]] = None, protocol: str = FULL_PROTOCOL):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections[websocket] = set()
+        self.channels[websocket] = ClientChannel(
+            websocket,
+            max_queue=self.client_queue_size,
+            policy=self.slow_client_policy,
+            send_timeout=self.send_timeout,
+            on_dead=self._evict,
+            protocol=DELTA_PROTOCOL if protocol == DELTA_PROTOCOL else FULL_PROTOCOL
+        )
+        for match_id in match_ids or []:
+            self.subscribe(websocket, match_id)
         logger.info(f"New client connected. Total: {len(self.active_connections)}")
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        if websocket not in self.active_connections:
+            return
+        for match_id in self.active_connections.pop(websocket):
+            self._remove_subscriber(websocket, match_id)
+        channel = self.channels.pop(websocket, None)
+        if channel:
+            channel.close()
         logger.info(f"Client disconnected. Total: {len(self.active_connections)}")
 
-    async def broadcast(self, message: Dict[str, Any]):
-        if not self.active_connections:
+    def _evict(self, websocket: WebSocket):
+        """Drop a connection whose sends failed or timed out."""
+        self.evicted += 1
+        self.disconnect(websocket)
+        asyncio.create_task(self._close_socket(websocket))
+
+    @staticmethod
+    async def _close_socket(websocket: WebSocket):
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
+    def subscribe(self, websocket: WebSocket, match_id: str) -> LiveSession:
+        """Subscribe a connection to a match; the session may be started later."""
+        session = self.sessions.get(match_id)
+        if session is None:
+            session = self.sessions[match_id] = LiveSession(match_id)
+        session.subscribers.add(websocket)
+        self.active_connections.setdefault(websocket, set()).add(match_id)
+        logger.info(f"Client subscribed to match {match_id}. Subscribers: {len(session.subscribers)}")
+        # Delta clients joining mid-stream need a keyframe to patch against
+        self.resync(websocket, match_id)
+        return session
+
+    def resync(self, websocket: WebSocket, match_id: str) -> bool:
+        """Send the latest keyframe to a delta-protocol client (e.g. after a sequence gap)."""
+        session = self.sessions.get(match_id)
+        channel = self.channels.get(websocket)
+        if not session or session.last_state is None or not channel or channel.protocol != DELTA_PROTOCOL:
+            return False
+        return channel.enqueue(dumps(self._keyframe(session)))
+
+    def unsubscribe(self, websocket: WebSocket, match_id: str):
+        self.active_connections.get(websocket, set()).discard(match_id)
+        self._remove_subscriber(websocket, match_id)
+
+    def _remove_subscriber(self, websocket: WebSocket, match_id: str):
+        session = self.sessions.get(match_id)
+        if session is None:
+            return
+        session.subscribers.discard(websocket)
+        self._prune_session(session)
+
+    def _prune_session(self, session: LiveSession):
+        # Idle sessions nobody listens to are dropped from the registry
+        if not session.is_running and not session.subscribers and self.sessions.get(session.match_id) is session:
+            del self.sessions[session.match_id]
+
+    def _recipients(self, match_id: Optional[str]) -> List[WebSocket]:
+        session = self.sessions.get(match_id) if match_id else None
+        recipients = list(session.subscribers) if session else []
+        recipients.extend(ws for ws, subs in self.active_connections.items() if not subs)
+        return recipients
+
+    async def broadcast(self, message: Dict[str, Any], match_id: Optional[str] = None):
+        recipients = self._recipients(match_id or message.get("match_id"))
+        if not recipients:
+            logger.debug("No active connections to broadcast to")
+            return
+        logger.info(f"Broadcasting {message.get('type')} to {len(recipients)} clients")
+        # Serialize once, then hand the same text to every client's queue
+        text = dumps(message)
+        for connection in recipients:
+            channel = self.channels.get(connection)
+            if channel:
+                channel.enqueue(text, message.get("type"))
+
+    def _keyframe(self, session: LiveSession) -> Dict[str, Any]:
+        return {
+            "type": "STATE_KEYFRAME",
+            "match_id": session.match_id,
+            "game": session.game,
+            "seq": session.seq,
+            "data": session.last_state,
+            "accumulated": clean_json_data(session.accumulated) if session.accumulated else None,
+            "is_mock": session.is_mock,
+            "history_count": len(session.state_history)
+        }
+
+    async def publish_state(self, session: LiveSession, message: Dict[str, Any]):
+        """
+        Publish one tick. Full-protocol clients get the STATE_UPDATE as is;
+        delta-protocol clients get a periodic keyframe and JSON-patch deltas
+        in between. Every message carries a sequence number so clients can
+        detect gaps and ask for a resync.
+        """
+        session.seq += 1
+        message["seq"] = session.seq
+        previous, session.last_state = session.last_state, message["data"]
+
+        recipients = self._recipients(session.match_id)
+        if not recipients:
             logger.debug("No active connections to broadcast to")
             return
-        logger.info(f"Broadcasting {message.get('type')} to {len(self.active_connections)} clients")
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to client: {e}")
-
-    async def start_live_stream(self, match_id: str, override_game: Optional[str] = None):
+        full = [ws for ws in recipients if ws in self.channels and self.channels[ws].protocol != DELTA_PROTOCOL]
+        delta = [ws for ws in recipients if ws in self.channels and self.channels[ws].protocol == DELTA_PROTOCOL]
+        logger.info(f"Broadcasting {message.get('type')} #{session.seq} to {len(full)} full and {len(delta)} delta clients")
+
+        if full:
+            text = dumps(message)
+            for ws in full:
+                self.channels[ws].enqueue(text, message.get("type"))
+
+        if delta:
+            if previous is None or session.seq % self.keyframe_interval == 0:
+                update = self._keyframe(session)
+            else:
+                update = {
+                    "type": "STATE_DELTA",
+                    "match_id": session.match_id,
+                    "seq": session.seq,
+                    "base_seq": session.seq - 1,
+                    "ops": json_diff(previous, message["data"]),
+                    "history_count": len(session.state_history)
+                }
+            text = dumps(update)
+            # Deltas must not be coalesced away; a dropped one shows up as a seq gap
+            kind = update["type"] if update["type"] == "STATE_KEYFRAME" else None
+            for ws in delta:
+                self.channels[ws].enqueue(text, kind)
+
+    def send_to(self, websocket: WebSocket, message: Dict[str, Any]) -> bool:
+        """Queue a message for a single connection."""
+        channel = self.channels.get(websocket)
+        return channel.enqueue(dumps(message), message.get("type")) if channel else False
+
+    def connection_stats(self) -> Dict[str, Any]:
+        return {
+            "connections": len(self.channels),
+            "queued": sum(len(c.queue) for c in self.channels.values()),
+            "sent": sum(c.sent for c in self.channels.values()),
+            "dropped": sum(c.dropped for c in self.channels.values()),
+            "evicted": self.evicted,
+            "policy": self.slow_client_policy
+        }
+
+    def start_session(self, match_id: str, game: Optional[str] = None) -> LiveSession:
+        """Start streaming a match, or return its session if it is already running."""
+        session = self.sessions.get(match_id)
+        if session is not None and session.is_running:
+            return session
+        if session is None:
+            session = self.sessions[match_id] = LiveSession(match_id, game)
+        session.game = game
+        session.is_running = True
+        session.state_history = []
+        session.last_state = None
+        session.accumulated = None
+        session.task = asyncio.create_task(self._run_session(session))
+        return session
+
+    def stop_stream(self, match_id: Optional[str] = None):
+        """Stop one session, or every session when no match_id is given."""
+        if match_id is None:
+            targets = list(self.sessions.values())
+        else:
+            targets = [self.sessions[match_id]] if match_id in self.sessions else []
+        for session in targets:
+            session.is_running = False
+            if session.task and not session.task.done():
+                session.task.cancel()
+            self._prune_session(session)
+        logger.info(f"Live stream stopped for {match_id or 'all matches'}")
+
+    def list_sessions(self) -> List[Dict[str, Any]]:
+        return [session.summary() for session in self.sessions.values()]
+
+    async def _run_session(self, session: LiveSession):
+        try:
+            await self.start_live_stream(session, session.game)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            # A restarted session owns a new task; leave its state alone
+            if session.task is asyncio.current_task():
+                session.is_running = False
+                self._prune_session(session)
+
+    async def start_live_stream(self, session: LiveSession, override_game: Optional[str] = None):
         """
         In a real production app, this would connect to GRID WebSocket.
         For this hackathon, we simulate the real-time feed by fetching 
         the full timeline and streaming it snapshot by snapshot if real 
         WebSocket is unavailable.
         """
-        self.current_match_id = match_id
-        self.is_running = True
-        self.state_history = []
+        match_id = session.match_id
         
         logger.info(f"Starting live stream for match: {match_id}")
 
         try:
             # 1. Try to get initial state/timeline
-            full_data = await grid_service.get_match_timeline(match_id)
-            snapshots = normalizer.normalize_timeline(full_data)
-            game = override_game or full_data.get("metadata", {}).get("game", "lol")
-            metadata = full_data.get("metadata", {})
+            # Parsed as it downloads (or streamed from the series cache), never held whole
+            timeline = await grid_service.stream_match_timeline(match_id)
+            snapshots = timeline.snapshots
+            game = override_game or timeline.metadata.get("game", "lol")
+            session.game = game
+            # The timeline may be shared with other callers of a coalesced fetch; never mutate it
+            metadata = timeline.metadata
             if override_game:
-                metadata["game"] = override_game
+                metadata = {**metadata, "game": override_game}
 
             # Extract events for micro analytics
             event_types = ["KILL", "SPIKE_PLANTED", "SPIKE_DEFUSED"] if game == "valorant" else ["CHAMPION_KILL", "ELITE_MONSTER_KILL", "BUILDING_KILL"]
-            all_events = normalizer.extract_events(full_data, event_types)
+            all_events = timeline.extract_events(event_types)
 
             # Check if snapshots are meaningful (have varying timestamps)
             has_meaningful_data = False
@@ -77,39 +312,36 @@ class LiveStreamService:
 
             if not has_meaningful_data:
                 logger.warning(f"No meaningful timeline data for match {match_id} (found {len(snapshots)} snapshots). Falling back to mock stream.")
-                await self._run_mock_stream(match_id, game, metadata)
+                await self._run_mock_stream(session, game, metadata)
                 return
 
+            # Score and explain the whole timeline up front, one batched call each
+            feature_matrix = self._extract_feature_matrix(snapshots)
+            win_probs = decision_engine.predict_bulk_probabilities(feature_matrix)
+            explanations = decision_engine.explain_bulk_decisions(feature_matrix)
+            analytics = IncrementalAnalyticsState(game, timeline.metadata, all_events)
+
             # 2. Stream snapshots one by one to simulate real-time
-            for _, row in snapshots.iterrows():
-                if not self.is_running:
+            for i, (_, row) in enumerate(snapshots.iterrows()):
+                if not session.is_running:
                     break
-                    
+
+                tick_start = time.process_time()
                 state = row.to_dict()
-                ts = state.get("timestamp", 0)
                 
                 # Enrich with AI predictions in real-time
-                features = self._extract_features(state)
-                win_prob = decision_engine.predict_win_probability(features)
+                win_prob = win_probs[i]
                 state['win_prob'] = win_prob
-                state['shap_explanations'] = decision_engine.explain_decision(features)
-                
-                # Filter events up to current timestamp
-                current_events = all_events[all_events['timestamp'] <= ts] if not all_events.empty else pd.DataFrame()
+                state['shap_explanations'] = explanations[i]
                 
-                # Dynamic Analytics
-                current_df = pd.DataFrame(self.state_history + [state])
-                macro_insights = macro_analytics.identify_strategic_inflections(current_df, game=game, events_df=current_events)
-                player_stats = micro_analytics.compute_player_efficiency(current_df, current_events, game=game)
-                micro_insights = micro_analytics.analyze_player_mistakes(current_events, current_df, game=game)
-                objectives = macro_analytics.evaluate_objective_control(current_events, game=game)
-                draft_analysis = macro_analytics.analyze_draft_synergy(full_data.get("metadata", {}))
-
-                state['macro_insights'] = macro_insights
-                state['player_stats'] = player_stats
-                state['micro_insights'] = micro_insights
-                state['objectives'] = objectives
-                state['draft_analysis'] = draft_analysis
+                # Dynamic Analytics (only the new snapshot and its new events)
+                insights = analytics.update(state)
+                player_stats = insights['player_stats']
+                session.accumulated = analytics.accumulated(state, player_stats)
+                macro_insights = session.accumulated['macro_insights']
+                micro_insights = session.accumulated['micro_insights']
+
+                state.update(insights)
                 state['metadata'] = metadata
 
                 # Generate dynamic AI summary
@@ -123,24 +355,25 @@ class LiveStreamService:
                     game=game, player_stats=player_stats
                 )
 
-                self.state_history.append(state)
+                session.state_history.append(state)
 
                 broadcast_data = clean_json_data({
                     "type": "STATE_UPDATE",
                     "match_id": match_id,
                     "game": game,
                     "data": state,
-                    "history_count": len(self.state_history)
+                    "history_count": len(session.state_history)
                 })
+                session.record_tick(time.process_time() - tick_start)
                 logger.info(f"Broadcasting state update - timestamp: {state.get('timestamp')}, gold_diff: {state.get('gold_diff')}, win_prob: {state.get('win_prob')}")
-                await self.broadcast(broadcast_data)
+                await self.publish_state(session, broadcast_data)
                 
                 # Simulate the delay between real-game snapshots (usually 1-5 seconds)
-                await asyncio.sleep(2)
+                await asyncio.sleep(self.tick_seconds)
                 
         except Exception as e:
             logger.error(f"Error in live stream: {e}", exc_info=True)
-            self.is_running = False
+            session.is_running = False
 
     def _extract_features(self, state: Dict[str, Any]) -> Dict[str, Any]:
         return {
@@ -154,22 +387,33 @@ class LiveStreamService:
             "team200_kills": state.get("team200_kills", 0)
         }
 
-    async def _run_mock_stream(self, match_id: str, game: str = "lol", metadata: Optional[Dict[str, Any]] = None):
+    def _extract_feature_matrix(self, snapshots: pd.DataFrame) -> pd.DataFrame:
+        """Vectorized _extract_features over every snapshot row."""
+        features = snapshots.reindex(columns=decision_engine.feature_names)
+        features["time_seconds"] = snapshots["timestamp"] / 1000 if "timestamp" in snapshots.columns else 0
+        return features.fillna(0)
+
+    async def _run_mock_stream(self, session: LiveSession, game: str = "lol", metadata: Optional[Dict[str, Any]] = None):
         """Generates realistic mock data if real match data is unavailable."""
+        match_id = session.match_id
+        session.is_mock = True
+        session.game = game
         logger.info(f"Starting mock stream for match {match_id}, game={game}")
         gold_diff = 0
         team100_kills = 0
         team200_kills = 0
         dragons_diff = 0
 
-        # Mock events for analytics
-        mock_events = []
+        # Mock events feed the incremental analytics as they are generated
+        analytics = IncrementalAnalyticsState(game, metadata)
 
         for i in range(200):
-            if not self.is_running:
+            if not session.is_running:
                 break
-                
+
+            tick_start = time.process_time()
             # Simulate a dynamic game
+            mock_events = []
             gold_diff += (i * 2) + (i % 7 * 50) - (i % 5 * 40)
             
             # Create mock events
@@ -216,19 +460,14 @@ class LiveStreamService:
             state['shap_explanations'] = decision_engine.explain_decision(features)
             
             # Dynamic Analytics for Mock
-            current_df = pd.DataFrame(self.state_history + [state])
-            events_df = pd.DataFrame(mock_events)
-            macro_insights = macro_analytics.identify_strategic_inflections(current_df, game=game, events_df=events_df)
-            player_stats = micro_analytics.compute_player_efficiency(current_df, events_df, game=game)
-            micro_insights = micro_analytics.analyze_player_mistakes(events_df, current_df, game=game)
-            objectives = macro_analytics.evaluate_objective_control(events_df, game=game)
-            draft_analysis = macro_analytics.analyze_draft_synergy(metadata or {})
-
-            state['macro_insights'] = macro_insights
-            state['player_stats'] = player_stats
-            state['micro_insights'] = micro_insights
-            state['objectives'] = objectives
-            state['draft_analysis'] = draft_analysis
+            analytics.add_events(mock_events)
+            insights = analytics.update(state)
+            player_stats = insights['player_stats']
+            session.accumulated = analytics.accumulated(state, player_stats)
+            macro_insights = session.accumulated['macro_insights']
+            micro_insights = session.accumulated['micro_insights']
+
+            state.update(insights)
             if metadata is not None:
                 state['metadata'] = metadata
 
@@ -243,7 +482,7 @@ class LiveStreamService:
                 game=game, player_stats=player_stats
             )
 
-            self.state_history.append(state)
+            session.state_history.append(state)
 
             broadcast_data = clean_json_data({
                 "type": "STATE_UPDATE",
@@ -251,14 +490,11 @@ class LiveStreamService:
                 "game": game,
                 "data": state,
                 "is_mock": True,
-                "history_count": len(self.state_history)
+                "history_count": len(session.state_history)
             })
+            session.record_tick(time.process_time() - tick_start)
             logger.info(f"Broadcasting mock state - timestamp: {state.get('timestamp')}, gold_diff: {state.get('gold_diff')}, win_prob: {state.get('win_prob')}")
-            await self.broadcast(broadcast_data)
-            await asyncio.sleep(2)
-
-    def stop_stream(self):
-        self.is_running = False
-        logger.info("Live stream stopped")
+            await self.publish_state(session, broadcast_data)
+            await asyncio.sleep(self.tick_seconds)
 
 live_stream_service = LiveStreamService()
@@ -0,0 +1,222 @@
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger("decision-lens.review-executor")
+
+# Where the CPU-bound review pipeline runs: a process pool (default), a thread pool,
+# or inline on the event loop
+REVIEW_EXECUTOR_MODES = ("process", "thread", "inline")
+
+# Stage reports and streamed sections from process workers; set by the initializer
+_worker_progress = None
+
+
+def _init_review_worker(model_version: Optional[str], log_level: int, progress_queue: Any = None):
+    """Process-pool initializer: load the persisted model once per worker."""
+    global _worker_progress
+    _worker_progress = progress_queue
+    logging.basicConfig(level=log_level, format="%(asctime)s - %(processName)s - %(name)s - %(levelname)s - %(message)s")
+    from app.core.decision_engine import decision_engine
+    # One review per worker at a time; nested explanation pools would only oversubscribe the cores
+    decision_engine.explain_workers = 1
+    decision_engine.ensure_model()
+    if model_version is not None and decision_engine.model_version != model_version:
+        logger.warning(f"Review worker loaded model {decision_engine.model_version}, "
+                       f"the server keys reviews on {model_version}")
+
+
+def _render_review(match_id: str, game: str, match_data: Any, token: Optional[int] = None,
+                   progress_queue: Any = None, sections: bool = False, layout: str = "rows",
+                   source: Optional[str] = None) -> str:
+    # Runs in the worker: the parsed series (or just the path of its series cache blob)
+    # goes in and only the review JSON text comes back; stage reports and streamed
+    # sections go over the progress queue as (token, kind, value)
+    from .review_service import ReviewService, StageClock
+    if match_data is None:
+        # Before any report, so a blob evicted in the meantime can simply be fetched again
+        from .series_cache import SeriesCache
+        match_data = SeriesCache.parse_blob(source, ReviewService.participant_fields(layout))
+    progress_queue = progress_queue or _worker_progress
+    if token is None or progress_queue is None:
+        return ReviewService.render_review(match_id, game, match_data, layout=layout)
+
+    report = lambda stage, seconds: progress_queue.put((token, "stage", (stage, seconds)))
+    emit = (lambda line: progress_queue.put((token, "section", line))) if sections else None
+    try:
+        return ReviewService.render_review(match_id, game, match_data, StageClock(report), emit, layout)
+    finally:
+        # Lets render() return only after every report of this review was delivered
+        progress_queue.put((token, "end", None))
+
+
+class ReviewExecutor:
+    """
+    Runs ReviewService.render_review off the event loop so a heavy review (normalization,
+    analytics, XGBoost and SHAP) never stalls WebSocket broadcasts or health checks.
+    Process mode sidesteps the GIL; thread mode shares the loaded model and only helps
+    while numpy/XGBoost release the GIL.
+    """
+
+    def __init__(self, mode: Optional[str] = None, workers: Optional[int] = None):
+        self.mode = self._resolve_mode(mode or os.getenv("REVIEW_EXECUTOR", "process"))
+        self.workers = max(workers if workers is not None else int(os.getenv("REVIEW_WORKERS", "2")), 1)
+        self._pool: Optional[Executor] = None
+        # Stage reports and sections travel over one queue, pumped by a thread into the listeners' loops
+        self._progress: Any = None
+        # token -> (loop, progress, sections, delivered event) of each review in flight
+        self._listeners: Dict[int, Tuple[asyncio.AbstractEventLoop, Any, Any, asyncio.Event]] = {}
+        self._tokens = itertools.count()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.in_flight = 0
+        # Process-mode reviews whose worker streamed the series cache blob vs got a pickled timeline
+        self.compact_inputs = 0
+        self.pickled_inputs = 0
+
+    @staticmethod
+    def _resolve_mode(mode: str) -> str:
+        mode = (mode or "process").lower()
+        if mode not in REVIEW_EXECUTOR_MODES:
+            logger.warning(f"Unknown REVIEW_EXECUTOR {mode!r}, using process")
+            mode = "process"
+        return mode
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "process":
+                from app.core.decision_engine import decision_engine
+                decision_engine.ensure_model()
+                # spawn, not fork: the server process already runs the event loop and helper threads
+                context = multiprocessing.get_context("spawn")
+                self._progress = context.SimpleQueue()
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=context,
+                    initializer=_init_review_worker,
+                    initargs=(decision_engine.model_version, logging.getLogger().getEffectiveLevel(), self._progress),
+                )
+            else:
+                self._progress = queue.SimpleQueue()
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="review")
+            threading.Thread(target=self._pump_progress, args=(self._progress,), name="review-progress", daemon=True).start()
+            logger.info(f"Started review {self.mode} pool with {self.workers} workers")
+        return self._pool
+
+    async def render(self, match_id: str, game: str, match_data: Any,
+                     progress: Optional[Callable[[str, float], None]] = None,
+                     sections: Optional[Callable[[str], None]] = None, layout: str = "rows",
+                     source: Optional[str] = None) -> str:
+        """
+        Serialized review JSON for one series, computed on the configured executor.
+        On the event loop, progress(stage, seconds) is called as each stage finishes and
+        sections(line) with each streamed review section (see ReviewSections), all before
+        render returns. layout is one of REVIEW_LAYOUTS. match_data is a StreamedTimeline
+        (or raw payload); when it is None, source is the series cache blob to stream it
+        from (SeriesCache.checkout) and FileNotFoundError means it was evicted.
+        """
+        self.submitted += 1
+        self.in_flight += 1
+        token = next(self._tokens) if progress is not None or sections is not None else None
+        delivered = asyncio.Event()
+        if token is not None:
+            self._listeners[token] = (asyncio.get_running_loop(), progress, sections, delivered)
+        try:
+            if self.mode == "inline":
+                reports = queue.SimpleQueue() if token is not None else None
+                content = _render_review(match_id, game, match_data, token, reports, sections is not None, layout, source)
+                while reports is not None and not reports.empty():
+                    self._deliver(*reports.get())
+            else:
+                pool = self._get_pool()
+                # Threads get the queue as an argument, processes from their initializer
+                reports = self._progress if self.mode == "thread" else None
+                loop = asyncio.get_running_loop()
+                if self.mode == "process":
+                    if match_data is None:
+                        self.compact_inputs += 1
+                    else:
+                        self.pickled_inputs += 1
+                content = await loop.run_in_executor(pool, _render_review, match_id, game, match_data,
+                                                     token, reports, sections is not None, layout, source)
+            if token is not None:
+                # The result can overtake the queued reports; wait for the worker's end marker
+                try:
+                    await asyncio.wait_for(delivered.wait(), timeout=30)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Stage reports for {match_id} did not arrive, returning without them")
+            self.completed += 1
+            return content
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory): start a fresh pool for the next review
+            logger.error(f"Review worker pool broke while reviewing {match_id}, restarting it")
+            self.failed += 1
+            self.close()
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self._listeners.pop(token, None)
+
+    def _pump_progress(self, progress_queue: Any):
+        while True:
+            item = progress_queue.get()
+            if item is None:
+                return
+            listener = self._listeners.get(item[0])
+            if listener is not None:
+                try:
+                    listener[0].call_soon_threadsafe(self._deliver, *item)
+                except RuntimeError:
+                    # The listener's loop is already closed
+                    pass
+
+    def _deliver(self, token: int, kind: str, value: Any):
+        # Looked up again on the loop: the review may have finished in the meantime
+        listener = self._listeners.get(token)
+        if listener is None:
+            return
+        _, progress, sections, delivered = listener
+        if kind == "stage":
+            if progress is not None:
+                progress(*value)
+        elif kind == "section":
+            if sections is not None:
+                sections(value)
+        else:
+            delivered.set()
+
+    def close(self):
+        """Shut down the worker pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self._progress.put(None)
+            self._progress = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "started": self._pool is not None,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "in_flight": self.in_flight,
+            "compact_inputs": self.compact_inputs,
+            "pickled_inputs": self.pickled_inputs,
+        }
+
+
+# Singleton instance
+review_executor = ReviewExecutor()
@@ -0,0 +1,237 @@
+import asyncio
+import itertools
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+from .review_service import REVIEW_STAGES, review_service
+
+logger = logging.getLogger("decision-lens.review-jobs")
+
+# Priority classes, lowest value first: live coaching jumps ahead of archive backfills
+JOB_PRIORITIES = {"live": 0, "interactive": 1, "bulk": 2}
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class ReviewQueueFull(Exception):
+    """Raised by submit() when the pending backlog is at REVIEW_JOB_MAX_PENDING."""
+
+
+class ReviewJob:
+    """One submitted review: status, per-stage progress and, once done, the review JSON."""
+
+    def __init__(self, match_id: str, game: Optional[str], priority: str):
+        self.id = uuid.uuid4().hex
+        self.match_id = match_id
+        self.game = game
+        self.priority = priority
+        self.status = QUEUED
+        self.stage: Optional[str] = None
+        self.stages: Dict[str, float] = {}
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        # Review JSON, dropped REVIEW_JOB_RESULT_TTL seconds after the job finished
+        self.result: Optional[str] = None
+        self.result_expired = False
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def touch(self):
+        """Wake everyone watching this job; watchers then wait on a fresh event."""
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        now = time.time()
+        started = self.started_at or now
+        return {
+            "job_id": self.id,
+            "match_id": self.match_id,
+            "game": self.game,
+            "priority": self.priority,
+            "status": self.status,
+            "stage": self.stage,
+            "stages_done": len(self.stages),
+            "stages_total": len(REVIEW_STAGES),
+            "stage_seconds": self.stages,
+            "wait_seconds": started - self.created_at,
+            "run_seconds": (self.finished_at or now) - self.started_at if self.started_at else None,
+            "error": self.error,
+            "result_expired": self.result_expired,
+        }
+
+
+class ReviewJobQueue:
+    """
+    Review jobs behind a priority queue and a bounded set of worker tasks, so long
+    reviews are submitted and polled (or streamed) instead of holding a request open.
+    Workers run ReviewService.get_review, so jobs share its cache and coalescing.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 retention: Optional[int] = None, result_ttl: Optional[float] = None, metrics_window: int = 500):
+        self.workers = max(workers if workers is not None else int(os.getenv("REVIEW_JOB_WORKERS", "2")), 1)
+        self.max_pending = max_pending if max_pending is not None else int(os.getenv("REVIEW_JOB_MAX_PENDING", "100"))
+        self.retention = retention if retention is not None else int(os.getenv("REVIEW_JOB_RETENTION", "200"))
+        # Results are multi-MB; jobs outlive them as status records (fetch again via a new job)
+        self.result_ttl = result_ttl if result_ttl is not None else float(os.getenv("REVIEW_JOB_RESULT_TTL", "600"))
+        self.jobs: "OrderedDict[str, ReviewJob]" = OrderedDict()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        # FIFO within a priority class
+        self._order = itertools.count()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        # Recent samples for capacity planning: queue wait per priority, run time per stage
+        self._wait: Dict[str, Deque[float]] = {p: deque(maxlen=metrics_window) for p in JOB_PRIORITIES}
+        self._stage_runs: Dict[str, Deque[float]] = {s: deque(maxlen=metrics_window) for s in REVIEW_STAGES}
+        self._runs: Deque[float] = deque(maxlen=metrics_window)
+
+    def _start(self):
+        # Started on first submit so the queue and workers live on the serving loop
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+            self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+            self._tasks.append(asyncio.create_task(self._sweep()))
+            logger.info(f"Started {self.workers} review job workers")
+
+    def submit(self, match_id: str, game: Optional[str] = None, priority: str = "interactive") -> ReviewJob:
+        if priority not in JOB_PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}, expected one of {', '.join(JOB_PRIORITIES)}")
+        if self.pending() >= self.max_pending:
+            self.rejected += 1
+            raise ReviewQueueFull(f"{self.max_pending} review jobs are already pending")
+        self._start()
+
+        job = ReviewJob(match_id, game, priority)
+        self.jobs[job.id] = job
+        self._queue.put_nowait((JOB_PRIORITIES[priority], next(self._order), job))
+        self.submitted += 1
+        self._trim()
+        logger.info(f"Queued {priority} review job {job.id} for {match_id}")
+        return job
+
+    def get(self, job_id: str) -> Optional[ReviewJob]:
+        return self.jobs.get(job_id)
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def watch(self, job: ReviewJob) -> AsyncIterator[Dict[str, Any]]:
+        """Job snapshots: the current one, then one per change until the job finishes."""
+        while True:
+            changed = job._changed
+            yield job.to_dict()
+            if job.finished:
+                return
+            await changed.wait()
+
+    async def _worker(self, index: int):
+        while True:
+            _, _, job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: ReviewJob):
+        job.status, job.started_at, job.stage = RUNNING, time.time(), REVIEW_STAGES[0]
+        self._wait[job.priority].append(job.started_at - job.created_at)
+        job.touch()
+
+        def progress(stage: str, seconds: float):
+            job.stages[stage] = seconds
+            self._stage_runs[stage].append(seconds)
+            following = REVIEW_STAGES.index(stage) + 1
+            job.stage = REVIEW_STAGES[following] if following < len(REVIEW_STAGES) else None
+            job.touch()
+
+        try:
+            job.result = await review_service.get_review(job.match_id, job.game, progress=progress)
+            job.status = DONE
+            self.completed += 1
+        except Exception as e:
+            logger.error(f"Review job {job.id} for {job.match_id} failed: {e}", exc_info=True)
+            job.status, job.error = FAILED, str(e)
+            self.failed += 1
+        job.stage, job.finished_at = None, time.time()
+        self._runs.append(job.finished_at - job.started_at)
+        job.touch()
+        self._trim()
+
+    async def _sweep(self):
+        # Frees expired results even when no new jobs arrive
+        while True:
+            await asyncio.sleep(min(max(self.result_ttl, 1.0), 60.0))
+            self._trim()
+
+    def _trim(self):
+        """Drop expired results and forget the oldest finished jobs beyond the retention limit."""
+        now = time.time()
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(len(finished) - self.retention, 0)]:
+            del self.jobs[job_id]
+        for job in self.jobs.values():
+            if job.result is not None and job.finished_at + self.result_ttl <= now:
+                job.result, job.result_expired = None, True
+
+    @staticmethod
+    def _summary(samples: Deque[float]) -> Dict[str, Any]:
+        if not samples:
+            return {"count": 0}
+        ordered = sorted(samples)
+        return {
+            "count": len(ordered),
+            "mean": sum(ordered) / len(ordered),
+            "p50": ordered[len(ordered) // 2],
+            "p95": ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)],
+            "max": ordered[-1],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        depth = {p: 0 for p in JOB_PRIORITIES}
+        running = 0
+        for job in self.jobs.values():
+            if job.status == QUEUED:
+                depth[job.priority] += 1
+            elif job.status == RUNNING:
+                running += 1
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "queue_depth": depth,
+            "running": running,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "results_held": sum(1 for job in self.jobs.values() if job.result is not None),
+            "result_bytes": sum(len(job.result) for job in self.jobs.values() if job.result is not None),
+            "wait_seconds": {p: self._summary(s) for p, s in self._wait.items()},
+            "stage_seconds": {s: self._summary(v) for s, v in self._stage_runs.items()},
+            "run_seconds": self._summary(self._runs),
+        }
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks, self._queue = [], None
+
+
+# Singleton instance
+review_jobs = ReviewJobQueue()
@@ -0,0 +1,479 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple, Union
+
+import pandas as pd
+
+from app.analytics.macro import macro_analytics
+from app.analytics.micro import micro_analytics
+from app.core.columnar import columnar_timeline
+from app.core.decision_engine import decision_engine
+from app.core.features import feature_builder
+from app.core.timeline_stream import StreamedTimeline
+from app.core.utils import clean_json_data
+from .ai_insight_service import ai_insight_service
+from .grid_service import SeriesSource, grid_service
+from .review_executor import review_executor
+from .series_cache import SeriesCache
+from .single_flight import SingleFlight
+
+logger = logging.getLogger("decision-lens.review")
+
+# Bump whenever normalization/analytics/summary output changes so cached reviews are recomputed
+ANALYTICS_VERSION = "2"
+
+DEFAULT_REVIEW_CACHE_DIR = Path(__file__).resolve().parents[2] / "data" / "cache" / "reviews"
+
+# Pipeline stages in the order they finish; progress callbacks receive (stage, seconds)
+REVIEW_STAGES = ("fetch", "normalize", "analytics", "predict", "explain", "summary", "serialize")
+
+ProgressCallback = Callable[[str, float], None]
+
+# Review keys streamed once each, in the order the pipeline produces them; timeline_snapshots
+# go out in chunks after predict, their per-snapshot details after explain
+EARLY_SECTIONS = ("match_id", "game", "metadata", "micro_insights", "macro_insights", "objectives", "draft_analysis")
+LATE_SECTIONS = ("current_state", "player_stats", "shap_explanations", "decision_analysis", "ai_coach_summary")
+SNAPSHOT_DETAILS = ("player_stats", "shap_explanations")
+COMPLETE_LINE = json.dumps({"section": "complete", "data": None})
+
+# timeline_snapshots as a list of per-snapshot dicts (default) or as ColumnarTimeline arrays
+REVIEW_LAYOUTS = ("rows", "columnar")
+
+
+class StageClock:
+    """Times consecutive review stages and reports each one as it finishes."""
+
+    def __init__(self, report: Optional[ProgressCallback] = None):
+        self.report = report
+        self.timings: Dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def done(self, stage: str):
+        now = time.perf_counter()
+        self.timings[stage] = now - self._last
+        self._last = now
+        if self.report is not None:
+            self.report(stage, self.timings[stage])
+
+
+class ReviewCache:
+    """
+    Two-tier cache of serialized match reviews: an in-memory LRU per worker and an
+    optional disk tier shared by all workers on the host. Lookups (de)compress whole
+    reviews, so ReviewService calls it from a thread.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, disk: Optional[SeriesCache] = None):
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("REVIEW_CACHE_SIZE", "32"))
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        if disk is None and os.getenv("REVIEW_CACHE_DISK", "true").lower() not in ("0", "false", "no"):
+            disk = SeriesCache(
+                cache_dir=os.getenv("REVIEW_CACHE_DIR") or str(DEFAULT_REVIEW_CACHE_DIR),
+                max_bytes=int(os.getenv("REVIEW_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+                enabled=True,
+            )
+        self.disk = disk
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            content = self._entries.get(key)
+            if content is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return content
+
+        raw = self.disk.get_raw(key) if self.disk is not None else None
+        if raw is not None:
+            self.disk_hits += 1
+            content = raw.decode("utf-8")
+            self._remember(key, content)
+            return content
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, content: str):
+        self._remember(key, content)
+        if self.disk is not None:
+            # The key already pins the payload and model, so entries never go stale
+            self.disk.put_raw(key, content.encode("utf-8"), finished=True)
+
+    def _remember(self, key: str, content: str):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = content
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": len(self._entries),
+            "memory_bytes": sum(len(c) for c in self._entries.values()),
+            "max_entries": self.max_entries,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "disk": self.disk.stats() if self.disk is not None else None,
+        }
+
+
+class ReviewSections:
+    """
+    Review parts as NDJSON lines, sent through emit as soon as the pipeline has them:
+    {"section": key, "data": ...} per review key, and timeline_snapshots in chunks of
+    {"section": "timeline_snapshots", "offset": i, "data": rows} (snapshot values and
+    win_prob) followed later by {"section": "snapshot_details", ...} (player_stats and
+    shap_explanations), then COMPLETE_LINE. Without emit nothing is serialized.
+    """
+
+    def __init__(self, emit: Optional[Callable[[str], None]] = None, chunk_size: Optional[int] = None, clean: bool = True):
+        self.emit = emit
+        self.chunk_size = max(chunk_size if chunk_size is not None else int(os.getenv("REVIEW_STREAM_CHUNK_SIZE", "200")), 1)
+        # Replayed reviews are already plain JSON values
+        self._clean = clean_json_data if clean else (lambda value: value)
+
+    def section(self, name: str, value: Any):
+        if self.emit is not None:
+            self.emit(json.dumps({"section": name, "data": self._clean(value)}))
+
+    def rows(self, name: str, rows: List[Dict[str, Any]]):
+        if self.emit is not None:
+            for offset in range(0, len(rows), self.chunk_size):
+                chunk = rows[offset:offset + self.chunk_size]
+                self.emit(json.dumps({"section": name, "offset": offset, "data": self._clean(chunk)}))
+
+    def complete(self):
+        if self.emit is not None:
+            self.emit(COMPLETE_LINE)
+
+    def replay(self, review: Dict[str, Any]):
+        """The lines of a finished review (e.g. from the cache), identical to a live stream."""
+        for name in EARLY_SECTIONS:
+            self.section(name, review.get(name))
+        snapshots = review.get("timeline_snapshots") or []
+        self.rows("timeline_snapshots", [{k: v for k, v in row.items() if k not in SNAPSHOT_DETAILS} for row in snapshots])
+        self.rows("snapshot_details", [{k: row.get(k) for k in SNAPSHOT_DETAILS} for row in snapshots])
+        for name in LATE_SECTIONS:
+            self.section(name, review.get(name))
+        self.complete()
+
+
+class ReviewService:
+    def __init__(self, cache: Optional[ReviewCache] = None):
+        self.cache = cache or ReviewCache()
+        # The coaching staff tends to open a finished series at once: one pipeline run per (match, game)
+        self.flights = SingleFlight("review")
+        # Stream producers, held until done: after "complete" they still finish caching
+        self._producers: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def participant_fields(layout: str = "rows") -> Optional[tuple]:
+        # Row reviews return whole participant frames; columnar ones only read the stat fallbacks
+        return None if layout == "rows" else micro_analytics.participant_fields()
+
+    @staticmethod
+    def cache_key(match_id: str, game: str, payload_hash: str, layout: str = "rows") -> str:
+        decision_engine.ensure_model()
+        parts = [str(match_id), game, payload_hash, str(decision_engine.model_version),
+                 decision_engine.explainer_backend, ANALYTICS_VERSION]
+        # Only non-default layouts extend the key, so existing row-layout entries stay valid
+        if layout != "rows":
+            parts.append(layout)
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+    async def get_review(self, match_id: str, game: Optional[str] = None,
+                         progress: Optional[ProgressCallback] = None, layout: str = "rows") -> str:
+        """
+        Serialized review JSON for a match, computed once per payload/model/analytics version.
+        progress is called as each REVIEW_STAGES stage finishes; a request that joins an
+        in-flight review of the same match gets no stage reports, only the result.
+        layout is one of REVIEW_LAYOUTS.
+        """
+        if layout not in REVIEW_LAYOUTS:
+            raise ValueError(f"Unknown review layout {layout!r}, expected one of {', '.join(REVIEW_LAYOUTS)}")
+        clock = StageClock(progress)
+        source, game = await self._fetch(match_id, game, layout)
+        return await self.flights.run(self._flight_key(match_id, game, layout),
+                                      lambda: self._compute_review(match_id, game, source, clock, layout=layout))
+
+    async def stream_review(self, match_id: str, game: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Review as NDJSON lines (see ReviewSections), each sent as soon as it is computed.
+        The stream ends at "complete" while the full review is still serialized and
+        cached. Cached reviews, and reviews already in flight for another request, are
+        replayed from the finished result; a failure ends the stream with an "error" section.
+        """
+        loop = asyncio.get_running_loop()
+        lines: asyncio.Queue = asyncio.Queue()
+        live = []
+        closed = False
+
+        def put(line: Optional[str]):
+            # Nobody reads the queue once the stream is closed
+            if not closed:
+                lines.put_nowait(line)
+
+        def live_line(line: str):
+            live.append(True)
+            put(line)
+
+        async def produce():
+            try:
+                clock = StageClock()
+                source, resolved = await self._fetch(match_id, game)
+                content = await self.flights.run(
+                    self._flight_key(match_id, resolved),
+                    lambda: self._compute_review(match_id, resolved, source, clock, sections=live_line))
+                if not live:
+                    emit = lambda line: loop.call_soon_threadsafe(put, line)
+                    await asyncio.to_thread(lambda: ReviewSections(emit, clean=False).replay(json.loads(content)))
+            except Exception as e:
+                logger.error(f"Streaming review for {match_id} failed: {e}", exc_info=True)
+                put(json.dumps({"section": "error", "data": str(e)}))
+            finally:
+                put(None)
+
+        producer = asyncio.create_task(produce())
+        self._producers.add(producer)
+        producer.add_done_callback(self._producers.discard)
+        complete = False
+        try:
+            while (line := await lines.get()) is not None:
+                yield line + "\n"
+                if line == COMPLETE_LINE:
+                    complete = True
+                    break
+        finally:
+            closed = True
+            # A client gone before "complete" needs nothing more; a shared review flight
+            # is shielded and still finishes and caches for the other requests
+            if not complete:
+                producer.cancel()
+
+    @staticmethod
+    async def _fetch(match_id: str, game: Optional[str], layout: str = "rows") -> Tuple[SeriesSource, str]:
+        """The GRID series and the game to review it as (the series' own unless given)."""
+        # 1. Fetch data from GRID (streamed and parsed as it downloads, or left in the series
+        # cache for the executor to stream; concurrent requests share one fetch)
+        logger.info(f"Requesting data from GRID for match: {match_id}")
+        source = await grid_service.series_source(match_id, ReviewService.participant_fields(layout))
+        return source, game or source.game
+
+    @staticmethod
+    def _flight_key(match_id: str, game: str, layout: str = "rows") -> tuple:
+        # On the resolved game, so game=None and an explicit game of the same series share one review
+        return (match_id, game) if layout == "rows" else (match_id, game, layout)
+
+    async def _compute_review(self, match_id: str, game: str, source: SeriesSource, clock: StageClock,
+                              sections: Optional[Callable[[str], None]] = None, layout: str = "rows") -> str:
+        # Reviews are keyed on the digest of the series payload bytes; cache_key may load the
+        # model, and cache lookups decompress whole reviews
+        key = await asyncio.to_thread(self.cache_key, match_id, game, source.digest, layout)
+        clock.done("fetch")
+        content = await asyncio.to_thread(self.cache.get, key)
+        if content is not None:
+            logger.info(f"Serving review for {match_id} from cache")
+            return content
+
+        try:
+            # A cached series goes over as its blob path, for the executor to stream
+            content = await review_executor.render(match_id, game, source.timeline, progress=clock.report,
+                                                   sections=sections, layout=layout, source=source.path)
+        except FileNotFoundError:
+            if source.timeline is not None:
+                raise
+            # Evicted before it was read (nothing was reported yet)
+            logger.warning(f"Series cache blob for {match_id} is gone, streaming the series in again")
+            timeline = await grid_service.stream_match_timeline(match_id, participant_fields=self.participant_fields(layout))
+            content = await review_executor.render(match_id, game, timeline, progress=clock.report,
+                                                   sections=sections, layout=layout)
+        await asyncio.to_thread(self.cache.put, key, content)
+        return content
+
+    @staticmethod
+    def render_review(match_id: str, game: str, match_data: Union[StreamedTimeline, Dict[str, Any]], clock: Optional[StageClock] = None,
+                      emit: Optional[Callable[[str], None]] = None, layout: str = "rows") -> str:
+        """build_review serialized to JSON text; this is what runs on the review executor."""
+        clock = clock or StageClock()
+        sections = ReviewSections(emit)
+        review = ReviewService.build_review(match_id, game, match_data, clock, sections, layout)
+        # Streamed clients have every section now; the full document below is for the cache
+        sections.complete()
+        try:
+            if layout == "columnar":
+                # Already sanitized in bulk: keep the arrays out of the recursive clean
+                timeline = review.pop("timeline_snapshots")
+                review = clean_json_data(review)
+                review["timeline_snapshots"] = timeline
+            else:
+                review = clean_json_data(review)
+            content = json.dumps(review)
+        except Exception as json_err:
+            logger.error(f"Serialization error: {str(json_err)}", exc_info=True)
+            raise ValueError("Error serializing match review data")
+        clock.done("serialize")
+        return content
+
+    @staticmethod
+    def build_review(match_id: str, game: str, match_data: Union[StreamedTimeline, Dict[str, Any]], clock: Optional[StageClock] = None,
+                     sections: Optional[ReviewSections] = None, layout: str = "rows") -> Dict[str, Any]:
+        """
+        Full review pipeline: normalize, analyze, score, explain and summarize.
+        With layout="columnar", timeline_snapshots is a ColumnarTimeline instead of rows
+        (and is not streamed through sections). match_data is a StreamedTimeline or a raw payload.
+        """
+        clock = clock or StageClock()
+        sections = sections or ReviewSections()
+
+        # 2. Normalize
+        logger.info(f"Normalizing {game} timeline data")
+        timeline = match_data if isinstance(match_data, StreamedTimeline) else \
+            StreamedTimeline.from_payload(match_data, participant_fields=ReviewService.participant_fields(layout))
+        # Copied: the timeline may be shared with coalesced requests
+        metadata = dict(timeline.metadata)
+        metadata["game"] = game
+        # Reviews are cached on disk; the video URL embeds the GRID API key
+        metadata.pop("video_url", None)
+        snapshots = timeline.snapshots.fillna(0)
+
+        # Extract multiple event types
+        event_types = ["KILL", "SPIKE_PLANTED", "SPIKE_DEFUSED"] if game == "valorant" else ["CHAMPION_KILL", "ELITE_MONSTER_KILL", "BUILDING_KILL"]
+        events = timeline.extract_events(event_types).fillna(0)
+        logger.info(f"Extracted {len(events)} events and {len(snapshots)} snapshots")
+
+        # If events are still empty and we have no snapshots, don't create mock events
+        if events.empty and snapshots.empty:
+            logger.info("No events or snapshots found in GRID data")
+            events = pd.DataFrame(columns=["type", "timestamp", "killerId", "victimId", "headshot"])
+        clock.done("normalize")
+
+        # 3. Analyze
+        logger.info(f"Running micro and macro analytics for {game}")
+        micro = micro_analytics.analyze_player_mistakes(events, snapshots, game=game)
+        player_stats = micro_analytics.compute_player_efficiency(snapshots, events, game=game)
+        macro_shifts = macro_analytics.identify_strategic_inflections(snapshots, game=game, events_df=events)
+        objectives = macro_analytics.evaluate_objective_control(events, game=game)
+        draft_analysis = macro_analytics.analyze_draft_synergy(metadata)
+        clock.done("analytics")
+        early = {"match_id": match_id, "game": game, "metadata": metadata, "micro_insights": micro,
+                 "macro_insights": macro_shifts, "objectives": objectives, "draft_analysis": draft_analysis}
+        for name in EARLY_SECTIONS:
+            sections.section(name, early[name])
+
+        # 4. Decision Engine (Get latest state for analysis)
+        if not snapshots.empty:
+            logger.info("Preparing current state for decision engine")
+
+            # Prepare feature sets for all snapshots in one vectorized pass
+            feature_matrix = feature_builder.build_feature_matrix(snapshots, events, game=game)
+            all_states = feature_builder.to_states(feature_matrix)
+
+            # Bulk predict win probabilities
+            logger.info(f"Predicting win probabilities for {len(all_states)} snapshots")
+            probs = decision_engine.predict_bulk_probabilities(feature_matrix)
+            clock.done("predict")
+
+            if layout == "columnar":
+                logger.info(f"Computing SHAP explanations for {len(all_states)} snapshots")
+                shap_values = decision_engine.explain_bulk_values(feature_matrix)
+                clock.done("explain")
+
+                stats_timeline = micro_analytics.compute_player_efficiency_timeline(snapshots, events, game=game)
+                enriched_snapshots = columnar_timeline.encode(snapshots, probs, stats_timeline, shap_values,
+                                                              decision_engine.feature_names)
+                shap_explanations = {k: float(v) for k, v in zip(decision_engine.feature_names, shap_values[-1])}
+                latest = stats_timeline[stats_timeline["snapshot"] == len(snapshots) - 1] if not stats_timeline.empty else stats_timeline
+                player_stats = latest.drop(columns="snapshot").to_dict('records')
+            else:
+                # Win probabilities go out before the (slow) explanations so the chart renders first
+                enriched_snapshots = snapshots.to_dict('records')
+                for idx, snapshot_row in enumerate(enriched_snapshots):
+                    snapshot_row['win_prob'] = probs[idx]
+                sections.rows("timeline_snapshots", enriched_snapshots)
+
+                # Explain every snapshot with a single SHAP call for true dynamic analysis
+                logger.info(f"Computing SHAP explanations for {len(all_states)} snapshots")
+                all_explanations = decision_engine.explain_bulk_decisions(feature_matrix)
+                clock.done("explain")
+
+                # Player stats for every snapshot in one cumulative pass over the events
+                stats_timeline = micro_analytics.compute_player_efficiency_timeline(snapshots, events, game=game)
+                stats_by_snapshot = micro_analytics.player_stats_by_snapshot(stats_timeline, len(snapshots))
+
+                # Enrich snapshots with player stats and explanations
+                for idx, snapshot_row in enumerate(enriched_snapshots):
+                    snapshot_row['player_stats'] = stats_by_snapshot[idx]
+                    snapshot_row['shap_explanations'] = all_explanations[idx]
+                sections.rows("snapshot_details", [{k: row[k] for k in SNAPSHOT_DETAILS} for row in enriched_snapshots])
+
+                shap_explanations = enriched_snapshots[-1]['shap_explanations']
+                player_stats = enriched_snapshots[-1]['player_stats']
+            current_state = all_states[-1]
+        else:
+            logger.warning("Snapshots are empty, returning default state")
+            current_state = {
+                "gold_diff": 0, "dragons_diff": 0, "time_seconds": 0,
+                "xp_diff": 0, "towers_diff": 0, "barons_diff": 0,
+                "team100_kills": 0, "team200_kills": 0
+            }
+            player_stats = []
+            enriched_snapshots = columnar_timeline.encode(snapshots) if layout == "columnar" else []
+            shap_explanations = {}
+
+        logger.info("Performing what-if analysis")
+        what_if = decision_engine.what_if_analysis(current_state, {"dragons_diff": current_state["dragons_diff"] + 1})
+
+        # 5. Generate Insights
+        logger.info("Generating AI insights")
+        ai_summary = ai_insight_service.generate_coach_summary(micro, macro_shifts, [
+            {
+                "what_if": f"Better performance on {('site entries' if game == 'valorant' else 'objective setup')}",
+                "delta": what_if["delta"] * 100,
+                "current_probability": what_if["current_probability"]
+            }
+        ], game=game, player_stats=player_stats)
+
+        clock.done("summary")
+        late = {"current_state": current_state, "player_stats": player_stats, "shap_explanations": shap_explanations,
+                "decision_analysis": what_if, "ai_coach_summary": ai_summary}
+        for name in LATE_SECTIONS:
+            sections.section(name, late[name])
+        logger.info("Successfully processed match review")
+        return {
+            "match_id": match_id,
+            "game": game,
+            "metadata": metadata,
+            "micro_insights": micro,
+            "macro_insights": macro_shifts,
+            "objectives": objectives,
+            "decision_analysis": what_if,
+            "shap_explanations": shap_explanations,
+            "ai_coach_summary": ai_summary,
+            "current_state": current_state,
+            "player_stats": player_stats,
+            "draft_analysis": draft_analysis,
+            "timeline_snapshots": enriched_snapshots
+        }
+
+
+# Singleton instance
+review_service = ReviewService()
@@ -0,0 +1,303 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from app.core.timeline_stream import StreamedTimeline, TimelineStream
+
+logger = logging.getLogger("decision-lens.cache")
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / "data" / "cache" / "grid"
+
+# last_access only orders LRU eviction: persist it at most this often per entry
+# instead of rewriting the index on every hit
+ACCESS_WRITE_INTERVAL = 60.0
+
+
+class SeriesCache:
+    """
+    Content-addressed disk cache for GRID series payloads.
+
+    Payloads are gzipped JSON blobs named by the SHA-256 of their content; a small
+    index maps series ids to blobs with an expiry (None for finished series, which
+    never expire) and a last-access time used for size-bounded LRU eviction.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None,
+                 live_ttl: Optional[float] = None, enabled: Optional[bool] = None):
+        self.cache_dir = Path(cache_dir or os.getenv("GRID_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("GRID_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+        self.live_ttl = live_ttl if live_ttl is not None else float(os.getenv("GRID_CACHE_LIVE_TTL", "30"))
+        if enabled is None:
+            enabled = os.getenv("GRID_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest}.json.gz"
+
+    def _load_index(self, refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        # Other worker processes may share the directory, so misses and writes re-read it
+        if self._index is None or refresh:
+            try:
+                self._index = json.loads((self.cache_dir / self.INDEX_FILE).read_text())
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_dir / f"{self.INDEX_FILE}.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps(self._index))
+        os.replace(tmp, self.cache_dir / self.INDEX_FILE)
+
+    def _drop(self, key: str):
+        entry = self._index.pop(key, None)
+        if entry is None:
+            return
+        # Identical payloads share a blob; only delete it once nothing references it
+        if not any(e["digest"] == entry["digest"] for e in self._index.values()):
+            self._blob_path(entry["digest"]).unlink(missing_ok=True)
+
+    def _disk_bytes(self) -> int:
+        seen = {}
+        for entry in self._index.values():
+            seen[entry["digest"]] = entry["size"]
+        return sum(seen.values())
+
+    def _evict(self):
+        while self._index and self._disk_bytes() > self.max_bytes:
+            oldest = min(self._index, key=lambda k: self._index[k]["last_access"])
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _live_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        # Callers hold the lock; a missing or expired entry counts as a miss
+        entry = self._load_index().get(key) or self._load_index(refresh=True).get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry["expires_at"] is not None and entry["expires_at"] <= time.time():
+            self._drop(key)
+            self._save_index()
+            self.expired += 1
+            self.misses += 1
+            return None
+        return entry
+
+    def _touch(self, entry: Dict[str, Any]):
+        now = time.time()
+        if now - entry["last_access"] >= ACCESS_WRITE_INTERVAL:
+            entry["last_access"] = now
+            self._save_index()
+        self.hits += 1
+
+    def get_raw(self, key: str) -> Optional[bytes]:
+        """Cached bytes for `key`, or None on miss/expiry."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                return None
+            try:
+                raw = gzip.decompress(self._blob_path(entry["digest"]).read_bytes())
+            except (OSError, EOFError, zlib.error) as e:
+                logger.warning(f"Dropping unreadable cache entry {key}: {e}")
+                self._drop(key)
+                self._save_index()
+                self.misses += 1
+                return None
+            self._touch(entry)
+            return raw
+
+    def checkout(self, key: str) -> Optional[Tuple[str, str, Optional[Dict[str, Any]]]]:
+        """
+        Blob path, digest and stored meta of a live entry for `key`, counted like get_raw
+        but without reading the blob: stream it with iter_blob.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                return None
+            path = self._blob_path(entry["digest"])
+            if not path.exists():
+                self._drop(key)
+                self._save_index()
+                self.misses += 1
+                return None
+            self._touch(entry)
+            return str(path), entry["digest"], entry.get("meta")
+
+    @staticmethod
+    def iter_blob(path: str, chunk_bytes: int = 1024 * 1024) -> Iterator[bytes]:
+        """Decompressed bytes of a blob from checkout(); FileNotFoundError once it was evicted."""
+        with gzip.open(path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_bytes)
+                if not chunk:
+                    return
+                yield chunk
+
+    @staticmethod
+    def parse_blob(path: str, participant_fields: Optional[tuple] = None) -> StreamedTimeline:
+        """A blob from checkout() streamed through TimelineStream, never read whole into memory."""
+        return TimelineStream.parse_chunks(lambda: SeriesCache.iter_blob(path), participant_fields=participant_fields)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached payload for `key`, or None on miss/expiry."""
+        raw = self.get_raw(key)
+        return json.loads(raw) if raw is not None else None
+
+    def put(self, key: str, payload: Dict[str, Any], finished: bool, meta: Optional[Dict[str, Any]] = None):
+        """Store `payload`; finished series never expire, live ones get live_ttl."""
+        if self.enabled:
+            self.put_raw(key, json.dumps(payload, separators=(",", ":")).encode(), finished, meta)
+
+    def put_raw(self, key: str, raw: bytes, finished: bool, meta: Optional[Dict[str, Any]] = None) -> str:
+        """Store raw payload bytes; returns their digest. meta is a small dict kept in the index."""
+        digest = hashlib.sha256(raw).hexdigest()
+        if not self.enabled:
+            return digest
+        blob = gzip.compress(raw, compresslevel=6)
+
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._blob_path(digest)
+            if not path.exists():
+                tmp = path.with_suffix(f".{os.getpid()}.tmp")
+                tmp.write_bytes(blob)
+                os.replace(tmp, path)
+            self._file_entry(key, digest, len(blob), len(raw), finished, meta)
+        return digest
+
+    def writer(self) -> "BlobWriter":
+        """A BlobWriter that streams a payload into the cache as it arrives."""
+        return BlobWriter(self)
+
+    def _commit_spool(self, key: str, tmp: Path, digest: str, raw_size: int, finished: bool,
+                      meta: Optional[Dict[str, Any]]):
+        with self._lock:
+            path = self._blob_path(digest)
+            if path.exists():
+                tmp.unlink(missing_ok=True)
+            else:
+                os.replace(tmp, path)
+            self._file_entry(key, digest, path.stat().st_size, raw_size, finished, meta)
+
+    def _file_entry(self, key: str, digest: str, size: int, raw_size: int, finished: bool,
+                    meta: Optional[Dict[str, Any]]):
+        # Callers hold the lock and have written the blob
+        index = self._load_index(refresh=True)
+        previous = index.get(key)
+        now = time.time()
+        index[key] = {
+            "digest": digest,
+            "size": size,
+            "raw_size": raw_size,
+            "finished": finished,
+            "stored_at": now,
+            "expires_at": None if finished else now + self.live_ttl,
+            "last_access": now,
+            "meta": meta,
+        }
+        if previous and previous["digest"] != digest and not any(
+            e["digest"] == previous["digest"] for e in index.values()
+        ):
+            self._blob_path(previous["digest"]).unlink(missing_ok=True)
+
+        self._evict()
+        self._save_index()
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._load_index()
+            self._drop(key)
+            self._save_index()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            index = self._load_index()
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(index),
+                "finished_entries": sum(1 for e in index.values() if e["finished"]),
+                "bytes": self._disk_bytes(),
+                "raw_bytes": sum(e["raw_size"] for e in index.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expired": self.expired,
+                "evictions": self.evictions,
+            }
+
+
+class BlobWriter:
+    """
+    Streams one payload into a SeriesCache: bytes are hashed and gzipped to a temporary
+    file as they are written, and commit() files the blob under the SHA-256 of all of
+    them, so the payload is never held in memory. With the cache disabled it only hashes.
+    """
+
+    def __init__(self, cache: SeriesCache):
+        self.cache = cache
+        self.raw_size = 0
+        # Blob path once committed to an enabled cache
+        self.path: Optional[str] = None
+        self._sha = hashlib.sha256()
+        self._tmp: Optional[Path] = None
+        self._file = None
+        if cache.enabled:
+            cache.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, name = tempfile.mkstemp(suffix=".tmp", dir=cache.cache_dir)
+            os.close(fd)
+            self._tmp = Path(name)
+            self._file = gzip.open(name, "wb", compresslevel=6)
+
+    @property
+    def digest(self) -> str:
+        return self._sha.hexdigest()
+
+    def write(self, data: bytes):
+        self._sha.update(data)
+        self.raw_size += len(data)
+        if self._file is not None:
+            self._file.write(data)
+
+    def commit(self, key: str, finished: bool, meta: Optional[Dict[str, Any]] = None) -> str:
+        """File what was written under `key` (see SeriesCache.put_raw); returns the digest."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self.cache._commit_spool(key, self._tmp, self.digest, self.raw_size, finished, meta)
+            self._tmp = None
+            self.path = str(self.cache._blob_path(self.digest))
+        return self.digest
+
+    def abort(self):
+        """Discard what was written."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._tmp is not None:
+            self._tmp.unlink(missing_ok=True)
+            self._tmp = None
@@ -0,0 +1,61 @@
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+logger = logging.getLogger("decision-lens.single-flight")
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key onto one in-flight task: the first
+    caller starts it and later callers await the same result (or exception). Nothing
+    is kept once the task finishes; caching stays with the callers.
+    """
+
+    def __init__(self, name: str, enabled: Optional[bool] = None):
+        self.name = name
+        if enabled is None:
+            enabled = os.getenv("REQUEST_COALESCING", "true").lower() not in ("0", "false", "no")
+        self.enabled = enabled
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """Result of factory() for key, shared with every concurrent caller of the same key."""
+        if not self.enabled:
+            self.leaders += 1
+            return await factory()
+
+        task = self._flights.get(key)
+        if task is None:
+            self.leaders += 1
+            task = self._flights[key] = asyncio.create_task(factory())
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+            logger.debug(f"Joined in-flight {self.name} call for {key}")
+        # Shielded: a caller that disconnects must not cancel the work the others await
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        # Retrieving the exception also keeps asyncio from warning about abandoned flights
+        if not task.cancelled() and task.exception() is not None:
+            self.failures += 1
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.leaders + self.coalesced
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+            "coalesce_rate": self.coalesced / calls if calls else 0.0,
+        }
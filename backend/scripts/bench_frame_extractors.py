@@ -0,0 +1,153 @@
+import argparse
+import copy
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.normalization import FrameSchema, Normalizer, normalizer
+from report_timeline_memory import synthetic_timeline
+
+
+def lol_segments(n_frames: int) -> dict:
+    """GRID LoL series state: frames split across segment payloads, participantFrames with flat stats."""
+    frames = synthetic_timeline(n_frames)["frames"]
+    segments = [{"type": "frames", "payload": {"frames": frames[i:i + 10]}} for i in range(0, n_frames, 10)]
+    return {"seriesState": {"titleId": 3, "games": [{"id": "game-1", "segments": segments}]}}
+
+
+def lol_nested_stats(n_frames: int) -> dict:
+    """LoL frames whose participants only carry a nested stats object (every flat key misses)."""
+    timeline = synthetic_timeline(n_frames)
+    for frame in timeline["frames"]:
+        for pid, p in frame["participantFrames"].items():
+            frame["participantFrames"][pid] = {
+                "participantId": p["participantId"], "teamId": p["teamId"],
+                "stats": {"gold": p["totalGold"], "xp": p["xp"], "minionsKilled": p["minionsKilled"],
+                          "jungleMinionsKilled": p["jungleMinionsKilled"], "wardsPlaced": p["wardsPlaced"],
+                          "position": p["position"]},
+            }
+    return timeline
+
+
+def lol_mixed_layouts(n_frames: int, seed: int = 2) -> dict:
+    """
+    LoL participants that disagree on where their stats live: participant 1 (the one
+    the schema is compiled from) only has netWorth and a nested stats object, later ones
+    add higher-priority keys, dict values with an earlier subkey, or strings to skip.
+    """
+    rng = np.random.default_rng(seed)
+    timeline = synthetic_timeline(n_frames)
+    for frame in timeline["frames"]:
+        for pid, p in frame["participantFrames"].items():
+            gold, xp = p.pop("totalGold"), p.pop("xp")
+            p["netWorth"] = gold
+            p["stats"] = {"xp": xp, "wardsPlaced": p.pop("wardsPlaced")}
+            variant = (int(pid) + int(rng.integers(0, 4))) % 4 if pid != "1" else 0
+            if variant == 1:
+                p["totalGold"] = gold + 999
+                p["xp"] = xp + 5
+            elif variant == 2:
+                p["netWorth"] = {"amount": gold, "total": gold + 1}
+                p["visionScore"] = 3
+            elif variant == 3:
+                p["totalGold"] = "n/a"
+                p["experiencePoints"] = {"value": xp * 2}
+        frame["participantFrames"]["1"]["netWorth"] = {"amount": 1234} if frame["timestamp"] else 1234
+    return timeline
+
+
+def valorant_players(n_frames: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    return [
+        [{"id": f"{side}-{i}", "credits": {"total": int(rng.integers(0, 9000))}, "loadoutValue": int(rng.integers(0, 5000)),
+          "position": {"x": float(rng.random() * 100), "y": float(rng.random() * 100)}}
+         for side in ("blue", "red") for i in range(1, 6)]
+        for _ in range(n_frames)
+    ]
+
+
+def valorant_series_games(n_frames: int) -> dict:
+    """GRID VALORANT series state: game frames with players nested under teams, credits as objects."""
+    frames = []
+    for r, players in enumerate(valorant_players(n_frames)):
+        teams = [{"id": 100, "players": players[:5]}, {"id": 200, "players": players[5:]}]
+        frames.append({"clock": {"timestamp": r * 1000}, "teams": teams,
+                       "events": [{"type": "KILL", "killerId": players[r % 10]["id"], "timestamp": r * 1000}] if r % 7 == 0 else []})
+    return {"seriesState": {"titleId": 6, "games": [{"id": "map-1", "frames": frames}]}}
+
+
+def valorant_rounds(n_frames: int) -> dict:
+    """VALORANT feed with a participants list per frame and kill/spike events under rounds."""
+    frames = [{"timestamp": r * 1000, "participants": players} for r, players in enumerate(valorant_players(n_frames, seed=1))]
+    rounds = [{"events": [{"type": "KILL", "killerId": "blue-1", "timestamp": r * 1000}, {"type": "SPIKE_PLANTED", "timestamp": r * 1000}]}
+              for r in range(n_frames // 20)]
+    return {"metadata": {"game": "valorant"}, "frames": frames, "rounds": rounds}
+
+
+def stats_only(_: int) -> dict:
+    """No frames at all: the normalizer synthesizes a trend from the series statistics."""
+    return {"metadata": {"game": "lol"}, "stats": {"games": [{
+        "duration": "PT31M12.5S",
+        "teamStats": [{"teamId": 100, "goldEarned": 61000}, {"teamId": 200, "goldEarned": 55000}],
+        "playerStats": [{"playerId": i, "teamId": 100 if i <= 5 else 200, "totalGold": 11000 + i * 100,
+                         "xp": 15000 + i, "minionsKilled": 200 + i} for i in range(1, 11)],
+    }]}}
+
+
+VARIANTS = {
+    "lol-segments": lol_segments,
+    "lol-nested-stats": lol_nested_stats,
+    "lol-mixed": lol_mixed_layouts,
+    "val-series-games": valorant_series_games,
+    "val-rounds": valorant_rounds,
+    "stats-only": stats_only,
+}
+
+
+def extract(frames, game: str, detect: bool):
+    schema = FrameSchema(game, detect=detect)
+    values = list(Normalizer._iter_frames(frames, game, schema))
+    return values, schema
+
+
+def frames_per_second(frames, game: str, detect: bool, min_seconds: float = 0.5) -> float:
+    done, start = 0, time.perf_counter()
+    while True:
+        extract(frames, game, detect)
+        done += len(frames)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return done / elapsed
+
+
+def main(n_frames: int):
+    print(f"{'variant':>17} {'frames':>7} {'generic fps':>12} {'compiled fps':>13} {'speedup':>8} {'identical':>10}  layout")
+    for name, build in VARIANTS.items():
+        parsed = normalizer.parse(build(n_frames))
+        frames, game = Normalizer._resolve_frames(parsed)
+        frames = copy.deepcopy(frames)
+
+        generic, _ = extract(frames, game, detect=False)
+        compiled, schema = extract(frames, game, detect=True)
+        identical = [(v["players"], v["teams"], v["cum_stats"]) for v in generic] == \
+                    [(v["players"], v["teams"], v["cum_stats"]) for v in compiled]
+
+        slow = frames_per_second(frames, game, detect=False)
+        fast = frames_per_second(frames, game, detect=True)
+        print(f"{name:>17} {len(frames):>7} {slow:>12.0f} {fast:>13.0f} {fast / slow:>7.2f}x {str(identical):>10}  "
+              f"{parsed.variant}, {schema.layout}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-frame extraction throughput: generic key probing vs schema-compiled lookups.")
+    parser.add_argument("--frames", type=int, default=2000)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    main(args.frames)
@@ -0,0 +1,121 @@
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.grid_service import GridService
+from app.services.series_cache import SeriesCache
+
+
+def mock_grid_app(latency: float, frames: int) -> FastAPI:
+    """Minimal GRID stand-in serving the endpoints GridService calls."""
+    app = FastAPI()
+    app.state.requests = 0
+
+    @app.middleware("http")
+    async def count_requests(request, call_next):
+        app.state.requests += 1
+        return await call_next(request)
+
+    timeline = {
+        "frames": [
+            {"timestamp": i * 60000, "participantFrames": {str(p): {"totalGold": 500 + i * 400, "xp": i * 300} for p in range(1, 11)}}
+            for i in range(frames)
+        ]
+    }
+
+    @app.get("/file-download/end-state/grid/series/{series_id}")
+    async def end_state(series_id: str):
+        await asyncio.sleep(latency)
+        return timeline
+
+    @app.post("/central-data/graphql")
+    async def central_data():
+        await asyncio.sleep(latency)
+        return {"data": {"series": {"teams": [], "title": {"name": "League of Legends", "id": "3"}}}}
+
+    @app.post("/statistics-feed/graphql")
+    async def statistics_feed():
+        await asyncio.sleep(latency)
+        return {"data": {"seriesStats": {}}}
+
+    return app
+
+
+def start_server(app: FastAPI, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+async def legacy_fetch(service: GridService, match_id: str):
+    """Previous behaviour: a fresh client per call and the three fetches in sequence."""
+    async with httpx.AsyncClient() as client:
+        await service._fetch_end_state(client, match_id)
+        await service._fetch_series_details(client, match_id)
+        await service._fetch_series_stats(client, match_id)
+
+
+async def measure(fn, iterations: int):
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await fn(str(i))
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def main(iterations: int, latency: float, frames: int, port: int):
+    app = mock_grid_app(latency, frames)
+    server = start_server(app, port)
+    base = f"http://127.0.0.1:{port}"
+    service = GridService(api_key="bench", base_url=base, files_base_url=base, cache=SeriesCache(enabled=False))
+
+    legacy = await measure(lambda m: legacy_fetch(service, m), iterations)
+    await service.start()
+    pooled = await measure(service.get_match_timeline, iterations)
+    await service.close()
+
+    # Repeat reviews of a finished series through the disk cache
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cached_service = GridService(api_key="bench", base_url=base, files_base_url=base, cache=SeriesCache(cache_dir))
+        before = app.state.requests
+        cached = await measure(lambda m: cached_service.get_match_timeline("finished-series"), iterations)
+        api_calls = app.state.requests - before
+        cache_stats = cached_service.cache.stats()
+        await cached_service.close()
+    server.should_exit = True
+
+    print(f"mock GRID latency {latency * 1000:.0f}ms per request, {iterations} fetches each")
+    for name, samples in (("sequential, fresh client", legacy), ("pooled + gather", pooled), ("disk cache (repeat)", cached[1:])):
+        print(f"{name:>26}: p50 {statistics.median(samples):8.1f} ms   mean {statistics.mean(samples):8.1f} ms")
+    print(f"{'speedup (p50)':>26}: {statistics.median(legacy) / statistics.median(pooled):.2f}x")
+    print(f"{'cold cached fetch':>26}: {cached[0]:8.1f} ms, {api_calls} GRID requests for {iterations} fetches")
+    print(f"{'cache':>26}: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+          f"{cache_stats['bytes']} bytes on disk ({cache_stats['raw_bytes']} raw)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GRID fetch latency against a local mock GRID server.")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.08, help="seconds of server-side delay per request")
+    parser.add_argument("--frames", type=int, default=45)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    asyncio.run(main(args.iterations, args.latency, args.frames, args.port))
@@ -0,0 +1,88 @@
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.decision_engine import decision_engine
+
+
+def random_states(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    states = []
+    for _ in range(n):
+        gold = float(rng.normal(0, 5000))
+        states.append({
+            "gold_diff": gold,
+            "xp_diff": gold * 0.7 + float(rng.normal(0, 1000)),
+            "towers_diff": int(rng.integers(-11, 12)),
+            "dragons_diff": int(rng.integers(-5, 6)),
+            "barons_diff": int(rng.integers(-3, 4)),
+            "time_seconds": int(rng.integers(0, 2700)),
+            "team100_kills": int(rng.integers(0, 50)),
+            # Missing features must behave like fillna(0)
+            **({"team200_kills": int(rng.integers(0, 50))} if rng.random() > 0.1 else {}),
+        })
+    return states
+
+
+def legacy_predict(states):
+    """Previous path: DataFrame + fillna(0) + predict_proba for every call."""
+    df = pd.DataFrame(states, columns=decision_engine.feature_names).fillna(0)
+    return decision_engine.model.predict_proba(df)[:, 1]
+
+
+def legacy_explain(state):
+    df = pd.DataFrame([state], columns=decision_engine.feature_names).fillna(0)
+    return decision_engine._positive_class_shap(decision_engine.explainer.shap_values(df))[0]
+
+
+def timings(fn, repeats: int):
+    fn()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def main(repeats: int):
+    decision_engine.warm_up()
+    states = random_states(1000)
+
+    # Same numbers as the DataFrame path
+    new = np.array(decision_engine.predict_bulk_probabilities(states))
+    single = np.array([decision_engine.predict_win_probability(s) for s in states[:100]])
+    print(f"max |diff| bulk: {np.abs(new - legacy_predict(states)).max():.2e}  "
+          f"single: {np.abs(single - legacy_predict(states[:100])).max():.2e}  "
+          f"explain: {np.abs(np.array(list(decision_engine.explain_decision(states[0]).values())) - legacy_explain(states[0])).max():.2e}")
+
+    print(f"{'case':>14} {'legacy p50 us':>14} {'legacy p99 us':>14} {'numpy p50 us':>13} {'numpy p99 us':>13} {'speedup':>8}")
+    cases = [
+        ("predict x1", lambda: legacy_predict(states[:1]), lambda: decision_engine.predict_win_probability(states[0])),
+        ("predict x10", lambda: legacy_predict(states[:10]), lambda: decision_engine.predict_bulk_probabilities(states[:10])),
+        ("predict x1000", lambda: legacy_predict(states), lambda: decision_engine.predict_bulk_probabilities(states)),
+        ("explain x1", lambda: legacy_explain(states[0]), lambda: decision_engine.explain_decision(states[0])),
+    ]
+    for name, legacy, numpy_path in cases:
+        n = max(repeats // 10, 20) if "1000" in name else repeats
+        l50, l99 = timings(legacy, n)
+        n50, n99 = timings(numpy_path, n)
+        print(f"{name:>14} {l50:>14.1f} {l99:>14.1f} {n50:>13.1f} {n99:>13.1f} {l50 / n50:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Single-state and small-batch inference latency, DataFrame vs NumPy path.")
+    parser.add_argument("--repeats", type=int, default=2000)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    main(args.repeats)
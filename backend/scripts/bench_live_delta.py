@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.delta import apply_patch
+from app.services.live_stream_service import LiveStreamService, LiveSession
+
+
+class RecordingSocket:
+    """Captures every text frame the server sends."""
+    def __init__(self):
+        self.frames = []
+
+    async def accept(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.frames.append(text)
+
+
+async def main(game: str, ticks: int, keyframe_interval: int):
+    service = LiveStreamService()
+    service.tick_seconds = 0
+    service.keyframe_interval = keyframe_interval
+    # Measuring bandwidth, not backpressure: never drop
+    service.client_queue_size = 100000
+
+    full_ws, delta_ws = RecordingSocket(), RecordingSocket()
+    session = service.sessions["bench"] = LiveSession("bench", game)
+    await service.connect(full_ws, ["bench"])
+    await service.connect(delta_ws, ["bench"], protocol="delta")
+
+    session.is_running = True
+    task = asyncio.create_task(service._run_mock_stream(session, game, {"teams": []}))
+    while session.seq < ticks and not task.done():
+        await asyncio.sleep(0)
+    session.is_running = False
+    await task
+    await asyncio.sleep(0.05)
+
+    # Rebuild the delta client's view and check it matches every full update
+    state, last_seq, mismatches = None, 0, 0
+    full_states = [json.loads(f)["data"] for f in full_ws.frames]
+    for i, frame in enumerate(delta_ws.frames):
+        message = json.loads(frame)
+        assert message["seq"] == last_seq + 1, "sequence gap"
+        last_seq = message["seq"]
+        state = message["data"] if message["type"] == "STATE_KEYFRAME" else apply_patch(state, message["ops"])
+        mismatches += state != full_states[i]
+
+    full_bytes = sum(len(f.encode()) for f in full_ws.frames)
+    delta_bytes = sum(len(f.encode()) for f in delta_ws.frames)
+    n = len(full_ws.frames)
+    print(f"game={game} ticks={n} keyframe_interval={keyframe_interval}")
+    print(f"full:  {full_bytes / n:10.0f} bytes/tick")
+    print(f"delta: {delta_bytes / n:10.0f} bytes/tick  ({full_bytes / max(delta_bytes, 1):.1f}x smaller)")
+    print(f"reconstruction mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-tick bandwidth of full vs delta live protocol on the mock stream.")
+    parser.add_argument("--game", default="lol", choices=["lol", "valorant"])
+    parser.add_argument("--ticks", type=int, default=120)
+    parser.add_argument("--keyframe-interval", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    asyncio.run(main(args.game, args.ticks, args.keyframe_interval))
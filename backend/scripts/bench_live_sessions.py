@@ -0,0 +1,79 @@
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.live_stream_service import LiveStreamService, LiveSession
+
+
+class NullSocket:
+    """Stand-in subscriber that accepts every message."""
+    async def accept(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def send_text(self, text):
+        pass
+
+
+async def run_sessions(n_sessions: int, duration: float, tick_seconds: float):
+    service = LiveStreamService()
+    service.tick_seconds = tick_seconds
+
+    sessions = []
+    for i in range(n_sessions):
+        match_id = f"bench-{i}"
+        session = service.sessions[match_id] = LiveSession(match_id, "lol" if i % 2 == 0 else "valorant")
+        await service.connect(NullSocket(), [match_id])
+        session.is_running = True
+        session.task = asyncio.create_task(service._run_mock_stream(session, session.game, {}))
+        sessions.append(session)
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    await asyncio.sleep(duration)
+    cpu_used = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    for session in sessions:
+        session.is_running = False
+    await asyncio.gather(*(s.task for s in sessions), return_exceptions=True)
+
+    tick_ms = [t * 1000 for s in sessions for t in s.recent_tick_cpu]
+    ticks = sum(s.ticks for s in sessions)
+    return {
+        "sessions": n_sessions,
+        "ticks": ticks,
+        "ticks_per_session": ticks / n_sessions,
+        "tick_cpu_p50_ms": statistics.median(tick_ms) if tick_ms else 0,
+        "tick_cpu_p99_ms": sorted(tick_ms)[int(len(tick_ms) * 0.99) - 1] if tick_ms else 0,
+        "cpu_util": cpu_used / wall,
+        "cpu_per_session_s": cpu_used / n_sessions,
+    }
+
+
+async def main(counts, duration, tick_seconds):
+    print(f"{'sessions':>8} {'ticks/sess':>10} {'p50 ms':>8} {'p99 ms':>8} {'cpu util':>9} {'cpu/sess s':>10}")
+    for n in counts:
+        r = await run_sessions(n, duration, tick_seconds)
+        print(f"{r['sessions']:>8} {r['ticks_per_session']:>10.1f} {r['tick_cpu_p50_ms']:>8.2f} "
+              f"{r['tick_cpu_p99_ms']:>8.2f} {r['cpu_util']:>9.2f} {r['cpu_per_session_s']:>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hold N concurrent mock live sessions and report per-session CPU.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run each configuration")
+    parser.add_argument("--tick", type=float, default=1.0, help="seconds between snapshots per session")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    asyncio.run(main(args.sessions, args.duration, args.tick))
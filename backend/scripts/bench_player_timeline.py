@@ -0,0 +1,71 @@
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.analytics.micro import micro_analytics
+from bench_trade_detection import synthetic_kills
+
+
+def synthetic_snapshots(n_snapshots: int, n_kills: int, game: str, seed: int = 0) -> pd.DataFrame:
+    """Snapshot frame shaped like normalizer.normalize_timeline output, spanning the kill timestamps."""
+    rng = np.random.default_rng(seed)
+    timestamps = np.linspace(0, n_kills * 1500, n_snapshots).astype(int)
+    columns = {"timestamp": timestamps}
+    for pid in range(1, 11):
+        if game == "valorant":
+            columns[f"p{pid}_credits"] = rng.integers(0, 9000, n_snapshots)
+            columns[f"p{pid}_loadout"] = rng.integers(0, 5000, n_snapshots)
+        else:
+            columns[f"p{pid}_gold"] = np.cumsum(rng.integers(0, 600, n_snapshots))
+            columns[f"p{pid}_minionsKilled"] = np.cumsum(rng.integers(0, 10, n_snapshots))
+            columns[f"p{pid}_jungleMinionsKilled"] = np.cumsum(rng.integers(0, 3, n_snapshots))
+            columns[f"p{pid}_wardsPlaced"] = np.cumsum(rng.integers(0, 2, n_snapshots))
+    return pd.DataFrame(columns)
+
+
+def legacy_per_snapshot(snapshots: pd.DataFrame, events: pd.DataFrame, game: str):
+    """Previous review path: filter events and rebuild a one-row frame for every snapshot."""
+    stats = []
+    for idx in range(len(snapshots)):
+        snap_events = events[events['timestamp'] <= snapshots.iloc[idx]["timestamp"]]
+        snap_df = pd.DataFrame([snapshots.iloc[idx]])
+        stats.append(micro_analytics.compute_player_efficiency(snap_df, snap_events, game=game))
+    return stats
+
+
+def main(snapshot_counts, n_kills: int, games):
+    print(f"{'game':>9} {'snapshots':>10} {'legacy ms':>10} {'timeline ms':>12} {'speedup':>8} {'identical':>10}")
+    for game in games:
+        events = synthetic_kills(n_kills, game)
+        for n in snapshot_counts:
+            snapshots = synthetic_snapshots(n, n_kills, game)
+            start = time.perf_counter()
+            expected = legacy_per_snapshot(snapshots, events, game)
+            legacy = time.perf_counter() - start
+
+            start = time.perf_counter()
+            timeline = micro_analytics.compute_player_efficiency_timeline(snapshots, events, game=game)
+            actual = micro_analytics.player_stats_by_snapshot(timeline, len(snapshots))
+            fast = time.perf_counter() - start
+
+            # Values must match; the legacy path only differs in returning ints as floats
+            print(f"{game:>9} {n:>10} {legacy * 1000:>10.1f} {fast * 1000:>12.1f} {legacy / fast:>7.1f}x {str(actual == expected):>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-snapshot player stats: per-snapshot filtering vs one cumulative pass.")
+    parser.add_argument("--snapshots", type=int, nargs="+", default=[60, 600])
+    parser.add_argument("--kills", type=int, default=2000)
+    parser.add_argument("--games", nargs="+", default=["lol", "valorant"], choices=["valorant", "lol"])
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    main(args.snapshots, args.kills, args.games)
@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.decision_engine import decision_engine
+from app.services import review_service as review_module
+from app.services.grid_service import GridService
+from app.services.review_executor import review_executor
+from app.services.review_service import ReviewCache, ReviewService
+from app.services.series_cache import SeriesCache
+from report_timeline_memory import synthetic_timeline
+
+
+def bench_grid(payload: dict, latency: float) -> GridService:
+    """GridService whose three GRID calls sleep for `latency` and count themselves."""
+    grid = GridService(api_key="bench", cache=SeriesCache(enabled=False))
+    grid.calls = 0
+
+    async def end_state(client, match_id):
+        grid.calls += 1
+        await asyncio.sleep(latency)
+        return payload, True
+
+    async def empty(client, match_id):
+        await asyncio.sleep(latency)
+        return {}, True
+
+    async def no_client():
+        return None
+
+    grid._fetch_end_state, grid._fetch_series_details, grid._fetch_series_stats = end_state, empty, empty
+    grid._get_client = no_client
+    return grid
+
+
+async def wave(n_requests: int, payload: dict, latency: float, coalesce: bool) -> dict:
+    grid = review_module.grid_service = bench_grid(payload, latency)
+    service = ReviewService(ReviewCache(max_entries=0, disk=SeriesCache(enabled=False)))
+    grid.flights.enabled = service.flights.enabled = coalesce
+    submitted = review_executor.submitted
+
+    start = time.perf_counter()
+    contents = await asyncio.gather(*(service.get_review("bench-series", "lol") for _ in range(n_requests)))
+    return {
+        "seconds": time.perf_counter() - start,
+        "fetches": grid.calls,
+        "pipelines": review_executor.submitted - submitted,
+        "coalesced": grid.flights.coalesced + service.flights.coalesced,
+        "identical": len(set(contents)) == 1,
+    }
+
+
+async def main(n_requests: int, n_frames: int, latency: float):
+    decision_engine.ensure_model()
+    payload = synthetic_timeline(n_frames)
+    # Start the review pool before timing so both waves see warm workers
+    await review_executor.render("warm-up", "lol", payload)
+
+    print(f"{n_requests} concurrent requests for one series ({n_frames} frames, {latency * 1000:.0f}ms GRID latency), "
+          f"review executor: {review_executor.mode}")
+    print(f"{'coalescing':>10} {'seconds':>8} {'GRID fetches':>13} {'pipeline runs':>14} {'coalesced':>10} {'identical':>10}")
+    for coalesce in (False, True):
+        result = await wave(n_requests, payload, latency, coalesce)
+        print(f"{('on' if coalesce else 'off'):>10} {result['seconds']:>8.2f} {result['fetches']:>13} "
+              f"{result['pipelines']:>14} {result['coalesced']:>10} {str(result['identical']):>10}")
+    review_executor.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent reviews of the same series with and without single-flight coalescing.")
+    parser.add_argument("--requests", type=int, default=8)
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(args.requests, args.frames, args.latency_ms / 1000))
@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import logging
+import pickle
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.decision_engine import decision_engine
+from app.services.review_executor import ReviewExecutor
+from app.services.series_cache import SeriesCache
+from report_timeline_memory import synthetic_timeline
+
+
+async def tick_lag(stop: asyncio.Event, tick_seconds: float) -> list:
+    """Stand-in live tick: how late each wake-up is, in ms, while the loop is shared."""
+    lags = []
+    while not stop.is_set():
+        expected = time.perf_counter() + tick_seconds
+        await asyncio.sleep(tick_seconds)
+        lags.append(max(time.perf_counter() - expected, 0.0) * 1000)
+    return lags
+
+
+def percentile(values: list, q: float) -> float:
+    return sorted(values)[max(int(len(values) * q) - 1, 0)] if values else 0.0
+
+
+async def run(mode: str, workers: int, n_reviews: int, payload: dict, tick_seconds: float) -> dict:
+    # process-blob: process workers stream the payload from a series cache blob instead of a pickle
+    source = None
+    if mode == "process-blob":
+        cache = SeriesCache(cache_dir=tempfile.mkdtemp(prefix="bench-series-"))
+        cache.put("bench", payload, finished=True)
+        source = cache.checkout("bench")[0]
+    executor = ReviewExecutor(mode="process" if source else mode, workers=workers)
+    # Warm the pool (worker start-up and model load) outside the measurement
+    await asyncio.gather(*(executor.render("warm-up", "lol", payload) for _ in range(workers)))
+
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(tick_lag(stop, tick_seconds))
+    await asyncio.sleep(tick_seconds * 5)
+    start = time.perf_counter()
+    contents = await asyncio.gather(*(executor.render("bench", "lol", None if source else payload, source=source)
+                                      for _ in range(n_reviews)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    lags = await ticker
+    executor.close()
+    return {"lags": lags, "seconds": elapsed, "contents": contents}
+
+
+async def main(modes: list, workers: int, n_reviews: int, n_frames: int, tick_seconds: float):
+    decision_engine.ensure_model()
+    payload = synthetic_timeline(n_frames)
+    print(f"{n_reviews} concurrent reviews of {n_frames} frames, {workers} workers, tick every {tick_seconds * 1000:.0f}ms")
+    start = time.perf_counter()
+    pickled = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"payload pickled for each process-mode review: {len(pickled) / 1e6:.1f} MB, "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms in the server process")
+    print(f"{'mode':>12} {'reviews s':>10} {'lag p50 ms':>11} {'lag p99 ms':>11} {'lag max ms':>11} {'ticks':>6}")
+    reference = None
+    for mode in modes:
+        result = await run(mode, workers, n_reviews, payload, tick_seconds)
+        lags = result["lags"]
+        print(f"{mode:>12} {result['seconds']:>10.2f} {statistics.median(lags):>11.1f} {percentile(lags, 0.99):>11.1f} "
+              f"{max(lags):>11.1f} {len(lags):>6}")
+        reference = reference or result["contents"][0]
+        if any(content != reference for content in result["contents"]):
+            print(f"{mode:>12} produced a different review")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Live tick latency on the event loop while N match reviews run.")
+    parser.add_argument("--modes", default="inline,thread,process,process-blob")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--reviews", type=int, default=4)
+    parser.add_argument("--frames", type=int, default=1500)
+    parser.add_argument("--tick-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(args.modes.split(","), args.workers, args.reviews, args.frames, args.tick_ms / 1000))
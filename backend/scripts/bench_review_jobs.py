@@ -0,0 +1,64 @@
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.decision_engine import decision_engine
+from app.services import review_service as review_module
+from app.services.review_executor import review_executor
+from app.services.review_jobs import review_jobs
+from app.services.review_service import ReviewCache
+from app.services.series_cache import SeriesCache
+from bench_review_coalescing import bench_grid
+from report_timeline_memory import synthetic_timeline
+
+
+async def main(n_bulk: int, n_frames: int, latency: float):
+    decision_engine.ensure_model()
+    payload = synthetic_timeline(n_frames)
+    review_module.grid_service = bench_grid(payload, latency)
+    # Every job must run the full pipeline
+    review_module.review_service.cache = ReviewCache(max_entries=0, disk=SeriesCache(enabled=False))
+    await review_executor.render("warm-up", "lol", payload)
+
+    print(f"{n_bulk} bulk archive jobs, then one live job ({n_frames} frames each), "
+          f"{review_jobs.workers} job workers, {review_executor.workers} {review_executor.mode} executor workers")
+    bulk = [review_jobs.submit(f"archive-{i}", "lol", priority="bulk") for i in range(n_bulk)]
+    await asyncio.sleep(0.5)
+    live = review_jobs.submit("live-series", "lol", priority="live")
+
+    start = time.perf_counter()
+    async for snapshot in review_jobs.watch(live):
+        print(f"  live job +{time.perf_counter() - start:5.2f}s  {snapshot['status']:>8}  "
+              f"stage={snapshot['stage']}  {snapshot['stages_done']}/{snapshot['stages_total']}")
+    while not all(job.finished for job in bulk):
+        await asyncio.sleep(0.1)
+
+    print(f"{'job':>12} {'priority':>9} {'wait s':>7} {'run s':>6} {'status':>7}")
+    for job in sorted(bulk + [live], key=lambda j: j.started_at):
+        info = job.to_dict()
+        print(f"{job.match_id:>12} {job.priority:>9} {info['wait_seconds']:>7.2f} {info['run_seconds']:>6.2f} {job.status:>7}")
+
+    stats = review_jobs.stats()
+    print(f"{'stage':>10} {'count':>6} {'mean ms':>8} {'p95 ms':>8}")
+    for stage, summary in stats["stage_seconds"].items():
+        if summary["count"]:
+            print(f"{stage:>10} {summary['count']:>6} {summary['mean'] * 1000:>8.1f} {summary['p95'] * 1000:>8.1f}")
+    await review_jobs.stop()
+    review_executor.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Priority review jobs: a live review submitted behind a bulk backlog.")
+    parser.add_argument("--bulk", type=int, default=8)
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(args.bulk, args.frames, args.latency_ms / 1000))
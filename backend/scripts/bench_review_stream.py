@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.decision_engine import decision_engine
+from app.services import review_service as review_module
+from app.services.review_executor import review_executor
+from app.services.review_service import SNAPSHOT_DETAILS, ReviewCache, ReviewService
+from app.services.series_cache import SeriesCache
+from bench_review_coalescing import bench_grid
+from report_timeline_memory import synthetic_timeline
+
+
+def assemble(lines: list) -> dict:
+    """Rebuild the blocking response from streamed sections."""
+    review, snapshots = {}, []
+    for line in lines:
+        message = json.loads(line)
+        section, data = message["section"], message["data"]
+        if section == "timeline_snapshots":
+            snapshots[message["offset"]:message["offset"] + len(data)] = data
+        elif section == "snapshot_details":
+            for row, details in zip(snapshots[message["offset"]:], data):
+                row.update(details)
+        elif section not in ("complete", "error"):
+            review[section] = data
+    review["timeline_snapshots"] = snapshots
+    return review
+
+
+async def stream(service: ReviewService, match_id: str) -> dict:
+    start = time.perf_counter()
+    lines, first = [], {}
+    async for line in service.stream_review(match_id, "lol"):
+        section = json.loads(line)["section"]
+        first.setdefault(section, time.perf_counter() - start)
+        lines.append(line)
+    return {"lines": lines, "first": first, "seconds": time.perf_counter() - start}
+
+
+async def main(n_frames: int, latency: float):
+    decision_engine.ensure_model()
+    payload = synthetic_timeline(n_frames)
+    review_module.grid_service = bench_grid(payload, latency)
+    await review_executor.render("warm-up", "lol", payload)
+
+    blocking = ReviewService(ReviewCache(max_entries=0, disk=SeriesCache(enabled=False)))
+    start = time.perf_counter()
+    content = await blocking.get_review("bench-series", "lol")
+    blocking_seconds = time.perf_counter() - start
+
+    streaming = ReviewService(ReviewCache(disk=SeriesCache(enabled=False)))
+    live = await stream(streaming, "bench-series")
+    # The stream ends at "complete" while the review is still being serialized for the cache
+    while streaming.flights.stats()["in_flight"]:
+        await asyncio.sleep(0.05)
+    cached = await stream(streaming, "bench-series")
+
+    print(f"{n_frames} frames, {latency * 1000:.0f}ms GRID latency, review executor: {review_executor.mode}")
+    print(f"blocking response: {blocking_seconds:.2f}s, {len(content) / 1e6:.1f} MB")
+    print(f"{'stream':>7} {'metadata s':>11} {'win_prob s':>11} {'details s':>10} {'complete s':>11} {'lines':>6}")
+    for name, result in (("live", live), ("cached", cached)):
+        first = result["first"]
+        print(f"{name:>7} {first['metadata']:>11.2f} {first.get('timeline_snapshots', 0):>11.2f} "
+              f"{first.get('snapshot_details', 0):>10.2f} {result['seconds']:>11.2f} {len(result['lines']):>6}")
+
+    reference = json.loads(content)
+    print(f"live stream rebuilds the blocking review: {assemble(live['lines']) == reference}")
+    print(f"cached replay matches the live stream: {cached['lines'] == live['lines']}")
+    print(f"snapshot rows carry {', '.join(SNAPSHOT_DETAILS)} only after explain: "
+          f"{all(k not in row for line in live['lines'] if json.loads(line)['section'] == 'timeline_snapshots' for row in json.loads(line)['data'] for k in SNAPSHOT_DETAILS)}")
+    review_executor.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time to first section of the streamed review vs the blocking response.")
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(args.frames, args.latency_ms / 1000))
@@ -0,0 +1,143 @@
+import argparse
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+EVENT_TYPES = ["CHAMPION_KILL", "ELITE_MONSTER_KILL", "BUILDING_KILL"]
+MODES = ("load", "stream", "stream-columnar")
+
+
+def write_end_state(path: Path, target_mb: int, n_games: int = 3, seed: int = 0) -> int:
+    """Write a GRID-shaped end-state file of roughly target_mb, one frame at a time."""
+    rng = np.random.default_rng(seed)
+    target = target_mb * 1024 * 1024
+    written = 0
+    with open(path, "w") as f:
+        f.write('{"seriesState": {"id": "bench", "titleId": 3, "games": [')
+        for g in range(n_games):
+            f.write(("," if g else "") + f'{{"id": "game-{g}", "frames": [')
+            i = 0
+            while written < target * (g + 1) / n_games:
+                frame = {
+                    "timestamp": i * 1000,
+                    "participantFrames": {
+                        str(pid): {
+                            "participantId": pid, "teamId": 100 if pid <= 5 else 200,
+                            "totalGold": 500 + i * 7 + int(rng.integers(0, 300)), "xp": i * 6,
+                            "minionsKilled": i // 9, "jungleMinionsKilled": i // 60, "wardsPlaced": i // 120,
+                            "position": {"x": int(rng.integers(0, 15000)), "y": int(rng.integers(0, 15000))},
+                        }
+                        for pid in range(1, 11)
+                    },
+                    "events": [{"type": "CHAMPION_KILL", "timestamp": i * 1000, "killerId": int(rng.integers(1, 11)),
+                                "victimId": int(rng.integers(1, 11))}] if rng.random() < 0.05 else [],
+                }
+                chunk = ("," if i else "") + json.dumps(frame)
+                f.write(chunk)
+                written += len(chunk)
+                i += 1
+            f.write("]}")
+        f.write("]}}")
+    return path.stat().st_size
+
+
+def run(mode: str, path: str, chunk_bytes: int):
+    """Child process: parse the file one way and report the result, time and peak RSS."""
+    logging.disable(logging.WARNING)
+    from app.analytics.micro import micro_analytics
+    from app.core.normalization import normalizer
+    from app.services.grid_service import _EndStateSpool
+    from app.services.series_cache import SeriesCache
+
+    start = time.perf_counter()
+    if mode == "load":
+        # Previous review/live input: whole body, .json(), then the normalizer on the dict
+        with open(path, "rb") as f:
+            body = f.read()
+        parsed = normalizer.parse(json.loads(body))
+        snapshots = normalizer.normalize_timeline(parsed)
+        events = normalizer.extract_events(parsed, EVENT_TYPES)
+        digest = None
+    else:
+        # GridService.stream_match_timeline on a download: parsed, hashed and spooled into
+        # the series cache chunk by chunk (stream-columnar: a columnar review's trimmed input)
+        fields = micro_analytics.participant_fields() if mode == "stream-columnar" else None
+        with tempfile.TemporaryDirectory() as cache_dir:
+            spool = _EndStateSpool(SeriesCache(cache_dir, max_bytes=1 << 40).writer(), fields)
+            with open(path, "rb") as f:
+                while chunk := f.read(chunk_bytes):
+                    spool.feed(chunk)
+            timeline, _ = spool.finish({}, "bench", finished=True)
+        snapshots, events, digest = timeline.snapshots, timeline.extract_events(EVENT_TYPES), timeline.digest
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    stats = snapshots.drop(columns="participantFrames")
+    print(json.dumps({"snapshots": len(snapshots), "events": len(events), "seconds": elapsed,
+                      "peak_mb": peak_kb / 1024, "digest": digest,
+                      "checksum": float(stats.select_dtypes("number").sum().sum()),
+                      "participants": sum(len(frames) for frames in snapshots["participantFrames"])}))
+
+
+def child(mode: str, path: str, chunk_bytes: int):
+    out = subprocess.run([sys.executable, __file__, "--child", mode, "--file", path, "--chunk-bytes", str(chunk_bytes)],
+                         capture_output=True, text=True)
+    if out.returncode != 0:
+        return {"error": f"exit {out.returncode}" + (" (killed, likely out of memory)" if out.returncode < 0 else "")}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(target_mb: int, chunk_bytes: int, path: str):
+    with tempfile.TemporaryDirectory() as tmp:
+        if not path:
+            path = str(Path(tmp) / "end_state.json")
+            start = time.perf_counter()
+            size = write_end_state(Path(path), target_mb)
+            print(f"wrote {size / 1e6:.0f} MB synthetic end-state in {time.perf_counter() - start:.1f}s")
+        else:
+            print(f"using {path} ({os.path.getsize(path) / 1e6:.0f} MB)")
+
+        baseline = child("imports", path, chunk_bytes)
+        print(f"{'path':>15} {'peak RSS MB':>12} {'seconds':>8} {'snapshots':>10} {'events':>7}")
+        print(f"{'imports':>15} {baseline['peak_mb']:>12.0f}")
+        results = {}
+        for mode in MODES:
+            result = results[mode] = child(mode, path, chunk_bytes)
+            if "error" in result:
+                print(f"{mode:>15} {result['error']}")
+            else:
+                print(f"{mode:>15} {result['peak_mb']:>12.0f} {result['seconds']:>8.1f} {result['snapshots']:>10} {result['events']:>7}")
+        if not any("error" in result for result in results.values()):
+            load = results["load"]
+            for mode in MODES[1:]:
+                same = all(load[k] == results[mode][k] for k in ("snapshots", "events", "checksum", "participants"))
+                print(f"{mode} matches load: {same}")
+            print(f"series cache digest: {results['stream']['digest']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Peak RSS of whole-body .json() parsing vs the streamed review/live input.")
+    parser.add_argument("--mb", type=int, default=500, help="Size of the synthetic end-state file")
+    parser.add_argument("--file", help="Existing end-state JSON instead of a synthetic one")
+    parser.add_argument("--chunk-bytes", type=int, default=1024 * 1024)
+    parser.add_argument("--child", choices=["imports", *MODES], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == "imports":
+        import app.analytics.micro  # noqa: F401
+        import app.services.grid_service  # noqa: F401
+        print(json.dumps({"peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+    elif args.child:
+        run(args.child, args.file, args.chunk_bytes)
+    else:
+        main(args.mb, args.chunk_bytes, args.file)
@@ -0,0 +1,67 @@
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.normalization import normalizer
+from report_timeline_memory import synthetic_timeline
+
+EVENT_TYPES = ["CHAMPION_KILL", "ELITE_MONSTER_KILL", "BUILDING_KILL"]
+
+
+def segmented_series(n_games: int, frames_per_game: int, frames_per_segment: int = 10) -> dict:
+    """GRID seriesState payload with frames and events split across segment payloads."""
+    games = []
+    for g in range(n_games):
+        frames = synthetic_timeline(frames_per_game, seed=g)["frames"]
+        segments = [{"type": "frames", "payload": {"frames": frames[i:i + frames_per_segment]}}
+                    for i in range(0, len(frames), frames_per_segment)]
+        segments += [{"type": "event", "payload": event} for frame in frames for event in frame["events"]]
+        games.append({"id": f"game-{g}", "segments": segments})
+    return {"seriesState": {"titleId": 3, "games": games}}
+
+
+def best_ms(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return min(samples)
+
+
+def separate(data):
+    return normalizer.normalize_timeline(data), normalizer.extract_events(data, EVENT_TYPES)
+
+
+def shared(data):
+    parsed = normalizer.parse(data)
+    return normalizer.normalize_timeline(parsed), normalizer.extract_events(parsed, EVENT_TYPES)
+
+
+def main(n_games: int, frames_per_game: int, repeats: int):
+    data = segmented_series(n_games, frames_per_game)
+    (snap_a, events_a), (snap_b, events_b) = separate(data), shared(data)
+    identical = snap_a.equals(snap_b) and events_a.equals(events_b)
+
+    parse = best_ms(lambda: normalizer.parse(data), repeats)
+    two_walks = best_ms(lambda: separate(data), repeats)
+    one_walk = best_ms(lambda: shared(data), repeats)
+    print(f"{n_games} games x {frames_per_game} frames, {len(normalizer.parse(data).events)} events, identical output: {identical}")
+    print(f"{'parse ms':>9} {'separate ms':>12} {'shared ms':>10}")
+    print(f"{parse:>9.2f} {two_walks:>12.2f} {one_walk:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalize + extract events with one shared parse vs one parse per call.")
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    main(args.games, args.frames, args.repeats)
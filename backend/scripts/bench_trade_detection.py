@@ -0,0 +1,88 @@
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.analytics.micro import MicroAnalyticsEngine, micro_analytics
+
+
+def synthetic_kills(n_kills: int, game: str, seed: int = 0) -> pd.DataFrame:
+    """Kill-heavy event frame shaped like normalizer.extract_events output."""
+    rng = np.random.default_rng(seed)
+    # Roughly a 2-hour VALORANT series / long LoL series worth of fights
+    timestamps = np.sort(rng.integers(0, n_kills * 1500, n_kills))
+    if game == "valorant":
+        ids = [f"{side}-{i}" for side in ("blue", "red") for i in range(1, 6)] + [str(i) for i in range(1, 11)]
+        kill_type = "KILL"
+    else:
+        ids = [str(i) for i in range(1, 11)]
+        kill_type = "CHAMPION_KILL"
+    frame = pd.DataFrame({
+        "type": kill_type,
+        "timestamp": timestamps,
+        "killerId": rng.choice(ids, n_kills),
+        "victimId": rng.choice(ids, n_kills),
+        "headshot": rng.random(n_kills) < 0.3,
+    })
+    # A few non-kill events in between, as in real series
+    extra = pd.DataFrame({"type": "SPIKE_PLANTED" if game == "valorant" else "BUILDING_KILL",
+                          "timestamp": rng.integers(0, n_kills * 1500, n_kills // 20),
+                          "killerId": 0, "victimId": 0, "headshot": False})
+    return pd.concat([frame, extra]).sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+
+def legacy_untraded_deaths(events_df: pd.DataFrame, game: str):
+    """Previous quadratic implementation (iterrows + full-frame filter per kill)."""
+    mistakes = []
+    window = MicroAnalyticsEngine.TRADE_WINDOW_MS["valorant" if game == "valorant" else "lol"]
+    kills = events_df[events_df['type'].isin(MicroAnalyticsEngine.kill_event_types(game))]
+    for _, kill in kills.iterrows():
+        victim_id = str(kill.get('victimId'))
+        timestamp = kill.get('timestamp')
+        victim_team = MicroAnalyticsEngine.player_team(victim_id, game)
+
+        trade_found = False
+        nearby_kills = kills[(kills['timestamp'] > timestamp) & (kills['timestamp'] < timestamp + window)]
+        for _, n_kill in nearby_kills.iterrows():
+            if MicroAnalyticsEngine.player_team(n_kill.get('killerId'), game) == victim_team:
+                trade_found = True
+                break
+
+        if not trade_found:
+            mistakes.append(MicroAnalyticsEngine.untraded_death(victim_id, timestamp, game))
+    return mistakes
+
+
+def main(kill_counts, games):
+    empty = pd.DataFrame()
+    print(f"{'game':>9} {'kills':>7} {'legacy s':>10} {'sorted ms':>10} {'speedup':>9} {'mistakes':>9} {'identical':>10}")
+    for game in games:
+        for n in kill_counts:
+            events = synthetic_kills(n, game)
+            start = time.perf_counter()
+            expected = legacy_untraded_deaths(events, game)
+            legacy = time.perf_counter() - start
+
+            start = time.perf_counter()
+            actual = micro_analytics.analyze_player_mistakes(events, empty, game=game)
+            fast = time.perf_counter() - start
+
+            identical = actual == expected and [type(m["timestamp"]) for m in actual] == [type(m["timestamp"]) for m in expected]
+            print(f"{game:>9} {n:>7} {legacy:>10.2f} {fast * 1000:>10.2f} {legacy / fast:>8.0f}x {len(actual):>9} {str(identical):>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Untraded/isolated death detection: quadratic vs sorted-window implementation.")
+    parser.add_argument("--kills", type=int, nargs="+", default=[500, 5000])
+    parser.add_argument("--games", nargs="+", default=["valorant", "lol"], choices=["valorant", "lol"])
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    main(args.kills, args.games)
@@ -0,0 +1,146 @@
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.live_stream_service import LiveStreamService
+
+
+class FakeSocket:
+    """In-process WebSocket that simulates network delay and records delivery times."""
+    def __init__(self, delay: float, dead: bool = False):
+        self.delay = delay
+        self.dead = dead
+        self.received = []
+
+    async def accept(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.dead:
+            raise ConnectionResetError("client went away")
+        await asyncio.sleep(self.delay)
+        self.received.append(time.perf_counter())
+
+    async def send_json(self, message):
+        await self.send_text(json.dumps(message))
+
+
+def sample_message():
+    """A STATE_UPDATE roughly the size of a mid-game live tick."""
+    return {
+        "type": "STATE_UPDATE",
+        "match_id": "bench",
+        "game": "lol",
+        "data": {
+            "timestamp": 1200000,
+            "gold_diff": 1500,
+            "participantFrames": {
+                str(p): {"participantId": p, "totalGold": 9000, "xp": 8000, "position": {"x": 5000, "y": 7000}}
+                for p in range(1, 11)
+            },
+            "macro_insights": [{"timestamp": i * 60000, "type": "Gold Swing", "description": "swing"} for i in range(20)],
+            "ai_coach_summary": "x" * 2000,
+        },
+    }
+
+
+def make_sockets(n_clients: int, slow_fraction: float, dead_fraction: float):
+    n_slow = int(n_clients * slow_fraction)
+    n_dead = int(n_clients * dead_fraction)
+    sockets = [FakeSocket(0.5) for _ in range(n_slow)]
+    sockets += [FakeSocket(0.0, dead=True) for _ in range(n_dead)]
+    sockets += [FakeSocket(0.001) for _ in range(n_clients - n_slow - n_dead)]
+    return sockets
+
+
+async def run_sequential(n_clients, broadcasts, interval, slow_fraction, dead_fraction):
+    """Baseline: await send_json on each connection in turn, as before."""
+    sockets = make_sockets(n_clients, slow_fraction, dead_fraction)
+    message = sample_message()
+    starts, call_ms = [], []
+    for _ in range(broadcasts):
+        starts.append(time.perf_counter())
+        for ws in sockets:
+            try:
+                await ws.send_json(message)
+            except Exception:
+                pass
+        call_ms.append((time.perf_counter() - starts[-1]) * 1000)
+        await asyncio.sleep(interval)
+    return sockets, starts, call_ms
+
+
+async def run_queued(n_clients, broadcasts, interval, slow_fraction, dead_fraction, policy):
+    service = LiveStreamService()
+    service.slow_client_policy = policy
+    sockets = make_sockets(n_clients, slow_fraction, dead_fraction)
+    for ws in sockets:
+        await service.connect(ws)
+    message = sample_message()
+    starts, call_ms = [], []
+    for _ in range(broadcasts):
+        starts.append(time.perf_counter())
+        await service.broadcast(message)
+        call_ms.append((time.perf_counter() - starts[-1]) * 1000)
+        await asyncio.sleep(interval)
+    await asyncio.sleep(0.1)
+    stats = service.connection_stats()
+    for ws in list(service.active_connections):
+        service.disconnect(ws)
+    return sockets, starts, call_ms, stats
+
+
+def delivery_latencies(sockets, starts):
+    """Per-broadcast latency until every fast client has received it."""
+    fast = [ws for ws in sockets if ws.delay < 0.1 and not ws.dead]
+    latencies = []
+    for k, start in enumerate(starts):
+        done = [ws.received[k] for ws in fast if len(ws.received) > k]
+        if len(done) == len(fast) and done:
+            latencies.append((max(done) - start) * 1000)
+    return latencies
+
+
+def pct(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def main(client_counts, broadcasts, interval, slow_fraction, dead_fraction, policy):
+    print(f"{'mode':>10} {'clients':>8} {'deliver p50':>12} {'deliver p99':>12} {'call p50 ms':>12} {'dropped':>8} {'evicted':>8}")
+    for n in client_counts:
+        sockets, starts, call_ms = await run_sequential(n, broadcasts, interval, slow_fraction, dead_fraction)
+        lat = delivery_latencies(sockets, starts)
+        print(f"{'sequential':>10} {n:>8} {pct(lat, 0.5):>12.2f} {pct(lat, 0.99):>12.2f} {statistics.median(call_ms):>12.2f} {'-':>8} {'-':>8}")
+
+        sockets, starts, call_ms, stats = await run_queued(n, broadcasts, interval, slow_fraction, dead_fraction, policy)
+        lat = delivery_latencies(sockets, starts)
+        print(f"{'queued':>10} {n:>8} {pct(lat, 0.5):>12.2f} {pct(lat, 0.99):>12.2f} {statistics.median(call_ms):>12.2f} "
+              f"{stats['dropped']:>8} {stats['evicted']:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Broadcast latency at increasing WebSocket client counts.")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--broadcasts", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between broadcasts")
+    parser.add_argument("--slow", type=float, default=0.01, help="fraction of clients with 500ms sends")
+    parser.add_argument("--dead", type=float, default=0.01, help="fraction of clients whose sends fail")
+    parser.add_argument("--policy", default="drop_oldest", choices=["drop_oldest", "coalesce"])
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    asyncio.run(main(args.clients, args.broadcasts, args.interval, args.slow, args.dead, args.policy))
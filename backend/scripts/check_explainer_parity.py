@@ -0,0 +1,75 @@
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.decision_engine import DecisionEngine
+from bench_inference import random_states
+
+BACKEND_STARTUP = (
+    "import time; start = time.perf_counter();"
+    "from app.core.decision_engine import decision_engine;"
+    "decision_engine.warm_up(); print(time.perf_counter() - start)"
+)
+
+
+def latency_us(fn, repeats: int) -> float:
+    fn()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return sorted(samples)[len(samples) // 2]
+
+
+def startup_seconds(backend: str) -> float:
+    """Import + warm-up in a fresh interpreter, where skipping shap actually shows."""
+    env = {**os.environ, "EXPLAINER_BACKEND": backend}
+    out = subprocess.run([sys.executable, "-c", BACKEND_STARTUP], capture_output=True, text=True,
+                         cwd=Path(__file__).parent.parent, env=env)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main(samples: int, tolerance: float, repeats: int) -> int:
+    shap_engine, native_engine = DecisionEngine(), DecisionEngine()
+    shap_engine.explainer_backend, native_engine.explainer_backend = "shap", "native"
+    states = random_states(samples, seed=7)
+
+    bulk_shap = np.array([list(e.values()) for e in shap_engine.explain_bulk_decisions(states)])
+    bulk_native = np.array([list(e.values()) for e in native_engine.explain_bulk_decisions(states)])
+    single_diff = max(
+        abs(shap_engine.explain_decision(s)[k] - v)
+        for s in states[:200] for k, v in native_engine.explain_decision(s).items()
+    )
+    bulk_diff = np.abs(bulk_shap - bulk_native).max()
+    print(f"{samples} sampled states: max |shap - native| bulk {bulk_diff:.2e}, single {single_diff:.2e} (tolerance {tolerance:.0e})")
+
+    print(f"{'backend':>8} {'explain x1 p50 us':>18} {'explain x{} p50 ms'.format(samples):>20} {'startup s':>10}")
+    for name, engine in (("shap", shap_engine), ("native", native_engine)):
+        single = latency_us(lambda: engine.explain_decision(states[0]), repeats)
+        bulk = latency_us(lambda: engine.explain_bulk_decisions(states), max(repeats // 100, 5)) / 1000
+        print(f"{name:>8} {single:>18.1f} {bulk:>20.2f} {startup_seconds(name):>10.2f}")
+
+    ok = bulk_diff <= tolerance and single_diff <= tolerance
+    print("parity OK" if ok else "parity FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check native XGBoost contributions against shap.TreeExplainer.")
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--tolerance", type=float, default=1e-5)
+    parser.add_argument("--repeats", type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    sys.exit(main(args.samples, args.tolerance, args.repeats))
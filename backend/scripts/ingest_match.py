@@ -12,7 +12,7 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-async def ingest_match(match_id: str):
+async def ingest_match(match_id: str, refresh: bool = False):
     print(f"Ingesting match: {match_id}...")
     service = GridService()
     
@@ -21,9 +21,10 @@ async def ingest_match(match_id: str):
         data_dir = Path(__file__).parent.parent / "data" / "raw"
         data_dir.mkdir(parents=True, exist_ok=True)
         
-        # Fetch data
-        details = await service.get_match_details(match_id)
-        timeline = await service.get_match_timeline(match_id)
+        # Fetch data once; details and timeline are the same payload, and a
+        # finished series already in the shared disk cache costs no API calls
+        timeline = await service.get_match_timeline(match_id, use_cache=not refresh)
+        details = timeline
         
         # Save to files
         with open(data_dir / f"{match_id}_details.json", "w") as f:
@@ -33,9 +34,12 @@ async def ingest_match(match_id: str):
             json.dump(timeline, f, indent=2)
             
         print(f"Successfully ingested data for match {match_id} into {data_dir}")
+        print(f"Cache: {service.cache.stats()}")
         
     except Exception as e:
         print(f"Error ingesting match: {e}")
+    finally:
+        await service.close()
 
 if __name__ == "__main__":
     match_id = os.getenv("MATCH_ID")
@@ -43,4 +47,4 @@ if __name__ == "__main__":
         print("Please set MATCH_ID in your .env file.")
         sys.exit(1)
         
-    asyncio.run(ingest_match(match_id))
+    asyncio.run(ingest_match(match_id, refresh="--refresh" in sys.argv))
@@ -0,0 +1,83 @@
+import argparse
+import gzip
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.decision_engine import decision_engine
+from app.services.review_service import REVIEW_LAYOUTS, REVIEW_STAGES, ReviewService, StageClock
+from report_timeline_memory import synthetic_timeline
+
+
+def render(payload: dict, layout: str, repeat: int) -> dict:
+    """Best of `repeat` inline renders: content, total seconds and per-stage seconds."""
+    best = None
+    for _ in range(repeat):
+        stages = {}
+        start = time.perf_counter()
+        content = ReviewService.render_review("report-series", "lol", payload,
+                                              StageClock(lambda stage, seconds: stages.__setitem__(stage, seconds)),
+                                              layout=layout)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best["seconds"]:
+            best = {"content": content, "seconds": elapsed, "stages": stages}
+    return best
+
+
+def matches_rows(rows: list, columnar: dict) -> bool:
+    """Spot-check that the columnar arrays carry the same values as the row layout."""
+    columns, players = columnar["columns"], columnar["players"]
+    ids = players["ids"]
+    ok = columnar["length"] == len(rows)
+    ok &= np.allclose(columns["win_prob"], [row["win_prob"] for row in rows])
+    ok &= np.allclose(columns["gold_diff"], [row["gold_diff"] for row in rows])
+    features = columnar["shap"]["features"]
+    ok &= np.allclose(columnar["shap"]["values"], [[row["shap_explanations"][f] for f in features] for row in rows])
+    for stat, plane in players["stats"].items():
+        if isinstance(plane, dict):
+            continue
+        by_player = [{str(p["player_id"]): p[stat] for p in row["player_stats"]} for row in rows]
+        ok &= np.allclose(plane, [[stats.get(pid, 0) for pid in ids] for stats in by_player])
+    return bool(ok)
+
+
+def main(n_frames: int, repeat: int):
+    decision_engine.ensure_model()
+    payload = synthetic_timeline(n_frames)
+    # Warm-up: model, explainer and imports
+    ReviewService.render_review("warm-up", "lol", synthetic_timeline(50))
+
+    results = {layout: render(payload, layout, repeat) for layout in REVIEW_LAYOUTS}
+    print(f"synthetic LoL timeline, {n_frames} frames ({n_frames / 60:.0f} min at 1 frame/s), best of {repeat}")
+    print(f"{'layout':>9} {'MB':>7} {'gzip MB':>8} {'total s':>8} "
+          + " ".join(f"{stage[:9]:>9}" for stage in REVIEW_STAGES[1:]))
+    for layout, result in results.items():
+        content = result["content"].encode("utf-8")
+        print(f"{layout:>9} {len(content) / 1e6:>7.2f} {len(gzip.compress(content, 6)) / 1e6:>8.2f} "
+              f"{result['seconds']:>8.2f} "
+              + " ".join(f"{result['stages'].get(stage, 0):>9.3f}" for stage in REVIEW_STAGES[1:]))
+
+    rows, columnar = (json.loads(results[layout]["content"]) for layout in REVIEW_LAYOUTS)
+    size = {layout: len(result["content"]) for layout, result in results.items()}
+    print(f"payload reduction: {size['rows'] / size['columnar']:.1f}x, "
+          f"render time reduction: {results['rows']['seconds'] / results['columnar']['seconds']:.2f}x")
+    print(f"columnar values match the row layout: {matches_rows(rows['timeline_snapshots'], columnar['timeline_snapshots'])}")
+    shared = [k for k in rows if k != "timeline_snapshots"]
+    print(f"other sections identical: {all(rows[k] == columnar[k] for k in shared)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Review payload size and render time, row vs columnar timeline.")
+    parser.add_argument("--frames", type=int, default=2700)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    main(args.frames, args.repeat)
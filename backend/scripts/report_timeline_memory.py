@@ -0,0 +1,84 @@
+import argparse
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+# Add the parent directory to sys.path to import from app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.normalization import normalizer
+
+
+def synthetic_timeline(n_frames: int, seed: int = 0) -> dict:
+    """LoL timeline with participant frames and positions, shaped like GRID per-frame data."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(n_frames):
+        participant_frames = {
+            str(pid): {
+                "participantId": pid,
+                "teamId": 100 if pid <= 5 else 200,
+                "totalGold": 500 + i * 7 + int(rng.integers(0, 300)),
+                "xp": i * 6,
+                "minionsKilled": i // 9,
+                "jungleMinionsKilled": i // 60,
+                "wardsPlaced": i // 120,
+                "position": {"x": int(rng.integers(0, 15000)), "y": int(rng.integers(0, 15000))},
+            }
+            for pid in range(1, 11)
+        }
+        events = [{"type": "CHAMPION_KILL", "timestamp": i * 1000, "killerId": int(rng.integers(1, 11)),
+                   "victimId": int(rng.integers(1, 11))}] if rng.random() < 0.05 else []
+        frames.append({"timestamp": i * 1000, "participantFrames": participant_frames, "events": events})
+    return {"metadata": {"game": "lol", "teams": []}, "frames": frames}
+
+
+def measure(build):
+    """Result, build seconds and peak traced allocation of one normalization."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main(path: str, n_frames: int):
+    if path:
+        with open(path) as f:
+            timeline = json.load(f)
+        source = path
+    else:
+        timeline = synthetic_timeline(n_frames)
+        source = f"synthetic LoL timeline, {n_frames} frames"
+
+    wide, wide_s, wide_peak = measure(lambda: normalizer.normalize_timeline(timeline))
+    (snapshots, players), tidy_s, tidy_peak = measure(lambda: normalizer.normalize_timeline_tidy(timeline))
+
+    # deep=True counts object cells shallowly, so the embedded participantFrames
+    # dicts are a lower bound for the wide frame
+    wide_bytes = wide.memory_usage(deep=True).sum()
+    tidy_bytes = snapshots.memory_usage(deep=True).sum() + players.memory_usage(deep=True).sum()
+    object_columns = int((wide.dtypes == object).sum())
+
+    print(f"source: {source}")
+    print(f"{'layout':>6} {'shape':>22} {'object cols':>12} {'frame MB':>9} {'peak MB':>8} {'build ms':>9}")
+    print(f"{'wide':>6} {str(wide.shape):>22} {object_columns:>12} {wide_bytes / 1e6:>9.2f} {wide_peak / 1e6:>8.2f} {wide_s * 1000:>9.1f}")
+    print(f"{'tidy':>6} {str(snapshots.shape) + '+' + str(players.shape):>22} {0:>12} {tidy_bytes / 1e6:>9.2f} {tidy_peak / 1e6:>8.2f} {tidy_s * 1000:>9.1f}")
+    print(f"frame memory reduction: {wide_bytes / tidy_bytes:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory of the wide vs tidy normalized timeline.")
+    parser.add_argument("--file", help="Raw timeline JSON, e.g. data/raw/<match>_timeline.json from ingest_match.py")
+    parser.add_argument("--frames", type=int, default=3600)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    main(args.file, args.frames)
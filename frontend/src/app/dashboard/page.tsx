@@ -137,7 +137,7 @@ export default function Dashboard() {
   useEffect(() => {
     if (isLive) {
       // Connect to WebSocket
-      const ws = new WebSocket("ws://localhost:8000/ws/live");
+      const ws = new WebSocket(`ws://localhost:8000/ws/live?match_id=${matchId}`);
       
       ws.onopen = () => {
         console.log("Connected to Live Feed");
@@ -231,7 +231,7 @@ export default function Dashboard() {
       setWebsocket(ws);
       return () => {
         ws.close();
-        fetch(`http://localhost:8000/api/live/stop`, { method: "POST" });
+        fetch(`http://localhost:8000/api/live/stop/${matchId}`, { method: "POST" });
       };
     } else {
       if (websocket) {